@@ -0,0 +1,139 @@
+"""
+Benchmark of the recall and the latency of the comparison methods.
+
+Compare the related objects found by the TF-IDF and MinHash methods
+with the ones found by the exact Pearson's method, on a synthetic
+corpus of objects about random topics.
+
+The recalls are the parts of the related objects found by the exact
+Pearson's method and by an exact Jaccard's scan, also found by a method.
+The precision is the part of the related objects found sharing the topic
+of the object.
+
+Usage: python benchmarks/comparison.py [--objects 20000] [--queries 200]
+"""
+import argparse
+import os
+import sys
+import time
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                      'zinnia.tests.implementations.sqlite')
+
+import django  # noqa
+django.setup()
+
+from zinnia.comparison import MinHashModelVectorBuilder  # noqa
+from zinnia.comparison import TFIDFModelVectorBuilder  # noqa
+from zinnia.comparison import VectorizedModelVectorBuilder  # noqa
+
+
+def build_corpus(objects, seed):
+    """
+    Build the words of objects mixing the words of a topic
+    with common words, drawn with a Zipf-like distribution.
+    """
+    random = Random(seed)
+    common = ['common%s' % i for i in range(2000)]
+    common_weights = [1.0 / (i + 1) for i in range(len(common))]
+    topics = [['topic%s-%s' % (t, i) for i in range(30)]
+              for t in range(max(objects // 200, 1))]
+    corpus = {}
+    subjects = {}
+    for pk in range(1, objects + 1):
+        subjects[pk] = random.randrange(len(topics))
+        corpus[pk] = (random.choices(topics[subjects[pk]],
+                                     k=random.randint(20, 40)) +
+                      random.choices(common, common_weights,
+                                     k=random.randint(50, 150)))
+    return corpus, subjects
+
+
+def jaccard_related(corpus, object_id, number):
+    """
+    Compute the related objects with an exact Jaccard's scan.
+    """
+    words = set(corpus[object_id])
+    scores = []
+    for o_id, o_words in corpus.items():
+        if o_id != object_id:
+            o_words = set(o_words)
+            scores.append((len(words & o_words) /
+                           float(len(words | o_words)), o_id))
+    return sorted(scores, reverse=True)[:number]
+
+
+def make_builder(builder_class, corpus, **attributes):
+    """
+    Make a vector builder working on a corpus.
+    """
+    builder = type(builder_class.__name__, (builder_class,), attributes)()
+    builder.__dict__['raw_dataset'] = corpus
+    return builder
+
+
+def timed(function, *args, **kwargs):
+    """
+    Return the result of a function and its duration.
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--objects', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--number', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args()
+
+    corpus, subjects = build_corpus(options.objects, options.seed)
+    queries = Random(options.seed).sample(
+        sorted(corpus), min(options.queries, len(corpus)))
+
+    builders = [
+        ('pearson', make_builder(VectorizedModelVectorBuilder, corpus)),
+        ('tfidf', make_builder(TFIDFModelVectorBuilder, corpus))]
+    for bands, rows in ((10, 2), (20, 3), (32, 4), (16, 8)):
+        builders.append((
+            'minhash b=%s r=%s' % (bands, rows),
+            make_builder(MinHashModelVectorBuilder, corpus,
+                         bands=bands, rows=rows)))
+
+    print('%s objects, %s queries, top %s' % (
+        options.objects, len(queries), options.number))
+    jaccard = dict((pk, set(o_id for score, o_id in jaccard_related(
+        corpus, pk, options.number))) for pk in queries)
+    pearson = {}
+
+    print('%-20s %10s %12s %9s %9s %10s' % (
+        'method', 'build (s)', 'query (ms)', 'pearson', 'jaccard',
+        'precision'))
+    for name, builder in builders:
+        dummy, build = timed(lambda: builder.compute_related(queries[0]))
+        found_pearson = found_jaccard = relevant = total = 0
+        latency = 0.0
+        for pk in queries:
+            related, duration = timed(builder.compute_related, pk,
+                                      number=options.number)
+            latency += duration
+            related = set(o_id for o_id, score in related)
+            pearson.setdefault(pk, related)
+            found_pearson += len(related & pearson[pk])
+            found_jaccard += len(related & jaccard[pk])
+            relevant += len([o_id for o_id in related
+                             if subjects[o_id] == subjects[pk]])
+            total += len(related)
+        print('%-20s %10.2f %12.3f %9.3f %9.3f %10.3f' % (
+            name, build, 1000 * latency / len(queries),
+            found_pearson / float(sum(map(len, pearson.values())) or 1),
+            found_jaccard / float(sum(map(len, jaccard.values())) or 1),
+            relevant / float(total or 1)))
+
+
+if __name__ == '__main__':
+    main()
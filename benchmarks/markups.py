@@ -0,0 +1,106 @@
+"""
+Benchmark of the rendering of the entries in Markdown and reStructuredText.
+
+Compare the duration of a render with a new renderer built for each
+render, as done by markdown.markdown() and docutils' publish_parts(),
+with the renderers built once by thread and reused, on synthetic
+entries of typical sizes.
+
+Usage: python benchmarks/markups.py [--renders 200] [--words 100 500 2000]
+"""
+import argparse
+import os
+import sys
+import time
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                      'zinnia.tests.implementations.sqlite')
+
+import django  # noqa
+django.setup()
+
+from zinnia import markups  # noqa
+
+
+def build_entry(words, seed):
+    """
+    Build the source of an entry with paragraphs, emphasis,
+    links and lists, in Markdown and in reStructuredText.
+    """
+    random = Random(seed)
+    vocabulary = ['word%s' % i for i in range(500)]
+    markdown = []
+    restructuredtext = []
+    written = 0
+    while written < words:
+        paragraph = random.choices(vocabulary, k=random.randint(30, 80))
+        written += len(paragraph)
+        paragraph[0] = '*%s*' % paragraph[0]
+        markdown.append(' '.join(paragraph) + ' [link](http://example.com/)')
+        restructuredtext.append(
+            ' '.join(paragraph) + ' `link <http://example.com/>`_')
+        if random.random() < 0.3:
+            items = ['* %s' % ' '.join(random.choices(vocabulary, k=5))
+                     for i in range(random.randint(2, 5))]
+            markdown.append('\n'.join(items))
+            restructuredtext.append('\n'.join(items))
+    return '\n\n'.join(markdown), '\n\n'.join(restructuredtext)
+
+
+def markdown_built(value):
+    """
+    Render in Markdown with a new renderer.
+    """
+    import markdown
+    return markdown.markdown(value, extensions=markups.MARKDOWN_EXTENSIONS)
+
+
+def restructuredtext_built(value):
+    """
+    Render in reStructuredText with a new publisher.
+    """
+    from docutils.core import publish_parts
+    return publish_parts(
+        source=value, writer_name='html4css1',
+        settings_overrides=markups.RESTRUCTUREDTEXT_SETTINGS)['fragment']
+
+
+def timed(function, value, renders):
+    """
+    Return the mean duration of the renders of a value in milliseconds.
+    """
+    function(value)
+    start = time.perf_counter()
+    for i in range(renders):
+        function(value)
+    return 1000 * (time.perf_counter() - start) / renders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--words', type=int, nargs='+',
+                        default=[100, 500, 2000])
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args()
+
+    print('%s renders by entry' % options.renders)
+    print('%-18s %7s %11s %11s %9s' % (
+        'markup', 'words', 'built (ms)', 'reused (ms)', 'saving'))
+    for words in options.words:
+        markdown, restructuredtext = build_entry(words, options.seed)
+        for name, value, built, reused in (
+                ('markdown', markdown, markdown_built, markups.markdown),
+                ('restructuredtext', restructuredtext,
+                 restructuredtext_built, markups.restructuredtext)):
+            built = timed(built, value, options.renders)
+            reused = timed(reused, value, options.renders)
+            print('%-18s %7s %11.3f %11.3f %8.1f%%' % (
+                name, words, built, reused,
+                100 * (built - reused) / built))
+
+
+if __name__ == '__main__':
+    main()
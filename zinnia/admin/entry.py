@@ -1,8 +1,11 @@
 """EntryAdmin for Zinnia"""
 from __future__ import unicode_literals
 
+from functools import partial
+
 from django.contrib import admin
 from django.contrib.sites.models import Site
+from django.db import transaction
 from django.db.models import Q
 from django.urls import NoReverseMatch
 from django.urls import reverse
@@ -21,7 +24,11 @@ from zinnia.comparison import EntryPublishedVectorBuilder
 from zinnia.managers import HIDDEN
 from zinnia.managers import PUBLISHED
 from zinnia.models.author import Author
+from zinnia.navigation import flush_navigation_cache
 from zinnia.ping import DirectoryPinger
+from zinnia.scheduler import update_live_entries
+from zinnia.search.results import flush_results_cache
+from zinnia.search.suggestions import record_change
 
 
 class EntryAdmin(admin.ModelAdmin):
@@ -256,6 +263,7 @@ class EntryAdmin(admin.ModelAdmin):
         Set entries selected as published.
         """
         queryset.update(status=PUBLISHED)
+        update_live_entries()
         EntryPublishedVectorBuilder().cache_flush()
         self.ping_directories(request, queryset, messages=False)
         self.message_user(
@@ -267,6 +275,7 @@ class EntryAdmin(admin.ModelAdmin):
         Set entries selected as hidden.
         """
         queryset.update(status=HIDDEN)
+        update_live_entries()
         EntryPublishedVectorBuilder().cache_flush()
         self.message_user(
             request, _('The selected entries are now marked as hidden.'))
@@ -304,9 +313,14 @@ class EntryAdmin(admin.ModelAdmin):
 
     def put_on_top(self, request, queryset):
         """
-        Put the selected entries on top at the current date.
+        Put the selected entries on top at the current date,
+        flushing the caches ordered by publication date once
+        committed, as updating the queryset sends no signal.
         """
         queryset.update(publication_date=timezone.now())
+        transaction.on_commit(flush_navigation_cache)
+        transaction.on_commit(flush_results_cache)
+        transaction.on_commit(partial(record_change, 'entry'))
         self.ping_directories(request, queryset, messages=False)
         self.message_user(request, _(
             'The selected entries are now set at the current date.'))
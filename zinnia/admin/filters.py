@@ -1,6 +1,5 @@
 """Filters for Zinnia admin"""
 from django.contrib.admin import SimpleListFilter
-from django.db.models import Count
 from django.utils.encoding import smart_str
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext_lazy
@@ -20,9 +19,8 @@ class RelatedPublishedFilter(SimpleListFilter):
         """
         Return published objects with the number of entries.
         """
-        active_objects = self.model.published.all().annotate(
-            count_entries_published=Count('entries')).order_by(
-            '-count_entries_published', '-pk')
+        active_objects = self.model.published.annotate_count_entries_published(
+            ).order_by('-count_entries_published', '-pk')
         for active_object in active_objects:
             yield (
                 str(active_object.pk), ngettext_lazy(
@@ -12,15 +12,30 @@ class ZinniaConfig(AppConfig):
     verbose_name = _('Weblog')
 
     def ready(self):
+        from django.core.checks import Tags
+        from django.core.checks import register
         from django_comments.moderation import moderator
 
+        from zinnia.checks import check_live_entries
+        from zinnia.checks import check_search_index
+        from zinnia.checks import check_search_index_path
+        from zinnia.signals import connect_count_signals
         from zinnia.signals import connect_entry_signals
         from zinnia.signals import connect_discussion_signals
+        from zinnia.signals import connect_navigation_signals
+        from zinnia.signals import connect_search_signals
         from zinnia.moderator import EntryCommentModerator
 
         entry_klass = self.get_model('Entry')
         # Register the comment moderator on Entry
         moderator.register(entry_klass, EntryCommentModerator)
+        # Register the checks
+        register(check_search_index, Tags.database)
+        register(check_live_entries, Tags.database)
+        register(check_search_index_path)
         # Connect the signals
         connect_entry_signals()
         connect_discussion_signals()
+        connect_search_signals()
+        connect_count_signals()
+        connect_navigation_signals()
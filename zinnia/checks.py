@@ -0,0 +1,83 @@
+"""Checks for Zinnia"""
+from datetime import timedelta
+
+from django.core.checks import Error
+from django.core.checks import Warning
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from zinnia.scheduler import get_live_q
+from zinnia.search.backends.sqlite import INDEX_TABLE
+from zinnia.settings import SEARCH_BACKEND
+from zinnia.settings import SEARCH_INDEX_PATH
+
+SQLITE_SEARCH_BACKEND = 'zinnia.search.backends.sqlite'
+INVERTED_SEARCH_BACKEND = 'zinnia.search.backends.inverted'
+SEARCH_INDEX_MIGRATION = ('zinnia', '0007_entry_search_index')
+LIVE_ENTRIES_MIGRATION = ('zinnia', '0008_entry_is_live')
+LIVE_ENTRIES_DELAY = timedelta(hours=1)
+
+
+def check_search_index(app_configs=None, **kwargs):
+    """
+    Check that the FTS5 table used by the SQLite search backend
+    exists, because the migration skips it if FTS5 is unavailable.
+    """
+    if SEARCH_BACKEND != SQLITE_SEARCH_BACKEND or \
+       connection.vendor != 'sqlite':
+        return []
+    if SEARCH_INDEX_MIGRATION not in MigrationRecorder(
+            connection).applied_migrations():
+        return []
+    if INDEX_TABLE in connection.introspection.table_names():
+        return []
+    return [Error(
+        'The %s table used by the SQLite search backend is missing, '
+        'because FTS5 was not available when migrating.' % INDEX_TABLE,
+        hint='Use a SQLite library compiled with FTS5 and migrate '
+        'zinnia again from 0006, or select another backend '
+        'with ZINNIA_SEARCH_BACKEND.',
+        id='zinnia.E001')]
+
+
+def check_search_index_path(app_configs=None, **kwargs):
+    """
+    Check that the directory of the inverted index
+    is set when the inverted search backend is used.
+    """
+    if SEARCH_BACKEND != INVERTED_SEARCH_BACKEND or SEARCH_INDEX_PATH:
+        return []
+    return [Error(
+        'ZINNIA_SEARCH_INDEX_PATH is not set, but the inverted index '
+        'search backend needs a directory to store its files.',
+        hint='Set ZINNIA_SEARCH_INDEX_PATH to a writable directory '
+        'of the project, shared by all its processes.',
+        id='zinnia.E002')]
+
+
+def check_live_entries(app_configs=None, **kwargs):
+    """
+    Check that the entries whose publication started or ended
+    for more than LIVE_ENTRIES_DELAY have been flagged, because
+    only the update_live_entries command flags them.
+    """
+    from zinnia.models.entry import Entry
+    if LIVE_ENTRIES_MIGRATION not in MigrationRecorder(
+            connection).applied_migrations():
+        return []
+    now = timezone.now()
+    date = now - LIVE_ENTRIES_DELAY
+    if not Entry.objects.filter(
+            get_live_q(date), get_live_q(now), is_live=False).exists() and \
+       not Entry.objects.filter(
+            is_live=True, end_publication__lte=date).exists():
+        return []
+    return [Warning(
+        'Some entries whose publication started or ended more than '
+        '%s ago are not flagged as live or not live yet.' % (
+            LIVE_ENTRIES_DELAY),
+        hint='Run the update_live_entries command periodically, '
+        'for example with a cron job, to publish the scheduled '
+        'entries and to unpublish the expired entries.',
+        id='zinnia.W001')]
@@ -1,21 +1,55 @@
 """Comparison tools for Zinnia"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from math import log
 from math import sqrt
+from random import Random
+from random import random
+from time import time
+from uuid import uuid4
+from zlib import crc32
 
 from django.contrib.sites.models import Site
 from django.core.cache import InvalidCacheBackendError
 from django.core.cache import caches
+from django.db.models import F
 from django.utils.functional import cached_property
 from django.utils.html import strip_tags
 
 import regex as re
 
 from zinnia.models.entry import Entry
+from zinnia.settings import COMPARISON_EARLY_REFRESH
 from zinnia.settings import COMPARISON_FIELDS
+from zinnia.settings import COMPARISON_METHOD
+from zinnia.settings import COMPARISON_PRECOMPUTED
+from zinnia.settings import COMPARISON_PROCESSES
 from zinnia.settings import STOP_WORDS
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 
 PUNCTUATION = re.compile(r'\p{P}+')
 
+MERSENNE_PRIME = (1 << 31) - 1
+
+SCORE_DECIMALS = 12
+
+
+def clean_words(datas):
+    """
+    Clean raw datas and split them into words.
+    """
+    datas = strip_tags(datas)             # Remove HTML
+    datas = STOP_WORDS.rebase(datas, '')  # Remove STOP WORDS
+    datas = PUNCTUATION.sub('', datas)    # Remove punctuation
+    datas = datas.lower()
+    return [d for d in datas.split() if len(d) > 1]
+
 
 def pearson_score(list1, list2):
     """
@@ -36,6 +70,82 @@ def pearson_score(list1, list2):
     return num / den
 
 
+def pearson_matrix(vectors):
+    """
+    Center and normalize each row of a matrix of vectors,
+    so the Pearson's score between 2 rows is their dot product.
+    Rows with a null variance are filled with NaN.
+    """
+    matrix = numpy.array(vectors, dtype=numpy.float64)
+    if not matrix.size:
+        return numpy.full(matrix.shape, numpy.nan)
+    matrix -= matrix.mean(axis=1, keepdims=True)
+    norms = numpy.sqrt((matrix * matrix).sum(axis=1, keepdims=True))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        matrix /= norms
+    matrix[norms[:, 0] == 0] = numpy.nan
+    return matrix
+
+
+def cosine_score(vector1, vector2):
+    """
+    Compute the cosine score between 2 sparse vectors
+    of unit length, made of their indices and their weights.
+    """
+    weights = dict(zip(*vector1))
+    return sum([weights.get(i, 0.0) * w for i, w in zip(*vector2)])
+
+
+def minhash_score(signature1, signature2):
+    """
+    Estimate the Jaccard's score between the sets
+    of words of 2 objects from their MinHash signatures.
+    """
+    return sum([h1 == h2 for h1, h2 in zip(signature1, signature2)]
+               ) / float(len(signature1))
+
+
+def concatenate_ranges(starts, lengths):
+    """
+    Concatenate the ranges of indices defined by their starts and lengths.
+    """
+    return (numpy.arange(lengths.sum()) +
+            numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths))
+
+
+def top_related(ids, scores, candidates, number=None):
+    """
+    Return the ids of the candidates with the highest scores,
+    ordered by score and id, by using a partial sort of the scores.
+
+    The scores are rounded, so the scores of tied objects differing
+    by the rounding errors of the matrix products are still ordered
+    by id, as in the pure Python version.
+    """
+    scores = numpy.round(scores, SCORE_DECIMALS)
+    if number and number < len(candidates):
+        top = numpy.argpartition(-scores[candidates], number - 1)
+        threshold = scores[candidates[top[:number]]].min()
+        candidates = candidates[scores[candidates] >= threshold]
+
+    related = sorted(((ids[i], float(scores[i])) for i in candidates),
+                     key=lambda k_v: (k_v[1], k_v[0]), reverse=True)
+    return related[:number]
+
+
+def update_words_total(words_total, words_item_total, sign):
+    """
+    Add or remove the count of words of an object
+    to the total count of words.
+    """
+    for word, count in words_item_total.items():
+        total = words_total.get(word, 0) + sign * count
+        if total > 0:
+            words_total[word] = total
+        else:
+            words_total.pop(word, None)
+
+
 class ModelVectorBuilder(object):
     """
     Build a list of vectors based on a Queryset.
@@ -43,6 +153,9 @@ class ModelVectorBuilder(object):
     limit = None
     fields = None
     queryset = None
+    update_field = None
+    processes = 1
+    chunk_size = 1000
 
     def __init__(self, **kwargs):
         self.limit = kwargs.pop('limit', self.limit)
@@ -53,14 +166,34 @@ class ModelVectorBuilder(object):
         """
         Return a list of the most related objects to instance.
         """
-        related_pks = self.compute_related(instance.pk)[:number]
+        related_pks = self.compute_related(instance.pk, number=number)
         related_pks = [pk for pk, score in related_pks]
         related_objects = sorted(
             self.queryset.model.objects.filter(pk__in=related_pks),
             key=lambda x: related_pks.index(x.pk))
         return related_objects
 
-    def compute_related(self, object_id, score=pearson_score):
+    def get_related_many(self, instances, number):
+        """
+        Return the lists of the most related objects to several
+        instances by their pks, fetching all the objects at once.
+        """
+        related_pks = self.compute_related_many(
+            [instance.pk for instance in instances], number=number)
+        related_objects = self.queryset.model.objects.in_bulk(set(
+            pk for related in related_pks.values() for pk, score in related))
+        return dict((object_id, [related_objects[pk] for pk, score in related
+                                 if pk in related_objects])
+                    for object_id, related in related_pks.items())
+
+    def compute_related_many(self, object_ids, number=None):
+        """
+        Compute the most related pks to several objects' pks.
+        """
+        return dict((object_id, self.compute_related(object_id, number=number))
+                    for object_id in object_ids)
+
+    def compute_related(self, object_id, score=pearson_score, number=None):
         """
         Compute the most related pks to an object's pk.
         """
@@ -78,7 +211,7 @@ class ModelVectorBuilder(object):
                     pass
         related = sorted(object_related.items(),
                          key=lambda k_v: (k_v[1], k_v[0]), reverse=True)
-        return related
+        return related[:number]
 
     @cached_property
     def raw_dataset(self):
@@ -86,54 +219,225 @@ class ModelVectorBuilder(object):
         Generate a raw dataset based on the queryset
         and the specified fields.
         """
-        dataset = {}
-        queryset = self.queryset.values_list(*(['pk'] + self.fields))
+        queryset = self.queryset.all()
         if self.limit:
             queryset = queryset[:self.limit]
-        for item in queryset:
+        return self.build_raw_dataset(queryset)
+
+    def build_raw_dataset(self, queryset):
+        """
+        Clean the specified fields of the objects of a queryset,
+        by streaming the rows by chunks.
+
+        With more than one process, the chunks are cleaned in
+        a pool of processes, unless ``raw_clean`` is overridden.
+        """
+        fields = ['pk'] + self.fields
+        if self.update_field:
+            fields.append(self.update_field)
+        rows = queryset.values_list(*fields).iterator(
+            chunk_size=self.chunk_size)
+
+        executor = None
+        if self.processes > 1 and (
+                type(self).raw_clean is ModelVectorBuilder.raw_clean):
+            executor = ProcessPoolExecutor(self.processes)
+        dataset = {}
+        try:
+            chunk = list(islice(rows, self.chunk_size))
+            while chunk:
+                dataset.update(self.clean_chunk(chunk, executor))
+                chunk = list(islice(rows, self.chunk_size))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return dataset
+
+    def clean_chunk(self, chunk, executor=None):
+        """
+        Clean a chunk of rows, excepting the rows
+        whose words are already known for their last update.
+        """
+        datas = {}
+        versions = {}
+        for item in chunk:
             item = list(item)
             item_pk = item.pop(0)
-            datas = ' '.join(map(str, item))
-            dataset[item_pk] = self.raw_clean(datas)
-        return dataset
+            if self.update_field:
+                versions[item_pk] = item.pop()
+            datas[item_pk] = ' '.join(map(str, item))
+
+        words = self.get_cached_words(versions)
+        missing = [item_pk for item_pk in datas if item_pk not in words]
+        if executor is not None:
+            cleaned = executor.map(
+                clean_words, [datas[item_pk] for item_pk in missing],
+                chunksize=max(len(missing) // (self.processes * 4), 1))
+        else:
+            cleaned = [self.raw_clean(datas[item_pk]) for item_pk in missing]
+        cleaned = dict(zip(missing, cleaned))
+        if versions:
+            self.set_cached_words(versions, cleaned)
+        words.update(cleaned)
+
+        return dict((item_pk, words[item_pk]) for item_pk in datas)
+
+    def get_cached_words(self, versions):
+        """
+        Return the words already cleaned for versions of objects.
+        """
+        return {}
+
+    def set_cached_words(self, versions, words):
+        """
+        Keep the words cleaned for versions of objects.
+        """
 
     def raw_clean(self, datas):
         """
         Apply a cleaning on raw datas.
         """
-        datas = strip_tags(datas)             # Remove HTML
-        datas = STOP_WORDS.rebase(datas, '')  # Remove STOP WORDS
-        datas = PUNCTUATION.sub('', datas)    # Remove punctuation
-        datas = datas.lower()
-        return [d for d in datas.split() if len(d) > 1]
+        return clean_words(datas)
+
+    def count_words(self, words):
+        """
+        Count the occurences of each word.
+        """
+        words_item_total = {}
+        for word in words:
+            words_item_total.setdefault(word, 0)
+            words_item_total[word] += 1
+        return words_item_total
 
     @cached_property
-    def columns_dataset(self):
+    def words_dataset(self):
         """
-        Generate the columns and the whole dataset.
+        Generate the count of words for each object
+        and the total count of words.
         """
         data = {}
         words_total = {}
 
         for instance, words in self.raw_dataset.items():
-            words_item_total = {}
-            for word in words:
-                words_total.setdefault(word, 0)
-                words_item_total.setdefault(word, 0)
-                words_total[word] += 1
-                words_item_total[word] += 1
-            data[instance] = words_item_total
+            data[instance] = self.count_words(words)
+            update_words_total(words_total, data[instance], 1)
+
+        return data, words_total
+
+    def build_columns(self, words_total):
+        """
+        Select the most used words as columns.
 
+        The words used as many times are selected alphabetically,
+        instead of in the order they were found, so an incremental
+        update selects the same columns as a full build.
+        """
         columns = sorted(words_total.keys(),
-                         key=lambda w: words_total[w],
-                         reverse=True)[:250]
-        columns = sorted(columns)
+                         key=lambda w: (-words_total[w], w))[:250]
+        return sorted(columns)
+
+    def build_vector(self, words_item_total, columns):
+        """
+        Build the vector of an object from its count of words.
+        """
+        return [words_item_total.get(word, 0) for word in columns]
+
+    @cached_property
+    def columns_dataset(self):
+        """
+        Generate the columns and the whole dataset.
+        """
+        return self.build_columns_dataset(self.words_dataset)
+
+    def build_columns_dataset(self, words_dataset):
+        """
+        Build the columns and the whole dataset
+        from the count of words.
+        """
+        data, words_total = words_dataset
+        columns = self.build_columns(words_total)
         dataset = {}
         for instance in data.keys():
-            dataset[instance] = [data[instance].get(word, 0)
-                                 for word in columns]
+            dataset[instance] = self.build_vector(data[instance], columns)
         return columns, dataset
 
+    def update_dataset(self, object_ids):
+        """
+        Update the datasets after the modification of some objects,
+        by only cleaning the modified objects.
+        """
+        words_dataset = self.words_dataset
+        dataset = self.dataset
+        changed_ids = self.update_words_dataset(words_dataset, object_ids)
+        if changed_ids:
+            columns_dataset = self.update_columns_dataset(
+                words_dataset, changed_ids)
+            if columns_dataset[1] is not dataset:
+                changed_ids = None  # All the vectors were built again
+            self.set_datasets(words_dataset, columns_dataset, changed_ids)
+
+    def update_words_dataset(self, words_dataset, object_ids):
+        """
+        Update the count of words of the modified objects,
+        and return the ids of the objects changed in the dataset.
+        """
+        data, words_total = words_dataset
+        object_ids = set(object_ids)
+        changed_ids = set()
+
+        if self.limit:
+            kept_ids = set(self.queryset.values_list(
+                'pk', flat=True)[:self.limit])
+            object_ids |= set(data.keys()) - kept_ids
+            object_ids |= kept_ids - set(data.keys())
+
+        for object_id in object_ids:
+            if object_id in data:
+                update_words_total(words_total, data.pop(object_id), -1)
+                changed_ids.add(object_id)
+
+        if self.limit:
+            object_ids &= kept_ids
+        if object_ids:
+            raw_dataset = self.build_raw_dataset(
+                self.queryset.filter(pk__in=object_ids))
+            for instance, words in raw_dataset.items():
+                data[instance] = self.count_words(words)
+                update_words_total(words_total, data[instance], 1)
+                changed_ids.add(instance)
+
+        return changed_ids
+
+    def update_columns_dataset(self, words_dataset, changed_ids):
+        """
+        Update the vectors of the changed objects, or build again
+        all the vectors if the columns have changed.
+        """
+        data, words_total = words_dataset
+        columns, dataset = self.columns_dataset
+        new_columns = self.build_columns(words_total)
+        if new_columns != columns:
+            return self.build_columns_dataset(words_dataset)
+
+        for object_id in changed_ids:
+            if object_id in data:
+                dataset[object_id] = self.build_vector(
+                    data[object_id], columns)
+            else:
+                dataset.pop(object_id, None)
+        return columns, dataset
+
+    def set_datasets(self, words_dataset, columns_dataset, changed_ids=None):
+        """
+        Replace the computed datasets and drop the values
+        computed from them. The changed ids are the objects
+        whose vectors have changed, or None for all the objects.
+        """
+        for attribute in ('raw_dataset', 'matrix', 'buckets'):
+            self.__dict__.pop(attribute, None)
+        self.__dict__['words_dataset'] = words_dataset
+        self.__dict__['columns_dataset'] = columns_dataset
+
     @property
     def columns(self):
         """
@@ -149,10 +453,419 @@ class ModelVectorBuilder(object):
         return self.columns_dataset[1]
 
 
+class VectorizedModelVectorBuilder(ModelVectorBuilder):
+    """
+    Vector builder computing the Pearson's scores
+    with a single matrix product, if NumPy is available.
+    """
+
+    @cached_property
+    def matrix(self):
+        """
+        Generate the ids of the dataset, their positions
+        and the centered and normalized matrix of their vectors.
+        """
+        dataset = self.dataset
+        ids = list(dataset.keys())
+        positions = dict((o_id, i) for i, o_id in enumerate(ids))
+        return ids, positions, pearson_matrix(
+            [dataset[o_id] for o_id in ids])
+
+    def compute_related(self, object_id, score=pearson_score, number=None):
+        """
+        Compute the most related pks to an object's pk,
+        by keeping the ordering of the pure Python version.
+        """
+        if numpy is None or score is not pearson_score:
+            return super(VectorizedModelVectorBuilder, self).compute_related(
+                object_id, score, number)
+
+        ids, positions, matrix = self.matrix
+        position = positions.get(object_id)
+        if position is None or not self.dataset[object_id]:
+            return []
+
+        scores = matrix.dot(matrix[position])
+        scores[position] = numpy.nan
+        candidates = numpy.flatnonzero(~numpy.isnan(scores))
+        return top_related(ids, scores, candidates, number)
+
+    def compute_related_many(self, object_ids, number=None):
+        """
+        Compute the most related pks to several objects' pks
+        with a single matrix product.
+        """
+        if numpy is None:
+            return super(VectorizedModelVectorBuilder,
+                         self).compute_related_many(object_ids, number)
+
+        ids, positions, matrix = self.matrix
+        related = dict((object_id, []) for object_id in object_ids)
+        object_ids = [object_id for object_id in related
+                      if object_id in positions and self.dataset[object_id]]
+        rows = [positions[object_id] for object_id in object_ids]
+        all_scores = matrix[rows].dot(matrix.T)
+        for object_id, position, scores in zip(object_ids, rows, all_scores):
+            scores[position] = numpy.nan
+            candidates = numpy.flatnonzero(~numpy.isnan(scores))
+            related[object_id] = top_related(ids, scores, candidates, number)
+        return related
+
+
+class TFIDFColumns(list):
+    """
+    Columns of the TF-IDF vectors, keeping the IDF weights
+    used to build the vectors and the number of objects
+    changed since these weights were computed.
+    """
+
+    def __init__(self, words, idf, changes=0):
+        super(TFIDFColumns, self).__init__(words)
+        self.idf = idf
+        self.changes = changes
+
+
+class TFIDFModelVectorBuilder(ModelVectorBuilder):
+    """
+    Vector builder storing the TF-IDF weights of the words
+    as sparse vectors and computing the cosine scores.
+
+    The columns are the words used in the most objects,
+    excepting the words used by a ratio of the objects
+    above ``max_df`` or in less than ``min_df`` objects.
+
+    The columns and the IDF weights are computed again with all
+    the vectors once ``idf_batch_size`` objects have changed,
+    the vectors of the objects changed meanwhile are built
+    with the current IDF weights.
+    """
+    max_columns = 10000
+    min_df = 1
+    max_df = 0.8
+    idf_batch_size = 100
+
+    def build_columns_dataset(self, words_dataset):
+        """
+        Build the columns and the sparse vectors of unit
+        length from the count of words.
+        """
+        data, words_total = words_dataset
+        documents = {}
+        for words_item_total in data.values():
+            for word in words_item_total:
+                documents[word] = documents.get(word, 0) + 1
+
+        total = len(data)
+        max_documents = max(self.max_df * total, self.min_df)
+        columns = sorted([w for w, df in documents.items()
+                          if self.min_df <= df <= max_documents],
+                         key=lambda w: (-documents[w], w))[:self.max_columns]
+        columns = sorted(columns)
+        columns = TFIDFColumns(columns, array('d', [
+            log((1.0 + total) / (1.0 + documents[word])) + 1.0
+            for word in columns]))
+        positions = dict((word, i) for i, word in enumerate(columns))
+
+        dataset = {}
+        for instance, words_item_total in data.items():
+            dataset[instance] = self.build_weights(
+                words_item_total, positions, columns.idf)
+        return columns, dataset
+
+    def build_weights(self, words_item_total, positions, idf):
+        """
+        Build the sparse vector of unit length of an object
+        from its count of words and the IDF weights.
+        """
+        vector = sorted([(positions[word], count * idf[positions[word]])
+                         for word, count in words_item_total.items()
+                         if word in positions])
+        norm = sqrt(sum([weight * weight for i, weight in vector]))
+        return (array('i', [i for i, weight in vector]),
+                array('d', [weight / norm for i, weight in vector]))
+
+    def update_columns_dataset(self, words_dataset, changed_ids):
+        """
+        Update the vectors of the changed objects with the current
+        IDF weights, or build again all the vectors with new IDF
+        weights once enough objects have changed.
+        """
+        data, words_total = words_dataset
+        columns, dataset = self.columns_dataset
+        idf = getattr(columns, 'idf', None)
+        changes = getattr(columns, 'changes', 0) + len(changed_ids)
+        if idf is None or changes >= self.idf_batch_size:
+            return self.build_columns_dataset(words_dataset)
+
+        positions = dict((word, i) for i, word in enumerate(columns))
+        for object_id in changed_ids:
+            if object_id in data:
+                dataset[object_id] = self.build_weights(
+                    data[object_id], positions, idf)
+            else:
+                dataset.pop(object_id, None)
+        return TFIDFColumns(columns, idf, changes), dataset
+
+    @cached_property
+    def matrix(self):
+        """
+        Generate the ids of the dataset, their positions and
+        the sparse matrix of their vectors stored by rows and by columns.
+        """
+        columns, dataset = self.columns_dataset
+        ids = list(dataset.keys())
+        positions = dict((o_id, i) for i, o_id in enumerate(ids))
+        lengths = numpy.array([len(dataset[o_id][0]) for o_id in ids],
+                              dtype=numpy.int64)
+        indptr = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        indices = numpy.concatenate(
+            [numpy.zeros(0, dtype=numpy.int32)] +
+            [numpy.frombuffer(dataset[o_id][0], dtype=numpy.int32)
+             for o_id in ids]).astype(numpy.int64)
+        data = numpy.concatenate(
+            [numpy.zeros(0, dtype=numpy.float64)] +
+            [numpy.frombuffer(dataset[o_id][1], dtype=numpy.float64)
+             for o_id in ids])
+        rows = numpy.repeat(numpy.arange(len(ids)), lengths)
+
+        order = numpy.argsort(indices, kind='stable')
+        colptr = numpy.searchsorted(indices[order],
+                                    numpy.arange(len(columns) + 1))
+        return ids, positions, (indptr, indices, data), (
+            colptr, rows[order], data[order])
+
+    def compute_related(self, object_id, score=cosine_score, number=None):
+        """
+        Compute the most related pks to an object's pk,
+        by only visiting the objects sharing words with it.
+        """
+        if numpy is None or score is not cosine_score:
+            vector = self.dataset.get(object_id)
+            if not vector or not len(vector[0]):
+                return []
+            object_related = {}
+            for o_id, o_vector in self.dataset.items():
+                if o_id != object_id:
+                    o_score = score(vector, o_vector)
+                    if o_score > 0:
+                        object_related[o_id] = o_score
+            related = sorted(object_related.items(),
+                             key=lambda k_v: (k_v[1], k_v[0]), reverse=True)
+            return related[:number]
+
+        ids, positions, by_rows, by_columns = self.matrix
+        position = positions.get(object_id)
+        if position is None:
+            return []
+        indptr, indices, data = by_rows
+        colptr, rows, values = by_columns
+
+        start, end = indptr[position], indptr[position + 1]
+        columns = indices[start:end]
+        starts = colptr[columns]
+        lengths = colptr[columns + 1] - starts
+        postings = concatenate_ranges(starts, lengths)
+        scores = numpy.bincount(
+            rows[postings],
+            weights=values[postings] * numpy.repeat(data[start:end], lengths),
+            minlength=len(ids))
+        scores[position] = 0.0
+        candidates = numpy.flatnonzero(scores > 0)
+        return top_related(ids, scores, candidates, number)
+
+    def compute_related_many(self, object_ids, number=None):
+        """
+        Compute the most related pks to several objects' pks,
+        by visiting the objects sharing words with them at once.
+        """
+        if numpy is None:
+            return super(TFIDFModelVectorBuilder, self).compute_related_many(
+                object_ids, number)
+
+        ids, positions, by_rows, by_columns = self.matrix
+        indptr, indices, data = by_rows
+        colptr, rows, values = by_columns
+        related = dict((object_id, []) for object_id in object_ids)
+        object_ids = [object_id for object_id in related
+                      if object_id in positions]
+        objects = numpy.array([positions[object_id]
+                               for object_id in object_ids], dtype=numpy.int64)
+
+        object_lengths = indptr[objects + 1] - indptr[objects]
+        entries = concatenate_ranges(indptr[objects], object_lengths)
+        columns = indices[entries]
+        starts = colptr[columns]
+        lengths = colptr[columns + 1] - starts
+        postings = concatenate_ranges(starts, lengths)
+        queries = numpy.repeat(numpy.repeat(
+            numpy.arange(len(objects)), object_lengths), lengths)
+        all_scores = numpy.bincount(
+            queries * len(ids) + rows[postings],
+            weights=values[postings] * numpy.repeat(data[entries], lengths),
+            minlength=len(objects) * len(ids)).reshape(len(objects), len(ids))
+
+        for object_id, position, scores in zip(object_ids, objects,
+                                               all_scores):
+            scores[position] = 0.0
+            candidates = numpy.flatnonzero(scores > 0)
+            related[object_id] = top_related(ids, scores, candidates, number)
+        return related
+
+
+class MinHashModelVectorBuilder(ModelVectorBuilder):
+    """
+    Vector builder storing the MinHash signatures of the sets
+    of words and finding the related objects with a
+    Locality-Sensitive Hashing index.
+
+    The signatures are split into ``bands`` of ``rows`` hashes,
+    and only the objects sharing a band with an object are scored.
+    Two objects with a Jaccard's score ``s`` are compared with a
+    probability of ``1 - (1 - s ** rows) ** bands``, so more bands
+    or less rows improve the recall, at the cost of more candidates.
+    """
+    bands = 20
+    rows = 3
+    seed = 42
+
+    @cached_property
+    def hash_functions(self):
+        """
+        Generate the coefficients of the hash functions,
+        drawn with a fixed seed to be reproducible.
+        """
+        random = Random(self.seed)
+        return [(random.randint(1, MERSENNE_PRIME - 1),
+                 random.randint(0, MERSENNE_PRIME - 1))
+                for i in range(self.bands * self.rows)]
+
+    def build_vector(self, words_item_total, columns):
+        """
+        Build the MinHash signature of an object from its words.
+        """
+        if not words_item_total:
+            return array('q')
+        hashes = [crc32(word.encode('utf-8')) % MERSENNE_PRIME
+                  for word in words_item_total]
+        if numpy is None:
+            return array('q', [
+                min([(a * h + b) % MERSENNE_PRIME for h in hashes])
+                for a, b in columns])
+        coefficients = numpy.array(columns, dtype=numpy.int64)
+        signature = (numpy.outer(numpy.array(hashes, dtype=numpy.int64),
+                                 coefficients[:, 0]) +
+                     coefficients[:, 1]) % MERSENNE_PRIME
+        return array('q', signature.min(axis=0).tolist())
+
+    def build_columns_dataset(self, words_dataset):
+        """
+        Build the signatures of all the objects.
+        """
+        data, words_total = words_dataset
+        columns = self.hash_functions
+        dataset = {}
+        for instance, words_item_total in data.items():
+            dataset[instance] = self.build_vector(words_item_total, columns)
+        return columns, dataset
+
+    def update_columns_dataset(self, words_dataset, changed_ids):
+        """
+        Update the signatures of the changed objects only,
+        because the signatures are independent.
+        """
+        data, words_total = words_dataset
+        columns, dataset = self.columns_dataset
+        for object_id in changed_ids:
+            if object_id in data:
+                dataset[object_id] = self.build_vector(
+                    data[object_id], columns)
+            else:
+                dataset.pop(object_id, None)
+        return columns, dataset
+
+    def get_bands(self, signature):
+        """
+        Split a signature into the keys of its buckets.
+        """
+        rows = self.rows
+        return [(band, tuple(signature[band * rows:(band + 1) * rows]))
+                for band in range(len(signature) // rows)]
+
+    @cached_property
+    def buckets(self):
+        """
+        Generate the index of the objects by bucket.
+        """
+        buckets = {}
+        for o_id, signature in self.dataset.items():
+            for bucket in self.get_bands(signature):
+                buckets.setdefault(bucket, []).append(o_id)
+        return buckets
+
+    def compute_related(self, object_id, score=minhash_score, number=None):
+        """
+        Compute the most related pks to an object's pk,
+        by only scoring the objects sharing a bucket with it.
+        """
+        signature = self.dataset.get(object_id)
+        if not signature:
+            return []
+
+        buckets = self.buckets
+        candidates = set()
+        for bucket in self.get_bands(signature):
+            candidates.update(buckets.get(bucket, ()))
+        candidates.discard(object_id)
+
+        object_related = {}
+        for o_id in candidates:
+            o_score = score(signature, self.dataset[o_id])
+            if o_score > 0:
+                object_related[o_id] = o_score
+        related = sorted(object_related.items(),
+                         key=lambda k_v: (k_v[1], k_v[0]), reverse=True)
+        return related[:number]
+
+
+COMPARISON_VECTOR_BUILDERS = {
+    'pearson': VectorizedModelVectorBuilder,
+    'tfidf': TFIDFModelVectorBuilder,
+    'minhash': MinHashModelVectorBuilder,
+}
+
+
 class CachedModelVectorBuilder(ModelVectorBuilder):
     """
     Cached version of VectorBuilder.
+
+    The datasets and the lists of related objects of each object
+    are stored in their own keys, prefixed by a generation token,
+    so the cache is flushed by only writing a new generation token.
+    An incremental update keeps the generation and only deletes the
+    related objects of the changed objects and of the
+    ``related_refresh`` objects the most related to them before and
+    after the update. A new generation is written instead if an
+    object has left the dataset, because it can still be in the
+    related objects of any other object.
+
+    A missing dataset is rebuilt by a single process holding a lock,
+    while the others use the dataset of the previous generation,
+    or an empty dataset if there is none.
+    With ``early_refresh`` greater than 0, a dataset is randomly
+    rebuilt before its expiration, more likely when its expiration
+    is close and its computation long.
+
+    With an ``update_field``, the words cleaned for each version of
+    the objects are kept across the generations, in a key by chunk
+    of ``words_chunk_size`` consecutive pks, so an update only
+    rewrites the chunks of the changed objects.
     """
+    datasets = ('words_dataset', 'columns_dataset')
+    lock_timeout = 300
+    related_refresh = 20
+    early_refresh = 0
+    compute_when_locked = False
+    words_chunk_size = 50
 
     @property
     def cache_backend(self):
@@ -173,18 +886,132 @@ class CachedModelVectorBuilder(ModelVectorBuilder):
         """
         return self.__class__.__name__
 
+    @property
+    def generation_key(self):
+        """
+        Key of the generation token in the cache.
+        """
+        return '%s:generation' % self.cache_key
+
+    @property
+    def previous_generation_key(self):
+        """
+        Key of the previous generation token in the cache.
+        """
+        return '%s:previous_generation' % self.cache_key
+
+    @property
+    def version_key(self):
+        """
+        Key of the token renewed each time the datasets are written.
+        """
+        return '%s:version' % self.cache_key
+
+    @property
+    def generation(self):
+        """
+        Current generation token, created if missing.
+        """
+        generation = self.cache_backend.get(self.generation_key)
+        if generation is None:
+            self.cache_backend.add(self.generation_key, uuid4().hex, None)
+            generation = self.cache_backend.get(self.generation_key)
+        return generation
+
+    def renew_generation(self, generation=None):
+        """
+        Write a new generation token and keep the previous one.
+        """
+        generation = generation or uuid4().hex
+        tokens = {self.generation_key: generation}
+        previous_generation = self.cache_backend.get(self.generation_key)
+        if previous_generation is not None:
+            tokens[self.previous_generation_key] = previous_generation
+        self.cache_backend.set_many(tokens, None)
+        return generation
+
+    def make_key(self, generation, name):
+        """
+        Key for a value of a generation.
+        """
+        return '%s:%s:%s' % (self.cache_key, generation, name)
+
+    def is_expiring(self, delta, expiry):
+        """
+        Decide if a dataset computed in delta seconds and
+        expiring at expiry must be rebuilt before its expiration.
+        """
+        if not self.early_refresh or expiry is None:
+            return False
+        return time() - delta * self.early_refresh * log(
+            1.0 - random()) >= expiry
+
     def get_cache(self):
         """
-        Get the cache from cache.
+        Get the datasets of the current generation from cache,
+        reusing the datasets already loaded by this instance
+        if they have not been written since.
+        The expiring datasets are kept apart as stale datasets.
         """
-        return self.cache_backend.get(self.cache_key, {})
+        tokens = self.cache_backend.get_many(
+            [self.generation_key, self.version_key])
+        generation = tokens.get(self.generation_key) or self.generation
+        version = tokens.get(self.version_key)
+        loaded_generation, datasets = self.__dict__.get(
+            'loaded_datasets', (None, {}))
+        if (generation != loaded_generation or
+                version != self.__dict__.get('loaded_version')):
+            keys = dict((self.make_key(generation, name), name)
+                        for name in self.datasets)
+            datasets = {}
+            stale_datasets = {}
+            deltas = {}
+            for key, (dataset, delta, expiry) in self.cache_backend.get_many(
+                    list(keys)).items():
+                deltas[keys[key]] = delta
+                if self.is_expiring(delta, expiry):
+                    stale_datasets[keys[key]] = dataset
+                else:
+                    datasets[keys[key]] = dataset
+            self.__dict__['loaded_datasets'] = (generation, datasets)
+            self.__dict__['loaded_version'] = version
+            self.__dict__['loaded_deltas'] = deltas
+            self.__dict__['stale_datasets'] = stale_datasets
+        return datasets
+
+    def write_datasets(self, generation, value):
+        """
+        Write the datasets of a generation in cache, with the time
+        spent computing them since the start of the update, or the
+        time spent by their last computation if longer, as an update
+        is faster than the computation made when they expire.
+        """
+        now = time()
+        timeout = self.cache_backend.default_timeout
+        expiry = timeout and now + timeout
+        elapsed = now - self.__dict__.get('update_start', now)
+        deltas = dict(
+            (name, max(elapsed, self.__dict__.get(
+                'loaded_deltas', {}).get(name, 0)))
+            for name in value)
+        version = uuid4().hex
+        self.cache_backend.set_many(dict(
+            (self.make_key(generation, name), (dataset, deltas[name], expiry))
+            for name, dataset in value.items()), timeout)
+        self.cache_backend.set(self.version_key, version, None)
+        self.__dict__['loaded_datasets'] = (generation, dict(value))
+        self.__dict__['loaded_version'] = version
+        self.__dict__['loaded_deltas'] = deltas
+        self.__dict__['stale_datasets'] = {}
 
     def set_cache(self, value):
         """
-        Assign the cache in cache.
+        Assign the datasets in cache, under a new generation,
+        so the values computed from the previous datasets are dropped.
         """
-        value.update(self.cache)
-        return self.cache_backend.set(self.cache_key, value)
+        generation = uuid4().hex
+        self.write_datasets(generation, value)
+        self.renew_generation(generation)
 
     cache = property(get_cache, set_cache)
 
@@ -192,43 +1019,411 @@ class CachedModelVectorBuilder(ModelVectorBuilder):
         """
         Flush the cache for this instance.
         """
-        return self.cache_backend.delete(self.cache_key)
+        self.__dict__.pop('loaded_datasets', None)
+        self.renew_generation()
 
-    def get_related(self, instance, number):
+    def get_stale_dataset(self, name):
+        """
+        Get an expiring dataset or the dataset
+        of the previous generation if available.
+        """
+        stale_datasets = self.__dict__.get('stale_datasets', {})
+        if name in stale_datasets:
+            return stale_datasets[name]
+        previous_generation = self.cache_backend.get(
+            self.previous_generation_key)
+        if previous_generation is not None:
+            stale = self.cache_backend.get(
+                self.make_key(previous_generation, name))
+            if stale is not None:
+                return stale[0]
+
+    def is_rebuilding(self):
         """
-        Implement high level cache system for get_related.
+        Check if another process is rebuilding
+        a dataset missing in the cache.
         """
         cache = self.cache
-        cache_key = '%s:%s' % (instance.pk, number)
-        if cache_key not in cache:
-            related_objects = super(CachedModelVectorBuilder,
+        generation = self.__dict__['loaded_datasets'][0]
+        lock_keys = [self.make_key(generation, 'lock:%s' % name)
+                     for name in self.datasets if name not in cache]
+        return bool(lock_keys and self.cache_backend.get_many(lock_keys))
+
+    def get_empty_dataset(self, name):
+        """
+        Empty dataset used while another process is computing it.
+        """
+        if name == 'words_dataset':
+            return {}, {}
+        return [], {}
+
+    def get_cached_dataset(self, name):
+        """
+        Get a dataset from cache, or compute and cache it
+        if no other process is already computing it.
+
+        Otherwise the stale dataset is used if available, or an
+        empty dataset which is neither cached nor used to compute
+        the other datasets, unless ``compute_when_locked`` is set.
+        """
+        cache = self.cache
+        if name in cache:
+            return cache[name]
+
+        generation = self.__dict__['loaded_datasets'][0]
+        lock_key = self.make_key(generation, 'lock:%s' % name)
+        if not self.cache_backend.add(lock_key, True, self.lock_timeout):
+            dataset = self.get_stale_dataset(name)
+            if dataset is None and not self.compute_when_locked:
+                self.__dict__['incomplete'] = True
+                return self.get_empty_dataset(name)
+            if dataset is not None:
+                self.__dict__['stale'] = True
+            if dataset is None:
+                dataset = getattr(super(CachedModelVectorBuilder, self),
+                                  name)
+            cache[name] = dataset
+            return dataset
+
+        try:
+            start = time()
+            dataset = getattr(super(CachedModelVectorBuilder, self), name)
+            if self.__dict__.get('incomplete'):
+                return dataset
+            timeout = self.cache_backend.default_timeout
+            delta = time() - start
+            self.cache_backend.set(
+                self.make_key(generation, name),
+                (dataset, delta, timeout and time() + timeout),
+                timeout)
+            self.__dict__.setdefault('loaded_deltas', {})[name] = delta
+        finally:
+            self.cache_backend.delete(lock_key)
+        cache[name] = dataset
+        return dataset
+
+    def words_key(self, chunk):
+        """
+        Key of the words cleaned for the versions of a chunk
+        of objects, kept across the generations.
+        """
+        return '%s:words:%s' % (self.cache_key, chunk)
+
+    def words_chunk(self, object_id):
+        """
+        Chunk of the cleaned words containing an object.
+        """
+        return object_id // self.words_chunk_size
+
+    @cached_property
+    def cached_words(self):
+        """
+        Words cleaned for the versions of the objects,
+        by chunk of objects, loaded from cache when needed.
+        """
+        return {}
+
+    def load_cached_words(self, object_ids):
+        """
+        Load from cache the chunks of cleaned words
+        containing some objects, if not already loaded.
+        """
+        cached_words = self.cached_words
+        keys = dict((self.words_key(chunk), chunk) for chunk in set(
+            self.words_chunk(object_id) for object_id in object_ids)
+            if chunk not in cached_words)
+        if keys:
+            loaded = self.cache_backend.get_many(list(keys))
+            for key, chunk in keys.items():
+                cached_words[chunk] = loaded.get(key, {})
+        return cached_words
+
+    def write_cached_words(self):
+        """
+        Write in cache the chunks of cleaned words which have changed.
+        """
+        changed_chunks = self.__dict__.pop('changed_chunks', set())
+        if changed_chunks:
+            cached_words = self.cached_words
+            self.cache_backend.set_many(dict(
+                (self.words_key(chunk), cached_words[chunk])
+                for chunk in changed_chunks))
+
+    def delete_cached_words(self, object_ids):
+        """
+        Drop the cleaned words of objects not in the queryset anymore.
+        """
+        cached_words = self.load_cached_words(object_ids)
+        changed_chunks = self.__dict__.setdefault('changed_chunks', set())
+        for object_id in object_ids:
+            chunk = self.words_chunk(object_id)
+            if cached_words[chunk].pop(object_id, None) is not None:
+                changed_chunks.add(chunk)
+
+    def get_cached_words(self, versions):
+        """
+        Get from cache the words already cleaned for versions of objects.
+        """
+        cached_words = self.load_cached_words(versions)
+        words = {}
+        for object_id, version in versions.items():
+            cached = cached_words[self.words_chunk(object_id)].get(object_id)
+            if cached is not None and cached[0] == version:
+                words[object_id] = cached[1]
+        return words
+
+    def set_cached_words(self, versions, words):
+        """
+        Keep the words cleaned for versions of objects,
+        written in cache once the raw dataset is built.
+        """
+        cached_words = self.load_cached_words(words)
+        changed_chunks = self.__dict__.setdefault('changed_chunks', set())
+        for object_id, object_words in words.items():
+            chunk = self.words_chunk(object_id)
+            cached_words[chunk][object_id] = (versions[object_id],
+                                              object_words)
+            changed_chunks.add(chunk)
+
+    @cached_property
+    def raw_dataset(self):
+        """
+        Generate the raw dataset of all the objects, dropping
+        the cached words of the objects not in the queryset anymore.
+        """
+        self.__dict__['prune_words'] = True
+        return super(CachedModelVectorBuilder, self).raw_dataset
+
+    def build_raw_dataset(self, queryset):
+        """
+        Build the raw dataset and write the chunks of cleaned
+        words in cache if some of their objects have been cleaned.
+        """
+        dataset = super(CachedModelVectorBuilder, self).build_raw_dataset(
+            queryset)
+        if self.update_field:
+            if self.__dict__.pop('prune_words', False):
+                self.delete_cached_words([
+                    object_id for words in self.cached_words.values()
+                    for object_id in words if object_id not in dataset])
+            self.write_cached_words()
+        return dataset
+
+    def update_words_dataset(self, words_dataset, object_ids):
+        """
+        Update the count of words of the modified objects,
+        dropping the cached words of the removed objects.
+        """
+        changed_ids = super(CachedModelVectorBuilder,
+                            self).update_words_dataset(
+            words_dataset, object_ids)
+        if self.update_field:
+            self.delete_cached_words([object_id for object_id in changed_ids
+                                      if object_id not in words_dataset[0]])
+            self.write_cached_words()
+        return changed_ids
+
+    def get_related(self, instance, number):
+        """
+        Implement high level cache system for get_related,
+        returning the stale related objects or an empty list
+        while the datasets are rebuilt by another process.
+        The related objects computed with an incomplete
+        dataset are not cached.
+        """
+        name = 'related:%s' % instance.pk
+        cache_key = self.make_key(self.generation, name)
+        related = self.cache_backend.get(cache_key) or {}
+        if number not in related:
+            if self.is_rebuilding():
+                previous_generation = self.cache_backend.get(
+                    self.previous_generation_key)
+                if previous_generation is None:
+                    return []
+                return (self.cache_backend.get(self.make_key(
+                    previous_generation, name)) or {}).get(number, [])
+            related[number] = super(CachedModelVectorBuilder,
                                     self).get_related(instance, number)
-            cache[cache_key] = related_objects
-            self.cache = cache
-        return cache[cache_key]
+            if self.__dict__.get('incomplete'):
+                return related[number]
+            self.cache_backend.set(cache_key, related)
+        return related[number]
+
+    def get_related_many(self, instances, number):
+        """
+        Implement high level cache system for get_related_many,
+        only computing the related objects missing in the cache,
+        and not caching the related objects computed with an
+        incomplete dataset.
+        """
+        generation = self.generation
+        keys = dict((self.make_key(generation, 'related:%s' % instance.pk),
+                     instance) for instance in instances)
+        cached = self.cache_backend.get_many(list(keys))
+        related = dict((keys[key].pk, cached[key][number])
+                       for key in cached if number in cached[key])
+        missing = [instance for instance in keys.values()
+                   if instance.pk not in related]
+        if not missing:
+            return related
+
+        if self.is_rebuilding():
+            previous_generation = self.cache_backend.get(
+                self.previous_generation_key)
+            if previous_generation is None:
+                for instance in missing:
+                    related[instance.pk] = []
+                return related
+            stale_keys = dict((self.make_key(
+                previous_generation, 'related:%s' % instance.pk), instance)
+                for instance in missing)
+            stale = self.cache_backend.get_many(list(stale_keys))
+            for key, instance in stale_keys.items():
+                related[instance.pk] = stale.get(key, {}).get(number, [])
+            return related
+
+        computed = super(CachedModelVectorBuilder, self).get_related_many(
+            missing, number)
+        related.update(computed)
+        if self.__dict__.get('incomplete'):
+            return related
+        updated = {}
+        for object_id, related_objects in computed.items():
+            key = self.make_key(generation, 'related:%s' % object_id)
+            updated[key] = cached.get(key, {})
+            updated[key][number] = related_objects
+        self.cache_backend.set_many(updated)
+        return related
+
+    def delete_related(self, generation, object_ids):
+        """
+        Delete the related objects of the changed objects and of the
+        objects the most related to them, before and after the update.
+        """
+        object_ids = set(object_ids)
+        object_ids |= self.__dict__.get('related_ids', set())
+        object_ids |= self.get_related_ids(object_ids)
+        self.cache_backend.delete_many([
+            self.make_key(generation, 'related:%s' % object_id)
+            for object_id in object_ids])
 
     @property
     def columns_dataset(self):
         """
         Implement high level cache system for columns and dataset.
         """
-        cache = self.cache
-        cache_key = 'columns_dataset'
-        if cache_key not in cache:
-            columns_dataset = super(CachedModelVectorBuilder, self
-                                    ).columns_dataset
-            cache[cache_key] = columns_dataset
-            self.cache = cache
-        return cache[cache_key]
+        return self.get_cached_dataset('columns_dataset')
+
+    @property
+    def words_dataset(self):
+        """
+        Implement high level cache system for the count of words.
+        """
+        return self.get_cached_dataset('words_dataset')
+
+    @property
+    def matrix(self):
+        """
+        Implement high level cache system for the matrix of the vectors,
+        cached for the version of the datasets it is computed from,
+        unless these datasets are stale or incomplete.
+        """
+        self.columns_dataset
+        key = self.make_key(self.__dict__['loaded_datasets'][0],
+                            'matrix:%s' % self.__dict__.get('loaded_version'))
+        loaded_key, matrix = self.__dict__.get('loaded_matrix', (None, None))
+        if key == loaded_key:
+            return matrix
+        matrix = self.cache_backend.get(key)
+        if matrix is None:
+            self.__dict__.pop('matrix', None)
+            matrix = super(CachedModelVectorBuilder, self).matrix
+            if not (self.__dict__.get('incomplete') or
+                    self.__dict__.get('stale')):
+                self.cache_backend.set(key, matrix)
+        self.__dict__['loaded_matrix'] = (key, matrix)
+        return matrix
+
+    @property
+    def update_lock_key(self):
+        """
+        Key of the lock held while updating the cached datasets.
+        """
+        return '%s:lock:update' % self.cache_key
+
+    def update_dataset(self, object_ids):
+        """
+        Update the cached datasets if they are already computed,
+        reading them again while holding a lock, so concurrent
+        updates are not lost. The cache is flushed instead
+        if another process is updating the datasets.
+        """
+        if not self.cache_backend.add(self.update_lock_key, True,
+                                      self.lock_timeout):
+            return self.cache_flush()
+        try:
+            self.__dict__['update_start'] = time()
+            self.__dict__.pop('loaded_datasets', None)
+            self.__dict__.pop('cached_words', None)
+            if 'words_dataset' not in self.cache:
+                return self.cache_flush()
+            self.__dict__['related_ids'] = self.get_related_ids(object_ids)
+            return super(CachedModelVectorBuilder, self).update_dataset(
+                object_ids)
+        finally:
+            self.__dict__.pop('update_start', None)
+            self.__dict__.pop('related_ids', None)
+            self.cache_backend.delete(self.update_lock_key)
+
+    def get_related_ids(self, object_ids):
+        """
+        Return the ids of the objects the most related to some objects,
+        whose lists of related objects can include these objects.
+        """
+        related_ids = set()
+        for object_id in object_ids:
+            related_ids.update(pk for pk, score in self.compute_related(
+                object_id, number=self.related_refresh))
+        return related_ids
+
+    def set_datasets(self, words_dataset, columns_dataset, changed_ids=None):
+        """
+        Replace the cached datasets and drop the related objects
+        computed with the previous datasets, under a new generation
+        if all the vectors have changed or if an object has been
+        removed, otherwise by only deleting the related objects
+        affected by the changed objects.
+        """
+        if self.__dict__.get('incomplete'):
+            return self.cache_flush()
+        super(CachedModelVectorBuilder, self).set_datasets(
+            words_dataset, columns_dataset, changed_ids)
+        datasets = {'words_dataset': words_dataset,
+                    'columns_dataset': columns_dataset}
+        if changed_ids is None or set(changed_ids) - set(columns_dataset[1]):
+            self.cache = datasets
+            return
+        generation = self.__dict__['loaded_datasets'][0]
+        self.write_datasets(generation, datasets)
+        self.delete_related(generation, changed_ids)
 
 
-class EntryPublishedVectorBuilder(CachedModelVectorBuilder):
+class EntryPublishedVectorBuilder(
+        CachedModelVectorBuilder,
+        COMPARISON_VECTOR_BUILDERS[COMPARISON_METHOD]):
     """
-    Vector builder for published entries.
+    Vector builder for published entries,
+    using the comparison method of the settings.
+
+    The pearson method keeps its ceiling of the 100 most recent
+    entries, because it scans dense vectors of all the entries.
     """
-    limit = 100
     queryset = Entry.published
     fields = COMPARISON_FIELDS
+    update_field = 'last_update'
+    limit = COMPARISON_METHOD == 'pearson' and 100 or None
+    processes = COMPARISON_PROCESSES
+    early_refresh = COMPARISON_EARLY_REFRESH
 
     @property
     def cache_key(self):
@@ -237,3 +1432,51 @@ class EntryPublishedVectorBuilder(CachedModelVectorBuilder):
         """
         return '%s:%s' % (super(EntryPublishedVectorBuilder, self).cache_key,
                           Site.objects.get_current().pk)
+
+    def get_related(self, instance, number):
+        """
+        Return the similar entries stored by the
+        compute_similar_entries command if precomputed.
+        """
+        if COMPARISON_PRECOMPUTED:
+            return self.get_precomputed_related(instance, number)
+        return super(EntryPublishedVectorBuilder, self).get_related(
+            instance, number)
+
+    def get_related_many(self, instances, number):
+        """
+        Return the similar entries of several entries stored by
+        the compute_similar_entries command if precomputed.
+        """
+        if COMPARISON_PRECOMPUTED:
+            return self.get_precomputed_related_many(instances, number)
+        return super(EntryPublishedVectorBuilder, self).get_related_many(
+            instances, number)
+
+    def get_precomputed_related_many(self, instances, number):
+        """
+        Return the published entries the most similar to
+        several entries, with a single query on the stored scores.
+        """
+        related = dict((instance.pk, []) for instance in instances)
+        similar_entries = self.queryset.filter(
+            similar_to__entry__in=list(related),
+            similar_to__site=Site.objects.get_current()).annotate(
+            similar_entry=F('similar_to__entry'),
+            similar_score=F('similar_to__score')).order_by(
+            '-similar_score', '-pk')
+        for similar_entry in similar_entries:
+            entries = related[similar_entry.similar_entry]
+            if len(entries) < number:
+                entries.append(similar_entry)
+        return related
+
+    def get_precomputed_related(self, instance, number):
+        """
+        Return the published entries the most similar to
+        an entry, with an indexed query on the stored scores.
+        """
+        return list(self.queryset.filter(
+            similar_to__entry=instance,
+            similar_to__site=Site.objects.get_current()).order_by(
+            '-similar_to__score', '-pk')[:number])
@@ -0,0 +1,151 @@
+"""Counts of the published entries for Zinnia"""
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sites.models import Site
+from django.db import transaction
+from django.db.models import Count
+
+from tagging.models import TaggedItem
+
+from zinnia.models.counter import PublishedCount
+from zinnia.models.entry import Entry
+
+KINDS = (PublishedCount.CATEGORY, PublishedCount.AUTHOR, PublishedCount.TAG)
+
+
+def get_relations(kind):
+    """
+    Return the queryset relating the entries to the objects
+    of a kind, and the names of the entry and of the object
+    columns in this queryset.
+    """
+    if kind == PublishedCount.TAG:
+        return (TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Entry)),
+            'object_id', 'tag_id')
+    if kind == PublishedCount.CATEGORY:
+        return (Entry.categories.through.objects.all(),
+                'entry_id', 'category_id')
+    return (Entry.authors.through.objects.all(),
+            'entry_id', 'author_id')
+
+
+def get_kind(through):
+    """
+    Return the kind of the objects related to the entries
+    by a through model, or None if they are not counted.
+    """
+    if through is Entry.categories.through:
+        return PublishedCount.CATEGORY
+    if through is Entry.authors.through:
+        return PublishedCount.AUTHOR
+    return None
+
+
+def get_counted_objects(entry_pks):
+    """
+    Return the primary keys of the categories,
+    the authors and the tags of entries by kind.
+    """
+    objects = {}
+    for kind in KINDS:
+        relations, entry_column, object_column = get_relations(kind)
+        objects[kind] = set(relations.filter(
+            **{'%s__in' % entry_column: entry_pks}).values_list(
+            object_column, flat=True))
+    return objects
+
+
+def merge_counted_objects(*objects_list):
+    """
+    Return the union of the primary keys of objects by kind.
+    """
+    objects = dict((kind, set()) for kind in KINDS)
+    for counted_objects in objects_list:
+        for kind, object_ids in counted_objects.items():
+            objects[kind] |= set(object_ids)
+    return objects
+
+
+def count_entries_published(kind, site_id, object_ids=None):
+    """
+    Return the number of entries published on a site
+    by primary key of the objects of a kind.
+    """
+    relations, entry_column, object_column = get_relations(kind)
+    relations = relations.filter(**{
+        '%s__in' % entry_column: Entry.objects.filter(
+            is_live=True, sites=site_id).values('pk')})
+    if object_ids is not None:
+        relations = relations.filter(
+            **{'%s__in' % object_column: object_ids})
+    return dict(relations.order_by().values_list(object_column).annotate(
+        count=Count(entry_column)))
+
+
+def update_counts(objects):
+    """
+    Count again the entries published for the objects
+    given by kind, or for all the objects of a kind if None.
+    """
+    with transaction.atomic():
+        for site_id in Site.objects.values_list('pk', flat=True):
+            for kind, object_ids in objects.items():
+                if object_ids is not None and not object_ids:
+                    continue
+                counts = count_entries_published(kind, site_id, object_ids)
+                update_published_counts(site_id, kind, object_ids, counts)
+
+
+def update_published_counts(site_id, kind, object_ids, counts):
+    """
+    Write the counts of the objects of a kind on a site,
+    by locking and updating the existing rows, so concurrent
+    updates of the same objects wait for each other, and by
+    only inserting the missing rows.
+    """
+    previous = PublishedCount.objects.select_for_update().filter(
+        site=site_id, kind=kind)
+    if object_ids is not None:
+        previous = previous.filter(object_id__in=object_ids)
+    previous = dict((published_count.object_id, published_count)
+                    for published_count in previous)
+
+    PublishedCount.objects.filter(pk__in=[
+        published_count.pk for object_id, published_count
+        in previous.items() if object_id not in counts]).delete()
+    changed = []
+    for object_id, published_count in previous.items():
+        if object_id in counts and published_count.count != counts[object_id]:
+            published_count.count = counts[object_id]
+            changed.append(published_count)
+    PublishedCount.objects.bulk_update(changed, ['count'])
+
+    missing = dict((object_id, count) for object_id, count in counts.items()
+                   if object_id not in previous)
+    PublishedCount.objects.bulk_create([
+        PublishedCount(site_id=site_id, kind=kind,
+                       object_id=object_id, count=count)
+        for object_id, count in missing.items()], ignore_conflicts=True)
+    missing_by_count = {}
+    for object_id, count in missing.items():
+        missing_by_count.setdefault(count, []).append(object_id)
+    for count, missing_ids in missing_by_count.items():
+        PublishedCount.objects.filter(
+            site=site_id, kind=kind, object_id__in=missing_ids).exclude(
+            count=count).update(count=count)
+
+
+def update_entries_counts(entry_pks, *objects_list):
+    """
+    Count again the entries published for the objects
+    of entries, and for other objects given by kind.
+    """
+    update_counts(merge_counted_objects(
+        get_counted_objects(entry_pks), *objects_list))
+
+
+def rebuild_counts():
+    """
+    Count again the entries published for all the objects.
+    """
+    update_counts(dict((kind, None) for kind in KINDS))
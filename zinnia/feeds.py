@@ -24,6 +24,7 @@ from tagging.models import TaggedItem
 
 from zinnia.models.author import Author
 from zinnia.models.entry import Entry
+from zinnia.search.results import search_results
 from zinnia.settings import COPYRIGHT
 from zinnia.settings import FEEDS_FORMAT
 from zinnia.settings import FEEDS_MAX_ITEMS
@@ -326,7 +327,7 @@ class SearchEntries(EntryFeed):
         """
         Items are the published entries founds.
         """
-        return Entry.published.search(obj)[:self.limit]
+        return search_results(obj)[:self.limit]
 
     def link(self, obj):
         """
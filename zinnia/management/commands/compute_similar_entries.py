@@ -0,0 +1,78 @@
+"""
+Management command for precomputing the similar entries.
+"""
+import sys
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.encoding import smart_str
+
+from zinnia.comparison import EntryPublishedVectorBuilder
+from zinnia.models.entry import Entry
+from zinnia.models.similar import SimilarEntry
+
+
+class Command(BaseCommand):
+    """
+    Command for storing the most similar entries
+    of each published entry of the current site.
+    """
+    help = 'Compute and store the similar entries of the published entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--number', type=int, default=10,
+            help='Number of similar entries stored by entry.')
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of entries processed by transaction.')
+        parser.add_argument(
+            '--resume', action='store_true', default=False,
+            help='Skip the entries computed since the last update '
+            'of the published entries.')
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        number = options['number']
+        batch_size = options['batch_size']
+        computation_date = timezone.now()
+        site = Site.objects.get_current()
+
+        entry_ids = list(Entry.published.order_by(
+            'pk').values_list('pk', flat=True))
+        similar_entries = SimilarEntry.objects.filter(site=site)
+        similar_entries.exclude(entry__in=entry_ids).delete()
+        if options['resume'] and entry_ids:
+            last_update = Entry.published.aggregate(
+                last_update=Max('last_update'))['last_update']
+            computed_ids = set(similar_entries.filter(
+                computation_date__gte=last_update).values_list(
+                'entry', flat=True))
+            entry_ids = [pk for pk in entry_ids if pk not in computed_ids]
+
+        vectors = EntryPublishedVectorBuilder()
+        vectors.compute_when_locked = True
+        for i in range(0, len(entry_ids), batch_size):
+            batch_ids = entry_ids[i:i + batch_size]
+            with transaction.atomic():
+                similar_entries.filter(entry__in=batch_ids).delete()
+                SimilarEntry.objects.bulk_create([
+                    SimilarEntry(site=site, entry_id=entry_id,
+                                 similar_id=similar_id, score=score,
+                                 computation_date=computation_date)
+                    for entry_id in batch_ids
+                    for similar_id, score in vectors.compute_related(
+                        entry_id, number=number)])
+            self.write_out('%s/%s entries processed\n' % (
+                i + len(batch_ids), len(entry_ids)))
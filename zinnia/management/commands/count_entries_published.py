@@ -0,0 +1,32 @@
+"""
+Management command for re-counting the published entries.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.encoding import smart_str
+
+from zinnia.counters import rebuild_counts
+from zinnia.models.counter import PublishedCount
+
+
+class Command(BaseCommand):
+    """
+    Command for re-counting the published entries of the
+    categories, the authors and the tags in case of problems.
+    """
+    help = 'Refresh all the counts of published entries'
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        rebuild_counts()
+        self.write_out('%s counts of published entries\n' %
+                       PublishedCount.objects.count())
@@ -0,0 +1,52 @@
+"""
+Management command for counting the words of the entries.
+"""
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.encoding import smart_str
+
+from zinnia.models.entry import Entry
+
+
+class Command(BaseCommand):
+    """
+    Command for counting again the words and the reading time
+    of all the entries, by batches.
+    """
+    help = 'Refresh the word counts and the reading times of the entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of entries updated by query.')
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        batch_size = options['batch_size']
+        entries = Entry.objects.only(
+            'content', 'content_html', 'content_fingerprint',
+            'word_count', 'reading_time').order_by('pk').iterator(
+            chunk_size=batch_size)
+        total = 0
+        batch = list(islice(entries, batch_size))
+        while batch:
+            for entry in batch:
+                entry.update_word_count()
+            with transaction.atomic():
+                Entry.objects.bulk_update(
+                    batch, ['content_html', 'content_fingerprint',
+                            'word_count', 'reading_time'])
+            total += len(batch)
+            self.write_out('%s entries counted\n' % total)
+            batch = list(islice(entries, batch_size))
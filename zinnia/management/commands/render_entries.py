@@ -0,0 +1,73 @@
+"""
+Management command for rendering the entries in HTML.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.encoding import smart_str
+
+from zinnia.markups import markup_fingerprint
+from zinnia.models.entry import Entry
+from zinnia.models_bases.entry import PREVIEW_FIELDS
+from zinnia.preview import preview_fingerprint
+
+RENDERED_FIELDS = (
+    ('content', 'html_content', 'content_html', 'content_fingerprint'),
+    ('lead', 'html_lead', 'lead_html', 'lead_fingerprint'))
+COUNTED_FIELDS = ('word_count', 'reading_time')
+
+
+class Command(BaseCommand):
+    """
+    Command for rendering again in HTML the content, the lead,
+    the preview and the word count of the entries rendered
+    with other settings.
+    """
+    help = 'Render again the entries whose markup settings changed'
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        field_names = set(field.name for field in Entry._meta.get_fields())
+        rendered_fields = [fields for fields in RENDERED_FIELDS
+                           if set(fields[:1] + fields[2:]) <= field_names]
+        preview = set(PREVIEW_FIELDS) <= field_names
+        counted = set(COUNTED_FIELDS) <= field_names
+
+        rendered = 0
+        entries = Entry.objects.only('title', *[
+            field for fields in rendered_fields
+            for field in (fields[0], fields[2], fields[3])] + (
+                preview and ['preview_fingerprint'] or []))
+        for entry in entries.iterator():
+            values = {}
+            for field, html, html_field, fingerprint_field in \
+                    rendered_fields:
+                if markup_fingerprint(getattr(entry, field)) != getattr(
+                        entry, fingerprint_field):
+                    values[html_field] = getattr(entry, html)
+                    values[fingerprint_field] = getattr(
+                        entry, fingerprint_field)
+            if counted and 'content_html' in values:
+                entry.update_word_count()
+                for field in COUNTED_FIELDS:
+                    values[field] = getattr(entry, field)
+            if preview and preview_fingerprint(
+                    entry.content_fingerprint,
+                    getattr(entry, 'lead_fingerprint', '')) != \
+                    entry.preview_fingerprint:
+                entry.update_preview()
+                for field in PREVIEW_FIELDS:
+                    values[field] = getattr(entry, field)
+            if values:
+                Entry.objects.filter(pk=entry.pk).update(**values)
+                rendered += 1
+                self.write_out('- %s\n' % entry.title, 2)
+        self.write_out('%s entries rendered\n' % rendered)
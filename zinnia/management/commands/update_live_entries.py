@@ -0,0 +1,32 @@
+"""
+Management command for updating the live entries.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.encoding import smart_str
+
+from zinnia.scheduler import update_live_entries
+
+
+class Command(BaseCommand):
+    """
+    Command for flagging as live the entries whose
+    publication started and as not live the entries
+    whose publication ended, to run periodically.
+    """
+    help = 'Update the entries whose publication started or ended'
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        went_live, expired = update_live_entries()
+        self.write_out('%s entries went live, %s entries expired\n' % (
+            len(went_live), len(expired)))
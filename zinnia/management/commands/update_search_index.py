@@ -0,0 +1,59 @@
+"""
+Management command for building the search index.
+"""
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.encoding import smart_str
+
+from zinnia.models.entry import Entry
+from zinnia.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Command for building again the index
+    of the search backend with all the entries,
+    or for merging the changes made to the index.
+    """
+    help = 'Build the index of the search backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of entries indexed by query.')
+        parser.add_argument(
+            '--merge', action='store_true', default=False,
+            help='Merge the changes made to the index '
+            'instead of building it again.')
+
+    def write_out(self, message, verbosity_level=1):
+        """
+        Convenient method for outputing.
+        """
+        if self.verbosity and self.verbosity >= verbosity_level:
+            sys.stdout.write(smart_str(message))
+            sys.stdout.flush()
+
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get('verbosity', 1))
+        batch_size = options['batch_size']
+        backend = get_search_backend()
+        if options['merge']:
+            backend.merge_index()
+            self.write_out('Index merged\n')
+            return
+        entries = Entry.objects.order_by('pk').iterator(
+            chunk_size=batch_size)
+        total = 0
+        with transaction.atomic():
+            backend.clear_index()
+            batch = list(islice(entries, batch_size))
+            while batch:
+                backend.index_entries(batch)
+                total += len(batch)
+                self.write_out('%s entries indexed\n' % total)
+                batch = list(islice(entries, batch_size))
+        backend.merge_index()
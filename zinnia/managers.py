@@ -1,7 +1,6 @@
 """Managers of Zinnia"""
 from django.contrib.sites.models import Site
 from django.db import models
-from django.utils import timezone
 
 from zinnia.settings import SEARCH_FIELDS
 
@@ -14,25 +13,47 @@ def tags_published():
     """
     Return the published tags.
     """
+    from django.contrib.contenttypes.models import ContentType
     from tagging.models import Tag
+    from tagging.models import TaggedItem
     from zinnia.models.entry import Entry
-    tags_entry_published = Tag.objects.usage_for_queryset(
-        Entry.published.all())
-    # Need to do that until the issue #44 of django-tagging is fixed
-    return Tag.objects.filter(name__in=[t.name for t in tags_entry_published])
+    return Tag.objects.annotate(has_entries_published=models.Exists(
+        TaggedItem.objects.filter(
+            tag=models.OuterRef('pk'),
+            content_type=ContentType.objects.get_for_model(Entry),
+            object_id__in=Entry.published.values('pk')))).filter(
+        has_entries_published=True)
+
+
+def published_counts(kind):
+    """
+    Return the counts of the published entries of the objects
+    of a kind on the current site, for the object of the outer query.
+    """
+    from zinnia.models.counter import PublishedCount
+    return PublishedCount.objects.filter(
+        site=Site.objects.get_current(), kind=kind,
+        object_id=models.OuterRef('pk')).values('count')
+
+
+def tags_count_entries_published(min_count=None):
+    """
+    Return the published tags, with the number
+    of their entries published in the count attribute.
+    """
+    from tagging.models import Tag
+    return Tag.objects.annotate(count=models.Subquery(
+        published_counts('tag'),
+        output_field=models.IntegerField())).filter(
+        count__gte=max(min_count or 1, 1)).order_by('name')
 
 
 def entries_published(queryset):
     """
     Return only the entries published.
     """
-    now = timezone.now()
     return queryset.filter(
-        models.Q(start_publication__lte=now) |
-        models.Q(start_publication=None),
-        models.Q(end_publication__gt=now) |
-        models.Q(end_publication=None),
-        status=PUBLISHED, sites=Site.objects.get_current())
+        is_live=True, sites=Site.objects.get_current())
 
 
 class EntryPublishedManager(models.Manager):
@@ -96,13 +117,31 @@ class EntryRelatedPublishedManager(models.Manager):
         """
         Return a queryset containing published entries.
         """
-        now = timezone.now()
         return super(
-            EntryRelatedPublishedManager, self).get_queryset().filter(
-            models.Q(entries__start_publication__lte=now) |
-            models.Q(entries__start_publication=None),
-            models.Q(entries__end_publication__gt=now) |
-            models.Q(entries__end_publication=None),
-            entries__status=PUBLISHED,
-            entries__sites=Site.objects.get_current()
-            ).distinct()
+            EntryRelatedPublishedManager, self).get_queryset().annotate(
+            has_entries_published=models.Exists(
+                self.entries_published())).filter(
+            has_entries_published=True)
+
+    def entries_published(self):
+        """
+        Return the entries published of the object
+        of the outer query, for building subqueries.
+        """
+        relation = self.model._meta.get_field('entries')
+        return relation.related_model.objects.filter(
+            is_live=True, sites=Site.objects.get_current(),
+            **{relation.field.name: models.OuterRef('pk')}).order_by()
+
+    def annotate_count_entries_published(self):
+        """
+        Return a queryset containing published entries,
+        with the number of their entries published,
+        read from the counts of the published entries.
+        """
+        return super(
+            EntryRelatedPublishedManager, self).get_queryset().annotate(
+            count_entries_published=models.Subquery(
+                published_counts(self.model._meta.model_name),
+                output_field=models.IntegerField())).filter(
+            count_entries_published__gt=0)
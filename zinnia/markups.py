@@ -3,15 +3,69 @@ Set of" markup" function to transform plain text into HTML for Zinnia.
 Code originally provided by django.contrib.markups
 """
 import warnings
+from collections import OrderedDict
+from collections import namedtuple
+from hashlib import md5
+from threading import Lock
+from threading import local
 
+from django.core.cache import InvalidCacheBackendError
+from django.core.cache import caches
 from django.utils.encoding import force_bytes
 from django.utils.encoding import force_str
 from django.utils.html import linebreaks
 
 from zinnia.settings import MARKDOWN_EXTENSIONS
+from zinnia.settings import MARKUP_CACHE_SIZE
+from zinnia.settings import MARKUP_CACHE_TIMEOUT
 from zinnia.settings import MARKUP_LANGUAGE
 from zinnia.settings import RESTRUCTUREDTEXT_SETTINGS
 
+CACHE_KEY = 'zinnia:markup'
+
+MarkupCacheInfo = namedtuple(
+    'MarkupCacheInfo',
+    ['hits', 'shared_hits', 'misses', 'maxsize', 'currsize'])
+
+renderers = local()
+
+
+def get_renderer(name, key, build):
+    """
+    Return the renderer of the current thread for a configuration,
+    built on first use.
+    """
+    thread_renderers = renderers.__dict__.setdefault(name, {})
+    renderer = thread_renderers.get(key)
+    if renderer is None:
+        renderer = thread_renderers[key] = build()
+    return renderer
+
+
+def get_config_key(value):
+    """
+    Return a key identifying a value of a markdown extension
+    configuration, the functions being identified by their path
+    so the key is the same in all the processes.
+    """
+    if callable(value):
+        return '%s.%s' % (value.__module__, getattr(
+            value, '__qualname__', value.__class__.__qualname__))
+    return value
+
+
+def get_extension_key(extension):
+    """
+    Return a key identifying a markdown extension by its path,
+    or by its class and its configuration if it is an instance.
+    """
+    if isinstance(extension, str):
+        return extension
+    return ('%s.%s' % (extension.__class__.__module__,
+                       extension.__class__.__name__),
+            repr(sorted((name, get_config_key(value)) for name, value
+                        in extension.getConfigs().items())))
+
 
 def textile(value):
     """
@@ -33,6 +87,7 @@ def markdown(value, extensions=MARKDOWN_EXTENSIONS):
     that python-markdown supports.
     `extensions` is an iterable of either markdown.Extension instances
     or extension paths.
+    The Markdown instance is built once by thread and reset between uses.
     """
     try:
         import markdown
@@ -41,34 +96,49 @@ def markdown(value, extensions=MARKDOWN_EXTENSIONS):
                       RuntimeWarning)
         return value
 
-    return markdown.markdown(force_str(value), extensions=extensions)
+    renderer = get_renderer(
+        'markdown',
+        tuple(get_extension_key(extension) for extension in extensions),
+        lambda: markdown.Markdown(extensions=extensions))
+    return renderer.reset().convert(force_str(value))
 
 
 def restructuredtext(value, settings=RESTRUCTUREDTEXT_SETTINGS):
     """
     RestructuredText processing with optionnally custom settings.
+    The docutils publisher is built once by thread and reused.
     """
     try:
-        from docutils.core import publish_parts
+        from docutils.core import Publisher
+        from docutils.io import StringInput
+        from docutils.io import StringOutput
     except ImportError:
         warnings.warn("The Python docutils library isn't installed.",
                       RuntimeWarning)
         return value
 
-    parts = publish_parts(source=force_bytes(value),
-                          writer_name='html4css1',
-                          settings_overrides=settings)
-    return force_str(parts['fragment'])
+    def build():
+        publisher = Publisher(source_class=StringInput,
+                              destination_class=StringOutput)
+        publisher.set_components('standalone', 'restructuredtext',
+                                 'html4css1')
+        publisher.process_programmatic_settings(None, settings, None)
+        return publisher
 
+    publisher = get_renderer(
+        'restructuredtext', repr(sorted(settings.items())), build)
+    publisher.set_source(force_str(value))
+    publisher.set_destination()
+    publisher.publish()
+    return force_str(publisher.writer.parts['fragment'])
 
-def html_format(value):
+
+def render_html(value):
     """
-    Returns the value formatted in HTML,
+    Renders the value in HTML,
     depends on MARKUP_LANGUAGE setting.
     """
-    if not value:
-        return ''
-    elif MARKUP_LANGUAGE == 'markdown':
+    if MARKUP_LANGUAGE == 'markdown':
         return markdown(value)
     elif MARKUP_LANGUAGE == 'textile':
         return textile(value)
@@ -77,3 +147,118 @@ def html_format(value):
     elif '</p>' not in value:
         return linebreaks(value)
     return value
+
+
+def get_shared_cache():
+    """
+    Return the cache shared by the processes for the rendered markups.
+    """
+    try:
+        return caches['markup']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+class MarkupCache(object):
+    """
+    Values rendered in HTML, kept in a LRU by each process
+    in front of a cache shared by the processes, and keyed
+    by the fingerprint of the value and of the renderer.
+    """
+
+    def __init__(self, maxsize=MARKUP_CACHE_SIZE,
+                 timeout=MARKUP_CACHE_TIMEOUT):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.values = OrderedDict()
+        self.lock = Lock()
+        self.hits = self.shared_hits = self.misses = 0
+
+    def get_local(self, key):
+        """
+        Return the value of a key in the LRU of the process, or None.
+        """
+        with self.lock:
+            html = self.values.get(key)
+            if html is not None:
+                self.values.move_to_end(key)
+                self.hits += 1
+            return html
+
+    def set_local(self, key, html):
+        """
+        Keep the value of a key in the LRU of the process,
+        discarding the least recently used values.
+        """
+        with self.lock:
+            self.values[key] = html
+            self.values.move_to_end(key)
+            while len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+
+    def render(self, value):
+        """
+        Return the value rendered in HTML, from the LRU of
+        the process, else from the shared cache, else rendered.
+        """
+        if not self.maxsize and not self.timeout:
+            return render_html(value)
+
+        key = '%s:%s' % (CACHE_KEY, markup_fingerprint(value))
+        html = self.get_local(key) if self.maxsize else None
+        if html is None:
+            html = get_shared_cache().get(key) if self.timeout else None
+            if html is None:
+                html = render_html(value)
+                self.misses += 1
+                if self.timeout:
+                    get_shared_cache().set(key, html, self.timeout)
+            else:
+                self.shared_hits += 1
+            if self.maxsize:
+                self.set_local(key, html)
+        return html
+
+    def cache_info(self):
+        """
+        Return the counters of the hits in the LRU of the process,
+        of the hits in the shared cache and of the misses.
+        """
+        return MarkupCacheInfo(self.hits, self.shared_hits, self.misses,
+                               self.maxsize, len(self.values))
+
+    def cache_clear(self):
+        """
+        Clear the LRU of the process and its counters.
+        """
+        with self.lock:
+            self.values.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+
+markup_cache = MarkupCache()
+
+
+def html_format(value):
+    """
+    Returns the value formatted in HTML,
+    depends on MARKUP_LANGUAGE setting,
+    the values rendered being cached.
+    """
+    if not value:
+        return ''
+    return markup_cache.render(value)
+
+
+def markup_fingerprint(value):
+    """
+    Returns a fingerprint of the value and of the renderer,
+    depends on MARKUP_LANGUAGE, MARKDOWN_EXTENSIONS
+    and RESTRUCTUREDTEXT_SETTINGS settings.
+    """
+    extensions = [get_extension_key(extension)
+                  for extension in MARKDOWN_EXTENSIONS]
+    renderer = repr((MARKUP_LANGUAGE, extensions,
+                     sorted(RESTRUCTUREDTEXT_SETTINGS.items())))
+    return md5(force_bytes(renderer) + b'\0' +
+               force_bytes(value or '')).hexdigest()
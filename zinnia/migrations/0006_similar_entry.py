@@ -0,0 +1,45 @@
+import django.utils.timezone
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sites', '0002_alter_domain_unique'),
+        ('zinnia', '0005_category_mptt_update'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarEntry',
+            fields=[
+                ('id', models.AutoField(
+                    verbose_name='ID', serialize=False,
+                    auto_created=True, primary_key=True)),
+                ('score', models.FloatField(verbose_name='score')),
+                ('computation_date', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='computation date')),
+                ('entry', models.ForeignKey(
+                    on_delete=models.CASCADE,
+                    related_name='similar_entries', to='zinnia.Entry',
+                    verbose_name='entry')),
+                ('similar', models.ForeignKey(
+                    on_delete=models.CASCADE,
+                    related_name='similar_to', to='zinnia.Entry',
+                    verbose_name='similar entry')),
+                ('site', models.ForeignKey(
+                    on_delete=models.CASCADE,
+                    related_name='similar_entries', to='sites.Site',
+                    verbose_name='site')),
+            ],
+            options={
+                'verbose_name': 'similar entry',
+                'verbose_name_plural': 'similar entries',
+                'ordering': ['-score', '-similar_id'],
+                'unique_together': {('site', 'entry', 'similar')},
+                'index_together': {('site', 'entry', 'score')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE zinnia_entry_search ('
+            'entry_id integer PRIMARY KEY REFERENCES zinnia_entry (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)')
+        schema_editor.execute(
+            'CREATE INDEX zinnia_entry_search_document '
+            'ON zinnia_entry_search USING GIN (document)')
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                'CREATE VIRTUAL TABLE zinnia_entry_fts USING fts5(document)')
+        except OperationalError:  # FTS5 is not available
+            if getattr(settings, 'ZINNIA_SEARCH_BACKEND', None) == \
+               'zinnia.search.backends.sqlite':
+                raise ImproperlyConfigured(
+                    'The SQLite search backend requires a SQLite '
+                    'library compiled with FTS5.')
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS zinnia_entry_search')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS zinnia_entry_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zinnia', '0006_similar_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
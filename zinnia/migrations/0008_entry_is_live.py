@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def fill_is_live(apps, schema_editor):
+    entry_klass = apps.get_model('zinnia', 'Entry')
+    now = timezone.now()
+    entry_klass.objects.filter(
+        Q(start_publication__lte=now) | Q(start_publication=None),
+        Q(end_publication__gt=now) | Q(end_publication=None),
+        status=2).update(is_live=True)
+
+
+def unfill_is_live(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zinnia', '0007_entry_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='is_live',
+            field=models.BooleanField(
+                default=False, editable=False,
+                help_text='Published and within its publication period, '
+                          'updated by the publication scheduler.',
+                verbose_name='live'),
+        ),
+        migrations.AlterIndexTogether(
+            name='entry',
+            index_together=set([
+                ('slug', 'publication_date'),
+                ('status', 'publication_date',
+                 'start_publication', 'end_publication'),
+                ('is_live', 'publication_date')]),
+        ),
+        migrations.RunPython(fill_is_live, unfill_is_live)
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+
+
+def fill_published_counts(apps, schema_editor):
+    entry_klass = apps.get_model('zinnia', 'Entry')
+    count_klass = apps.get_model('zinnia', 'PublishedCount')
+    site_klass = apps.get_model('sites', 'Site')
+    content_type_klass = apps.get_model('contenttypes', 'ContentType')
+    tagged_item_klass = apps.get_model('tagging', 'TaggedItem')
+    content_type = content_type_klass.objects.filter(
+        app_label='zinnia', model='entry').first()
+
+    for site in site_klass.objects.all():
+        entries = entry_klass.objects.filter(
+            is_live=True, sites=site).values('pk')
+        relations = [
+            ('category', entry_klass.categories.through.objects.filter(
+                entry_id__in=entries), 'entry_id', 'category_id'),
+            ('author', entry_klass.authors.through.objects.filter(
+                entry_id__in=entries), 'entry_id', 'author_id')]
+        if content_type is not None:
+            relations.append(
+                ('tag', tagged_item_klass.objects.filter(
+                    content_type=content_type, object_id__in=entries),
+                 'object_id', 'tag_id'))
+        for kind, queryset, entry_column, object_column in relations:
+            count_klass.objects.bulk_create([
+                count_klass(site=site, kind=kind,
+                            object_id=object_id, count=count)
+                for object_id, count in queryset.order_by().values_list(
+                    object_column).annotate(count=Count(entry_column))])
+
+
+def unfill_published_counts(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('sites', '0002_alter_domain_unique'),
+        ('tagging', '0003_adapt_max_tag_length'),
+        ('zinnia', '0008_entry_is_live'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedCount',
+            fields=[
+                ('id', models.AutoField(
+                    verbose_name='ID', serialize=False,
+                    auto_created=True, primary_key=True)),
+                ('kind', models.CharField(
+                    max_length=10, verbose_name='kind',
+                    choices=[('category', 'category'),
+                             ('author', 'author'),
+                             ('tag', 'tag')])),
+                ('object_id', models.PositiveIntegerField(
+                    verbose_name='object id')),
+                ('count', models.PositiveIntegerField(
+                    default=0, verbose_name='count')),
+                ('site', models.ForeignKey(
+                    on_delete=models.CASCADE,
+                    related_name='published_counts', to='sites.Site',
+                    verbose_name='site')),
+            ],
+            options={
+                'verbose_name': 'published count',
+                'verbose_name_plural': 'published counts',
+                'unique_together': {('site', 'kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(fill_published_counts, unfill_published_counts)
+    ]
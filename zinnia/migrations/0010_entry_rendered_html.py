@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zinnia', '0009_published_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='content_html',
+            field=models.TextField(
+                blank=True, editable=False,
+                verbose_name='content in HTML'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='content_fingerprint',
+            field=models.CharField(
+                blank=True, editable=False, max_length=32,
+                verbose_name='content fingerprint'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='lead_html',
+            field=models.TextField(
+                blank=True, editable=False,
+                verbose_name='lead in HTML'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='lead_fingerprint',
+            field=models.CharField(
+                blank=True, editable=False, max_length=32,
+                verbose_name='lead fingerprint'),
+        ),
+    ]
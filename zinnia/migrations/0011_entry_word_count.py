@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zinnia', '0010_entry_rendered_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='word_count',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='word count'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='reading_time',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text='In minutes.',
+                verbose_name='reading time'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zinnia', '0011_entry_word_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='preview_html',
+            field=models.TextField(
+                blank=True, editable=False,
+                verbose_name='preview in HTML'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='preview_has_more',
+            field=models.BooleanField(
+                default=False, editable=False,
+                verbose_name='preview has more'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='preview_total_words',
+            field=models.PositiveIntegerField(
+                default=0, editable=False,
+                verbose_name='preview total words'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='preview_displayed_words',
+            field=models.IntegerField(
+                default=0, editable=False,
+                verbose_name='preview displayed words'),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='preview_fingerprint',
+            field=models.CharField(
+                blank=True, editable=False, max_length=32,
+                verbose_name='preview fingerprint'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+"""Published count model for Zinnia"""
+from django.contrib.sites.models import Site
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class PublishedCount(models.Model):
+    """
+    Number of entries published on a site for a category,
+    an author or a tag, maintained by the signals of the
+    entries and rebuilt by the count_entries_published command.
+    """
+    CATEGORY = 'category'
+    AUTHOR = 'author'
+    TAG = 'tag'
+    KIND_CHOICES = ((CATEGORY, _('category')),
+                    (AUTHOR, _('author')),
+                    (TAG, _('tag')))
+
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name='published_counts',
+        verbose_name=_('site'))
+
+    kind = models.CharField(
+        _('kind'), max_length=10, choices=KIND_CHOICES)
+
+    object_id = models.PositiveIntegerField(
+        _('object id'))
+
+    count = models.PositiveIntegerField(
+        _('count'), default=0)
+
+    def __str__(self):
+        return '%s %s: %s' % (self.kind, self.object_id, self.count)
+
+    class Meta:
+        """
+        PublishedCount's meta informations.
+        """
+        verbose_name = _('published count')
+        verbose_name_plural = _('published counts')
+        unique_together = [['site', 'kind', 'object_id']]
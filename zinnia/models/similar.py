@@ -0,0 +1,48 @@
+"""Similar entry model for Zinnia"""
+from django.contrib.sites.models import Site
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SimilarEntry(models.Model):
+    """
+    Score of similarity between two entries on a site,
+    precomputed by the compute_similar_entries command.
+    """
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name='similar_entries',
+        verbose_name=_('site'))
+
+    entry = models.ForeignKey(
+        'zinnia.Entry',
+        on_delete=models.CASCADE,
+        related_name='similar_entries',
+        verbose_name=_('entry'))
+
+    similar = models.ForeignKey(
+        'zinnia.Entry',
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name=_('similar entry'))
+
+    score = models.FloatField(
+        _('score'))
+
+    computation_date = models.DateTimeField(
+        _('computation date'), default=timezone.now)
+
+    def __str__(self):
+        return '%s ~ %s: %.3f' % (self.entry_id, self.similar_id, self.score)
+
+    class Meta:
+        """
+        SimilarEntry's meta informations.
+        """
+        ordering = ['-score', '-similar_id']
+        verbose_name = _('similar entry')
+        verbose_name_plural = _('similar entries')
+        unique_together = [['site', 'entry', 'similar']]
+        index_together = [['site', 'entry', 'score']]
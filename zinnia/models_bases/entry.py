@@ -1,4 +1,5 @@
 """Base entry models for Zinnia"""
+import math
 import os
 
 from django.contrib.sites.models import Site
@@ -23,15 +24,25 @@ from zinnia.managers import DRAFT, HIDDEN, PUBLISHED
 from zinnia.managers import EntryPublishedManager
 from zinnia.managers import entries_published
 from zinnia.markups import html_format
+from zinnia.markups import markup_fingerprint
+from zinnia.navigation import get_previous_next
 from zinnia.preview import HTMLPreview
+from zinnia.preview import StoredHTMLPreview
+from zinnia.preview import preview_fingerprint
+from zinnia.scheduler import get_publication_time
+from zinnia.scheduler import schedule_entry
 from zinnia.settings import AUTO_CLOSE_COMMENTS_AFTER
 from zinnia.settings import AUTO_CLOSE_PINGBACKS_AFTER
 from zinnia.settings import AUTO_CLOSE_TRACKBACKS_AFTER
 from zinnia.settings import ENTRY_CONTENT_TEMPLATES
 from zinnia.settings import ENTRY_DETAIL_TEMPLATES
+from zinnia.settings import READING_SPEED
 from zinnia.settings import UPLOAD_TO
 from zinnia.url_shortener import get_url_shortener
 
+PREVIEW_FIELDS = ['preview_html', 'preview_has_more', 'preview_total_words',
+                  'preview_displayed_words', 'preview_fingerprint']
+
 
 class CoreEntry(models.Model):
     """
@@ -76,6 +87,11 @@ class CoreEntry(models.Model):
         verbose_name=_('sites'),
         help_text=_('Sites where the entry will be published.'))
 
+    is_live = models.BooleanField(
+        _('live'), default=False, editable=False,
+        help_text=_('Published and within its publication period, '
+                    'updated by the publication scheduler.'))
+
     creation_date = models.DateTimeField(
         _('creation date'),
         default=timezone.now)
@@ -91,7 +107,7 @@ class CoreEntry(models.Model):
         """
         Checks if an entry is within his publication period.
         """
-        now = timezone.now()
+        now = get_publication_time()
         if self.start_publication and now < self.start_publication:
             return False
 
@@ -123,8 +139,8 @@ class CoreEntry(models.Model):
     @property
     def previous_next_entries(self):
         """
-        Returns and caches a tuple containing the next
-        and previous published entries.
+        Returns and caches a tuple containing the previous
+        and next published entries.
         Only available if the entry instance is published.
         """
         previous_next = getattr(self, 'previous_next', None)
@@ -135,18 +151,7 @@ class CoreEntry(models.Model):
                 setattr(self, 'previous_next', previous_next)
                 return previous_next
 
-            entries = list(self.__class__.published.all())
-            index = entries.index(self)
-            try:
-                previous = entries[index + 1]
-            except IndexError:
-                previous = None
-
-            if index:
-                _next = entries[index - 1]
-            else:
-                _next = None
-            previous_next = (previous, _next)
+            previous_next = get_previous_next(self)
             setattr(self, 'previous_next', previous_next)
         return previous_next
 
@@ -160,10 +165,17 @@ class CoreEntry(models.Model):
     def save(self, *args, **kwargs):
         """
         Overrides the save method to update the
-        the last_update field.
+        the last_update field and the live flag,
+        and to schedule the next boundary of publication.
         """
         self.last_update = timezone.now()
+        self.is_live = self.is_visible
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(
+                ['status', 'start_publication', 'end_publication']):
+            kwargs['update_fields'] = list(update_fields) + ['is_live']
         super(CoreEntry, self).save(*args, **kwargs)
+        schedule_entry(self)
 
     def get_absolute_url(self):
         """
@@ -193,7 +205,8 @@ class CoreEntry(models.Model):
         verbose_name_plural = _('entries')
         index_together = [['slug', 'publication_date'],
                           ['status', 'publication_date',
-                           'start_publication', 'end_publication']]
+                           'start_publication', 'end_publication'],
+                          ['is_live', 'publication_date']]
         permissions = (('can_view_all', 'Can view all entries'),
                        ('can_change_status', 'Can change status'),
                        ('can_change_author', 'Can change author(s)'), )
@@ -206,28 +219,106 @@ class ContentEntry(models.Model):
     """
     content = models.TextField(_('content'), blank=True)
 
+    content_html = models.TextField(
+        _('content in HTML'), blank=True, editable=False)
+
+    content_fingerprint = models.CharField(
+        _('content fingerprint'), max_length=32,
+        blank=True, editable=False)
+
+    word_count = models.PositiveIntegerField(
+        _('word count'), default=0, editable=False)
+
+    reading_time = models.PositiveIntegerField(
+        _('reading time'), default=0, editable=False,
+        help_text=_('In minutes.'))
+
+    preview_html = models.TextField(
+        _('preview in HTML'), blank=True, editable=False)
+
+    preview_has_more = models.BooleanField(
+        _('preview has more'), default=False, editable=False)
+
+    preview_total_words = models.PositiveIntegerField(
+        _('preview total words'), default=0, editable=False)
+
+    preview_displayed_words = models.IntegerField(
+        _('preview displayed words'), default=0, editable=False)
+
+    preview_fingerprint = models.CharField(
+        _('preview fingerprint'), max_length=32,
+        blank=True, editable=False)
+
     @property
     def html_content(self):
         """
-        Returns the "content" field formatted in HTML.
-        """
-        return html_format(self.content)
+        Returns the "content" field formatted in HTML,
+        rendered again only if the content or the
+        markup settings changed since the last rendering.
+        """
+        fingerprint = markup_fingerprint(self.content)
+        if fingerprint != self.content_fingerprint:
+            self.content_html = html_format(self.content)
+            self.content_fingerprint = fingerprint
+        return self.content_html
+
+    def update_preview(self):
+        """
+        Builds the preview of the content and its statistics again,
+        only if the content, the lead or the preview settings
+        changed since the last build.
+        """
+        html_content = self.html_content
+        html_lead = getattr(self, 'html_lead', '')
+        fingerprint = preview_fingerprint(
+            self.content_fingerprint, getattr(self, 'lead_fingerprint', ''))
+        if fingerprint != self.preview_fingerprint:
+            preview = HTMLPreview(html_content, html_lead)
+            self.preview_html = str(preview)
+            self.preview_has_more = preview.has_more
+            self.preview_total_words = preview.total_words
+            self.preview_displayed_words = preview.displayed_words
+            self.preview_fingerprint = fingerprint
 
     @property
     def html_preview(self):
         """
         Returns a preview of the "content" field or
-        the "lead" field if defined, formatted in HTML.
+        the "lead" field if defined, formatted in HTML,
+        read from the preview stored without parsing HTML.
         """
-        return HTMLPreview(self.html_content,
-                           getattr(self, 'html_lead', ''))
+        self.update_preview()
+        return StoredHTMLPreview(
+            self.preview_html, self.preview_has_more,
+            self.preview_total_words, self.preview_displayed_words)
 
-    @property
-    def word_count(self):
+    def update_word_count(self):
+        """
+        Counts the number of words used in the content,
+        and the minutes needed to read them.
         """
-        Counts the number of words used in the content.
+        self.word_count = len(strip_tags(self.html_content).split())
+        self.reading_time = int(math.ceil(
+            self.word_count / float(READING_SPEED)))
+
+    def save(self, *args, **kwargs):
         """
-        return len(strip_tags(self.html_content).split())
+        Overrides the save method to store the
+        content formatted in HTML, its word count and its preview.
+        """
+        self.content_html = self.html_content
+        self.update_word_count()
+        self.update_preview()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            if 'content' in update_fields:
+                update_fields += ['content_html', 'content_fingerprint',
+                                  'word_count', 'reading_time']
+            if set(update_fields) & set(['content', 'lead']):
+                update_fields += PREVIEW_FIELDS
+            kwargs['update_fields'] = update_fields
+        super(ContentEntry, self).save(*args, **kwargs)
 
     class Meta:
         abstract = True
@@ -359,12 +450,37 @@ class LeadEntry(models.Model):
         _('lead'), blank=True,
         help_text=_('Lead paragraph'))
 
+    lead_html = models.TextField(
+        _('lead in HTML'), blank=True, editable=False)
+
+    lead_fingerprint = models.CharField(
+        _('lead fingerprint'), max_length=32,
+        blank=True, editable=False)
+
     @property
     def html_lead(self):
         """
-        Returns the "lead" field formatted in HTML.
+        Returns the "lead" field formatted in HTML,
+        rendered again only if the lead or the
+        markup settings changed since the last rendering.
+        """
+        fingerprint = markup_fingerprint(self.lead)
+        if fingerprint != self.lead_fingerprint:
+            self.lead_html = html_format(self.lead)
+            self.lead_fingerprint = fingerprint
+        return self.lead_html
+
+    def save(self, *args, **kwargs):
+        """
+        Overrides the save method to store the
+        lead formatted in HTML.
         """
-        return html_format(self.lead)
+        self.lead_html = self.html_lead
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'lead' in update_fields:
+            kwargs['update_fields'] = list(update_fields) + [
+                'lead_html', 'lead_fingerprint']
+        super(LeadEntry, self).save(*args, **kwargs)
 
     class Meta:
         abstract = True
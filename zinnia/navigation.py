@@ -0,0 +1,144 @@
+"""Navigation between the published entries of Zinnia"""
+from uuid import uuid4
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
+
+from zinnia.scheduler import get_next_publication_boundary
+from zinnia.scheduler import get_publication_timeout
+from zinnia.settings import NAVIGATION_TIMEOUT
+
+CACHE_KEY = 'zinnia:navigation'
+GENERATION_KEY = '%s:generation' % CACHE_KEY
+NAVIGATION_FIELDS = ('title', 'slug', 'publication_date')
+NAVIGATION_UPDATE_FIELDS = set(NAVIGATION_FIELDS) | set(
+    ['status', 'start_publication', 'end_publication'])
+
+
+def flush_navigation_cache():
+    """
+    Invalidate all the neighbours cached, by renewing the generation token.
+    """
+    cache.set(GENERATION_KEY, uuid4().hex, None)
+
+
+def make_navigation_key(entry_pk):
+    """
+    Return the key of the neighbours of an entry, for the current
+    generation, the current site and the next publication boundary.
+    """
+    next_boundary = get_next_publication_boundary()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = uuid4().hex
+        cache.set(GENERATION_KEY, generation, None)
+    return '%s:%s:%s:%s:%s' % (
+        CACHE_KEY, generation, Site.objects.get_current().pk,
+        next_boundary, entry_pk)
+
+
+def get_previous_q(publication_date, pk):
+    """
+    Return the Q() object of the entries before an entry,
+    in the order of the (publication_date, pk) keyset.
+    """
+    return (Q(publication_date__lt=publication_date) |
+            Q(publication_date=publication_date, pk__lt=pk))
+
+
+def get_next_q(publication_date, pk):
+    """
+    Return the Q() object of the entries after an entry,
+    in the order of the (publication_date, pk) keyset.
+    """
+    return (Q(publication_date__gt=publication_date) |
+            Q(publication_date=publication_date, pk__gt=pk))
+
+
+def get_previous_next(entry):
+    """
+    Return a tuple containing the previous and the next published
+    entries of an entry, each fetched with a keyset query
+    reading only the fields needed to link them, and cached
+    until the publication or the sites of an entry change.
+    """
+    key = NAVIGATION_TIMEOUT and make_navigation_key(entry.pk)
+    if key:
+        previous_next = cache.get(key)
+        if previous_next is not None:
+            return previous_next
+
+    published = entry.__class__.published.only(*NAVIGATION_FIELDS)
+    previous_next = (
+        published.filter(get_previous_q(
+            entry.publication_date, entry.pk)).order_by(
+            '-publication_date', '-pk').first(),
+        published.filter(get_next_q(
+            entry.publication_date, entry.pk)).order_by(
+            'publication_date', 'pk').first())
+
+    if key:
+        cache.set(key, previous_next,
+                  get_publication_timeout(NAVIGATION_TIMEOUT))
+    return previous_next
+
+
+def prefetch_previous_next(entries):
+    """
+    Fetch the previous and the next published entries of a list
+    of entries in two queries, whatever the number of entries,
+    and cache them on each entry and in the navigation cache.
+    Useful for views or templates linking the neighbours
+    of all the entries of a list.
+    """
+    entries = [entry for entry in entries
+               if getattr(entry, 'previous_next', None) is None]
+    visible_entries = []
+    for entry in entries:
+        if entry.is_visible:
+            visible_entries.append(entry)
+        else:
+            entry.previous_next = (None, None)
+    if not visible_entries:
+        return
+
+    keys = {}
+    if NAVIGATION_TIMEOUT:
+        keys = dict((entry.pk, make_navigation_key(entry.pk))
+                    for entry in visible_entries)
+        cached = cache.get_many(keys.values())
+        for entry in visible_entries:
+            entry.previous_next = cached.get(keys[entry.pk])
+        visible_entries = [entry for entry in visible_entries
+                           if entry.previous_next is None]
+        if not visible_entries:
+            return
+
+    published = visible_entries[0].__class__.published.all()
+    neighbours = dict(
+        (pk, (previous_pk, next_pk))
+        for pk, previous_pk, next_pk in published.filter(
+            pk__in=[entry.pk for entry in visible_entries]).annotate(
+            previous_pk=Subquery(published.filter(get_previous_q(
+                OuterRef('publication_date'), OuterRef('pk'))).order_by(
+                '-publication_date', '-pk').values('pk')[:1]),
+            next_pk=Subquery(published.filter(get_next_q(
+                OuterRef('publication_date'), OuterRef('pk'))).order_by(
+                'publication_date', 'pk').values('pk')[:1])).values_list(
+            'pk', 'previous_pk', 'next_pk'))
+    objects = published.only(*NAVIGATION_FIELDS).in_bulk(set(
+        pk for pks in neighbours.values() for pk in pks if pk is not None))
+
+    previous_nexts = {}
+    for entry in visible_entries:
+        previous_pk, next_pk = neighbours.get(entry.pk, (None, None))
+        entry.previous_next = (objects.get(previous_pk),
+                               objects.get(next_pk))
+        if entry.pk in keys:
+            previous_nexts[keys[entry.pk]] = entry.previous_next
+    if previous_nexts:
+        cache.set_many(previous_nexts,
+                       get_publication_timeout(NAVIGATION_TIMEOUT))
@@ -1,8 +1,11 @@
 """Preview for Zinnia"""
 from __future__ import division
 
+from hashlib import md5
+
 from bs4 import BeautifulSoup
 
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 from django.utils.html import strip_tags
 from django.utils.text import Truncator
@@ -12,7 +15,45 @@ from zinnia.settings import PREVIEW_MORE_STRING
 from zinnia.settings import PREVIEW_SPLITTERS
 
 
-class HTMLPreview(object):
+def preview_fingerprint(*fingerprints):
+    """
+    Returns a fingerprint of the previews built from the fingerprints
+    of the contents, depends on PREVIEW_SPLITTERS, PREVIEW_MAX_WORDS
+    and PREVIEW_MORE_STRING settings.
+    """
+    return md5(force_bytes(repr((
+        fingerprints, list(PREVIEW_SPLITTERS),
+        PREVIEW_MAX_WORDS, PREVIEW_MORE_STRING)))).hexdigest()
+
+
+class BasePreview(object):
+    """
+    Statistics on the words displayed by a preview.
+    """
+
+    @cached_property
+    def remaining_words(self):
+        """
+        Return the number of words remaining after the preview.
+        """
+        return self.total_words - self.displayed_words
+
+    @cached_property
+    def displayed_percent(self):
+        """
+        Return the percentage of the content displayed in the preview.
+        """
+        return (self.displayed_words / self.total_words) * 100
+
+    @cached_property
+    def remaining_percent(self):
+        """
+        Return the percentage of the content remaining after the preview.
+        """
+        return (self.remaining_words / self.total_words) * 100
+
+
+class HTMLPreview(BasePreview):
     """
     Build an HTML preview of an HTML content.
     """
@@ -101,23 +142,21 @@ class HTMLPreview(object):
         return (len(strip_tags(self.preview).split()) -
                 (len(self.more_string.split()) * int(not bool(self.lead))))
 
-    @cached_property
-    def remaining_words(self):
-        """
-        Return the number of words remaining after the preview.
-        """
-        return self.total_words - self.displayed_words
 
-    @cached_property
-    def displayed_percent(self):
-        """
-        Return the percentage of the content displayed in the preview.
-        """
-        return (self.displayed_words / self.total_words) * 100
+class StoredHTMLPreview(BasePreview):
+    """
+    HTML preview already built, with the numbers of words
+    in the content and displayed, read without parsing HTML.
+    """
 
-    @cached_property
-    def remaining_percent(self):
+    def __init__(self, preview, has_more, total_words, displayed_words):
+        self.preview = preview
+        self.has_more = has_more
+        self.total_words = total_words
+        self.displayed_words = displayed_words
+
+    def __str__(self):
         """
-        Return the percentage of the content remaining after the preview.
+        Method used to render the preview in templates.
         """
-        return (self.remaining_words / self.total_words) * 100
+        return self.preview
@@ -0,0 +1,152 @@
+"""Publication scheduler of Zinnia"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from zinnia.managers import PUBLISHED
+from zinnia.settings import PUBLICATION_GRANULARITY
+
+CACHE_KEY = 'zinnia:scheduler:next_boundary'
+NO_BOUNDARY = float('inf')
+
+live_entries_changed = Signal(providing_args=['went_live', 'expired'])
+
+
+def get_publication_time(now=None):
+    """
+    Return the current date, or now, truncated
+    to the granularity of the publications.
+    """
+    now = now or timezone.now()
+    if not PUBLICATION_GRANULARITY:
+        return now
+    return now - timedelta(
+        seconds=now.timestamp() % PUBLICATION_GRANULARITY)
+
+
+def get_publication_boundary(date):
+    """
+    Return the first date from the granularity of the publications
+    when a publication starting or ending at a date is applied.
+    """
+    boundary = get_publication_time(date)
+    if boundary < date:
+        boundary += timedelta(seconds=PUBLICATION_GRANULARITY)
+    return boundary
+
+
+def get_live_q(now):
+    """
+    Return the Q() object of the entries published at a date.
+    """
+    return (Q(status=PUBLISHED) &
+            (Q(start_publication__lte=now) |
+             Q(start_publication=None)) &
+            (Q(end_publication__gt=now) |
+             Q(end_publication=None)))
+
+
+def get_next_boundary(now):
+    """
+    Return the next date after now when a published entry
+    will start or end its publication, or None.
+    """
+    from zinnia.models.entry import Entry
+    now = get_publication_time(now)
+    boundaries = Entry.objects.filter(status=PUBLISHED).aggregate(
+        start=Min('start_publication', filter=Q(start_publication__gt=now)),
+        end=Min('end_publication', filter=Q(end_publication__gt=now)))
+    boundaries = [boundary for boundary in boundaries.values()
+                  if boundary is not None]
+    return boundaries and get_publication_boundary(min(boundaries)) or None
+
+
+def schedule_boundary(boundary):
+    """
+    Bring forward the next update of the live entries
+    if the boundary is before the one scheduled.
+    """
+    next_boundary = cache.get(CACHE_KEY)
+    if next_boundary is not None and boundary.timestamp() < next_boundary:
+        cache.set(CACHE_KEY, boundary.timestamp(), None)
+
+
+def schedule_entry(entry):
+    """
+    Schedule the next boundary of the publication of an entry.
+    """
+    now = get_publication_time()
+    boundaries = [boundary for boundary in (entry.start_publication,
+                                            entry.end_publication)
+                  if boundary is not None and boundary > now]
+    if entry.status == PUBLISHED and boundaries:
+        schedule_boundary(get_publication_boundary(min(boundaries)))
+
+
+def update_live_entries(now=None):
+    """
+    Flag the entries whose publication started or ended as live
+    or not, schedule the next update and send the primary keys
+    of the entries changed with the live_entries_changed signal.
+    """
+    from zinnia.models.entry import Entry
+    now = get_publication_time(now)
+    live = get_live_q(now)
+    went_live = list(Entry.objects.filter(
+        live, is_live=False).values_list('pk', flat=True))
+    expired = list(Entry.objects.filter(is_live=True).exclude(
+        live).values_list('pk', flat=True))
+    if went_live:
+        Entry.objects.filter(pk__in=went_live).update(is_live=True)
+    if expired:
+        Entry.objects.filter(pk__in=expired).update(is_live=False)
+
+    next_boundary = get_next_boundary(now)
+    cache.set(CACHE_KEY, next_boundary and next_boundary.timestamp() or
+              NO_BOUNDARY, None)
+
+    if went_live or expired:
+        live_entries_changed.send(sender=Entry, went_live=went_live,
+                                  expired=expired)
+    return went_live, expired
+
+
+def get_next_publication_boundary():
+    """
+    Return the timestamp of the next date when the published entries
+    will change with the time, to build cache keys stable until then,
+    or None if no change is scheduled.
+
+    The live entries are only updated by the update_live_entries
+    command, so a boundary reached is replaced by the next one
+    without writing in the database.
+    """
+    now = timezone.now()
+    next_boundary = cache.get(CACHE_KEY)
+    if next_boundary is None or next_boundary <= now.timestamp():
+        next_boundary = get_next_boundary(now)
+        next_boundary = next_boundary and next_boundary.timestamp() or \
+            NO_BOUNDARY
+        cache.set(CACHE_KEY, next_boundary, None)
+    if next_boundary == NO_BOUNDARY:
+        return None
+    return next_boundary
+
+
+def get_publication_timeout(timeout=None):
+    """
+    Return the number of seconds until the next change of the
+    published entries with the time, limited by a timeout,
+    to expire exactly the values cached with the published entries.
+    """
+    next_boundary = get_next_publication_boundary()
+    if next_boundary is None:
+        return timeout
+    remaining = max(next_boundary - timezone.now().timestamp(), 1)
+    if timeout is None:
+        return remaining
+    return min(remaining, timeout)
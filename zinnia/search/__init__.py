@@ -0,0 +1,320 @@
+"""Search module with complex query parsing for Zinnia"""
+import warnings
+from functools import lru_cache
+from importlib import import_module
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+
+from pyparsing import CaselessLiteral
+from pyparsing import Combine
+from pyparsing import OneOrMore
+from pyparsing import Optional
+from pyparsing import ParseException
+from pyparsing import ParseResults
+from pyparsing import StringEnd
+from pyparsing import Word
+from pyparsing import WordEnd
+from pyparsing import alphas
+from pyparsing import opAssoc
+from pyparsing import operatorPrecedence
+from pyparsing import printables
+from pyparsing import quotedString
+from pyparsing import removeQuotes
+
+from tagging.models import TaggedItem
+
+from zinnia.models.author import Author
+from zinnia.models.entry import Entry
+from zinnia.search.backends.default import backend as default_backend
+from zinnia.settings import SEARCH_BACKEND
+from zinnia.settings import SEARCH_CACHE_SIZE
+from zinnia.settings import STOP_WORDS
+
+
+def get_search_backend():
+    """
+    Return the selected search backend.
+    """
+    try:
+        backend_module = import_module(SEARCH_BACKEND)
+        backend = getattr(backend_module, 'backend')
+    except (ImportError, AttributeError):
+        warnings.warn('%s backend cannot be imported' % SEARCH_BACKEND,
+                      RuntimeWarning)
+        backend = default_backend
+    except ImproperlyConfigured as e:
+        warnings.warn(str(e), RuntimeWarning)
+        backend = default_backend
+
+    return backend
+
+
+def parse_term(token):
+    """
+    Return the meta, the searched string, the wildcards
+    and if the string is quoted of a term.
+    """
+    meta = getattr(token, 'meta', None)
+    query = getattr(token, 'query', '')
+    wildcards = None
+    quoted = isinstance(query, str)
+
+    if quoted:  # Unicode -> Quoted string
+        search = query
+    else:  # List -> No quoted string (possible wildcards)
+        if len(query) == 1:
+            search = query[0]
+        elif len(query) == 3:
+            wildcards = 'BOTH'
+            search = query[1]
+        elif len(query) == 2:
+            if query[0] == '*':
+                wildcards = 'START'
+                search = query[1]
+            else:
+                wildcards = 'END'
+                search = query[0]
+
+    return meta, search, wildcards, quoted
+
+
+def is_ignored(search):
+    """
+    Ignore short term and stop words.
+    """
+    return (len(search) < 3 and not search.isdigit()) or search in STOP_WORDS
+
+
+def create_q(meta, search, wildcards=None, quoted=False):
+    """
+    Creates the Q() object.
+    """
+    if is_ignored(search):
+        return Q()
+
+    if not meta:
+        return get_search_backend().term_query(search, wildcards, quoted)
+
+    if meta == 'category':
+        if wildcards == 'BOTH':
+            return (Q(categories__title__icontains=search) |
+                    Q(categories__slug__icontains=search))
+        elif wildcards == 'START':
+            return (Q(categories__title__iendswith=search) |
+                    Q(categories__slug__iendswith=search))
+        elif wildcards == 'END':
+            return (Q(categories__title__istartswith=search) |
+                    Q(categories__slug__istartswith=search))
+        else:
+            return (Q(categories__title__iexact=search) |
+                    Q(categories__slug__iexact=search))
+    elif meta == 'author':
+        if wildcards == 'BOTH':
+            return Q(**{'authors__%s__icontains' % Author.USERNAME_FIELD:
+                        search})
+        elif wildcards == 'START':
+            return Q(**{'authors__%s__iendswith' % Author.USERNAME_FIELD:
+                        search})
+        elif wildcards == 'END':
+            return Q(**{'authors__%s__istartswith' % Author.USERNAME_FIELD:
+                        search})
+        else:
+            return Q(**{'authors__%s__iexact' % Author.USERNAME_FIELD:
+                        search})
+    elif meta == 'tag':
+        if wildcards == 'BOTH':
+            tags = {'tag__name__icontains': search}
+        elif wildcards == 'START':
+            tags = {'tag__name__iendswith': search}
+        elif wildcards == 'END':
+            tags = {'tag__name__istartswith': search}
+        else:
+            tags = {'tag__name__iexact': search}
+        return Q(pk__in=TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Entry),
+            **tags).values('object_id'))
+
+
+class QueryNode(object):
+    """
+    Node of a parsed query, a term or an operation on other nodes,
+    combined like Q() objects and compiled with an action creating
+    the objects of the terms.
+    """
+
+    def __init__(self, operator, operands):
+        self.operator = operator
+        self.operands = operands
+
+    def __and__(self, other):
+        return QueryNode('and', [self, other])
+
+    def __or__(self, other):
+        return QueryNode('or', [self, other])
+
+    def __invert__(self):
+        return QueryNode('not', [self])
+
+    def compile(self, term_action):
+        """
+        Combine the objects created by the action for each term.
+        """
+        if self.operator == 'term':
+            return term_action(*self.operands)
+        operands = [operand.compile(term_action)
+                    for operand in self.operands]
+        if self.operator == 'not':
+            return ~operands[0]
+        query = operands[0]
+        for operand in operands[1:]:
+            if self.operator == 'or':
+                query |= operand
+            else:
+                query &= operand
+        return query
+
+    def get_terms(self):
+        """
+        Return the terms of the node which are not negated.
+        """
+        if self.operator == 'term':
+            return [self.operands]
+        if self.operator == 'not':
+            return []
+        return [term for operand in self.operands
+                for term in operand.get_terms()]
+
+
+def create_node(token):
+    """
+    Creates the node of a term.
+    """
+    return QueryNode('term', parse_term(token))
+
+
+def union_q(token):
+    """
+    Appends all the nodes.
+    """
+    query = None
+    operation = 'and'
+    negation = False
+
+    for t in token:
+        if type(t) is ParseResults:  # See tokens recursively
+            t = union_q(t)
+            query = t if query is None else query & t
+        else:
+            if t in ('or', 'and'):  # Set the new op and go to next token
+                operation = t
+            elif t == '-':  # Next tokens needs to be negated
+                negation = True
+            else:  # Append to query the token
+                if negation:
+                    t = ~t
+                if query is None:
+                    query = t
+                elif operation == 'or':
+                    query |= t
+                else:
+                    query &= t
+    return query
+
+
+@lru_cache(maxsize=None)
+def get_query_grammar():
+    """
+    Build the grammar of the queries on first use.
+    """
+    no_brts = printables.replace('(', '').replace(')', '')
+    single = Word(no_brts.replace('*', ''))
+    wildcards = Optional('*') + single + Optional('*') + WordEnd(
+        wordChars=no_brts)
+    quoted = quotedString.copy().setParseAction(removeQuotes)
+
+    oper_and = CaselessLiteral('and')
+    oper_or = CaselessLiteral('or')
+    oper_not = '-'
+
+    term = Combine(Optional(Word(alphas).setResultsName('meta') + ':') +
+                   (quoted.setResultsName('query') |
+                    wildcards.setResultsName('query')))
+    term.setParseAction(create_node)
+
+    expression = operatorPrecedence(term, [
+        (oper_not, 1, opAssoc.RIGHT),
+        (oper_or, 2, opAssoc.LEFT),
+        (Optional(oper_and, default='and'), 2, opAssoc.LEFT)])
+    expression.setParseAction(union_q)
+
+    query = OneOrMore(expression) + StringEnd()
+    query.setParseAction(union_q)
+    return query
+
+
+def normalize_pattern(pattern):
+    """
+    Normalize the spaces of a pattern, only stripped if it
+    contains quotes, as the spaces of a quoted string are searched.
+    """
+    if '"' in pattern or "'" in pattern:
+        return pattern.strip()
+    return ' '.join(pattern.split())
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def parse_stripped_query(pattern):
+    """
+    Parse a pattern whose spaces are normalized.
+    """
+    return get_query_grammar().parseString(pattern)[0]
+
+
+def parse_query(pattern):
+    """
+    Parse the grammar of a pattern into a tree of nodes,
+    the last patterns parsed being cached.
+    """
+    return parse_stripped_query(normalize_pattern(pattern))
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def compile_stripped_q(backend, pattern):
+    """
+    Compile in a Q() object a pattern whose
+    spaces are normalized for a search backend.
+    """
+    return parse_stripped_query(pattern).compile(create_q)
+
+
+def compile_q(pattern):
+    """
+    Return the Q() object of a pattern,
+    the last patterns compiled being cached.
+    """
+    return compile_stripped_q(get_search_backend(),
+                              normalize_pattern(pattern))
+
+
+def get_search_terms(pattern):
+    """
+    Return the terms of a pattern searched in the content of the
+    entries, with their wildcards, for ranking the results.
+    """
+    try:
+        query = parse_query(pattern)
+    except ParseException:
+        return []
+    return [(search, wildcards)
+            for meta, search, wildcards, quoted in query.get_terms()
+            if not meta and not is_ignored(search)]
+
+
+def advanced_search(pattern):
+    """
+    Parse the grammar of a pattern and search the published entries
+    with it, ordered by relevance if the search backend supports it.
+    """
+    return get_search_backend().search(Entry.published.all(), pattern)
@@ -0,0 +1 @@
+"""Search backends for Zinnia"""
@@ -0,0 +1,74 @@
+"""Default search backend for Zinnia"""
+from django.db.models import Q
+from django.utils.html import strip_tags
+
+from zinnia.settings import SEARCH_FIELDS
+
+
+class SearchBackend(object):
+    """
+    Search the terms in the fields of the entries,
+    with sequential scans and without ranking.
+    """
+    index_relations = False
+
+    def term_query(self, search, wildcards=None, phrase=False):
+        """
+        Return the Q() object searching a term in the entries.
+        """
+        q = Q()
+        for field in SEARCH_FIELDS:
+            q |= Q(**{'%s__icontains' % field: search})
+        return q
+
+    def search(self, queryset, pattern):
+        """
+        Return the entries of the queryset matching a pattern.
+        """
+        from zinnia.search import compile_q
+        from zinnia.search import get_search_terms
+        return self.rank(queryset.filter(compile_q(pattern)).distinct(),
+                         get_search_terms(pattern))
+
+    def rank(self, queryset, terms):
+        """
+        Order the entries found by relevance to the terms.
+        """
+        return queryset
+
+    def get_document(self, entry):
+        """
+        Return the text indexed for an entry.
+        """
+        return strip_tags(' '.join(
+            [str(getattr(entry, field) or '') for field in SEARCH_FIELDS]))
+
+    def index_entry(self, entry):
+        """
+        Add or update an entry in the index.
+        """
+
+    def unindex_entry(self, entry_id):
+        """
+        Remove an entry from the index.
+        """
+
+    def clear_index(self):
+        """
+        Remove all the entries from the index.
+        """
+
+    def index_entries(self, entries):
+        """
+        Add a list of entries missing from the index.
+        """
+        for entry in entries:
+            self.index_entry(entry)
+
+    def merge_index(self):
+        """
+        Merge the pending changes of the index, if needed.
+        """
+
+
+backend = SearchBackend()
@@ -0,0 +1,559 @@
+"""Inverted index search backend for Zinnia"""
+import json
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from math import log
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import prefetch_related_objects
+from django.utils.functional import cached_property
+
+from zinnia.search import is_ignored
+from zinnia.search import parse_query
+from zinnia.search.backends.default import SearchBackend
+from zinnia.search.results import SearchResults
+from zinnia.settings import SEARCH_INDEX_PATH
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Split a text in lowercased words.
+    """
+    return WORD.findall(text.lower())
+
+
+class Matches(object):
+    """
+    Entries matching a part of a query with their scores,
+    or not matching it if negated. Matches without scores
+    are neutral, like the terms ignored in the queries.
+    """
+
+    def __init__(self, scores=None, negated=False):
+        self.scores = scores
+        self.negated = negated
+
+    def __invert__(self):
+        if self.scores is None:
+            return self
+        return Matches(self.scores, not self.negated)
+
+    def __and__(self, other):
+        if self.scores is None:
+            return other
+        if other.scores is None:
+            return self
+        if self.negated and other.negated:
+            scores = dict(self.scores)
+            scores.update(other.scores)
+            return Matches(scores, True)
+        if self.negated:
+            return other & self
+        if other.negated:
+            return Matches({pk: score for pk, score in self.scores.items()
+                            if pk not in other.scores})
+        return Matches({pk: score + other.scores[pk]
+                        for pk, score in self.scores.items()
+                        if pk in other.scores})
+
+    def __or__(self, other):
+        if self.scores is None:
+            return other
+        if other.scores is None:
+            return self
+        if self.negated and other.negated:
+            return Matches({pk: score for pk, score in self.scores.items()
+                            if pk in other.scores}, True)
+        if self.negated:
+            return Matches({pk: score for pk, score in self.scores.items()
+                            if pk not in other.scores}, True)
+        if other.negated:
+            return other | self
+        scores = dict(self.scores)
+        for pk, score in other.scores.items():
+            scores[pk] = scores.get(pk, 0.0) + score
+        return Matches(scores)
+
+
+class InvertedIndex(object):
+    """
+    Inverted index stored in a directory.
+
+    The postings of the terms are written in a read-only segment,
+    memory-mapped by the processes searching the index. The entries
+    indexed or removed afterwards are appended to a journal, replayed
+    by each process, until the journal is merged in a new segment
+    by the update_search_index command.
+
+    The postings of a term are a list of 32 bits integers,
+    containing for each entry its primary key, the frequency
+    of the term and its positions in the document.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = None
+
+    def get_path(self, name):
+        """
+        Return the path of a file of the index.
+        """
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def lock(self):
+        """
+        Lock the index while writing it.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.get_path('lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_generation(self):
+        """
+        Return the generation of the current segment.
+        """
+        try:
+            with open(self.get_path('CURRENT')) as current:
+                return int(current.read())
+        except (IOError, ValueError):
+            return 0
+
+    def load_segment(self, generation):
+        """
+        Map in memory the postings of a segment and read its lexicon.
+        """
+        self.generation = generation
+        self.journal_offset = 0
+        self.journal_length = 0
+        self.journal = {}
+        self.journal_terms = {}
+        self.postings = array('i')
+        self.lexicon = {}
+        self.lengths = {}
+        if not generation:
+            return
+        with open(self.get_path('segment-%s.json' % generation)) as lexicon:
+            segment = json.load(lexicon)
+        self.lexicon = segment['terms']
+        self.lengths = {int(pk): length for pk, length
+                        in segment['documents'].items()}
+        with open(self.get_path('segment-%s.bin' % generation), 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.postings = memoryview(mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ)).cast('i')
+
+    def replay_journal(self):
+        """
+        Apply the entries appended to the journal since the last replay.
+        """
+        try:
+            journal = open(self.get_path(
+                'journal-%s.jsonl' % self.generation), 'rb')
+        except IOError:
+            return False
+        with journal:
+            journal.seek(self.journal_offset)
+            lines = journal.readlines()
+        changed = False
+        for line in lines:
+            if not line.endswith(b'\n'):  # Still being written
+                break
+            self.journal_offset += len(line)
+            self.journal_length += 1
+            pk, document = json.loads(line.decode('utf-8'))
+            self.unindex_journal(pk)
+            self.journal[pk] = document
+            if document is not None:
+                for term in document[1]:
+                    self.journal_terms.setdefault(term, set()).add(pk)
+            changed = True
+        return changed
+
+    def unindex_journal(self, pk):
+        """
+        Remove the terms of an entry previously found in the journal.
+        """
+        document = self.journal.get(pk)
+        if document is not None:
+            for term in document[1]:
+                self.journal_terms[term].discard(pk)
+
+    def refresh(self):
+        """
+        Update the index with the changes made by the other processes.
+        """
+        generation = self.get_generation()
+        if generation != self.generation:
+            try:
+                self.load_segment(generation)
+            except IOError:  # Merged concurrently by another process
+                self.load_segment(self.get_generation())
+            self.replay_journal()
+        elif not self.replay_journal():
+            return
+        self.__dict__.pop('terms', None)
+        self.__dict__.pop('statistics', None)
+
+    @cached_property
+    def terms(self):
+        """
+        Sorted list of the terms indexed.
+        """
+        terms = set(self.lexicon)
+        terms.update(term for term, pks in self.journal_terms.items() if pks)
+        return sorted(terms)
+
+    @cached_property
+    def statistics(self):
+        """
+        Number of entries indexed and average length of their documents.
+        """
+        lengths = [length for pk, length in self.lengths.items()
+                   if pk not in self.journal]
+        lengths.extend(document[0] for document in self.journal.values()
+                       if document is not None)
+        if not lengths:
+            return 0, 0.0
+        return len(lengths), float(sum(lengths)) / len(lengths)
+
+    def prefixed(self, prefix):
+        """
+        Return the terms starting with a prefix.
+        """
+        terms = self.terms
+        index = bisect_left(terms, prefix)
+        while index < len(terms) and terms[index].startswith(prefix):
+            yield terms[index]
+            index += 1
+
+    def get_postings(self, term):
+        """
+        Return the entries containing a term,
+        with the positions of the term.
+        """
+        postings = {}
+        if term in self.lexicon:
+            offset, size = self.lexicon[term]
+            index, end = offset, offset + size
+            while index < end:
+                pk, frequency = self.postings[index], self.postings[index + 1]
+                index += 2
+                if pk not in self.journal:
+                    postings[pk] = self.postings[index:index + frequency]
+                index += frequency
+        for pk in self.journal_terms.get(term, ()):
+            postings[pk] = self.journal[pk][1][term]
+        return postings
+
+    def get_length(self, pk):
+        """
+        Return the length of the document of an entry.
+        """
+        if pk in self.journal:
+            return self.journal[pk][0]
+        return self.lengths[pk]
+
+    def append(self, documents):
+        """
+        Append documents or removals of entries to the journal.
+        """
+        with self.lock():
+            self.refresh()
+            with open(self.get_path(
+                    'journal-%s.jsonl' % self.generation), 'ab') as journal:
+                for pk, document in documents:
+                    journal.write(json.dumps([pk, document]).encode('utf-8'))
+                    journal.write(b'\n')
+            self.refresh()
+
+    def get_documents(self):
+        """
+        Return the postings of all the terms indexed and
+        the lengths of the documents of the entries.
+        """
+        lengths = {pk: length for pk, length in self.lengths.items()
+                   if pk not in self.journal}
+        lengths.update((pk, document[0]) for pk, document
+                       in self.journal.items() if document is not None)
+        postings = ((term, self.get_postings(term)) for term in self.terms)
+        return postings, lengths
+
+    def write_segment(self, documents):
+        """
+        Write a new segment with the postings of the terms,
+        which replaces the current segment and its journal.
+        """
+        postings, lengths = documents
+        generation = (self.generation or 0) + 1
+        lexicon = {}
+        data = array('i')
+        for term, term_postings in postings:
+            if not term_postings:
+                continue
+            offset = len(data)
+            for pk in sorted(term_postings):
+                positions = term_postings[pk]
+                data.append(pk)
+                data.append(len(positions))
+                data.extend(positions)
+            lexicon[term] = [offset, len(data) - offset]
+        with open(self.get_path('segment-%s.bin' % generation), 'wb') as f:
+            data.tofile(f)
+        with open(self.get_path('segment-%s.json' % generation), 'w') as f:
+            json.dump({'terms': lexicon, 'documents': lengths}, f)
+        current = self.get_path('CURRENT.tmp')
+        with open(current, 'w') as f:
+            f.write(str(generation))
+        os.replace(current, self.get_path('CURRENT'))
+        for name in ('segment-%s.bin', 'segment-%s.json', 'journal-%s.jsonl'):
+            try:
+                os.remove(self.get_path(name % self.generation))
+            except OSError:
+                pass
+        self.refresh()
+
+    def merge(self):
+        """
+        Merge the journal in a new segment.
+        """
+        with self.lock():
+            self.refresh()
+            self.write_segment(self.get_documents())
+
+    def clear(self):
+        """
+        Replace the index with an empty segment.
+        """
+        with self.lock():
+            self.refresh()
+            self.write_segment(((), {}))
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """
+    Search the entries in an inverted index stored
+    on the disk and rank them with the BM25 function.
+
+    The whole query is evaluated on the index, with the
+    categories, the authors and the tags of the entries,
+    so the database only fetches the entries displayed.
+    """
+    index_relations = True
+    k1 = 1.2
+    b = 0.75
+    max_filtered_pks = 500
+
+    def __init__(self, path):
+        self.path = path
+
+    @cached_property
+    def index(self):
+        """
+        The inverted index stored in the path.
+        """
+        if not self.path:
+            raise ImproperlyConfigured(
+                'ZINNIA_SEARCH_INDEX_PATH must be set to use '
+                'the inverted index search backend.')
+        return InvertedIndex(self.path)
+
+    def search(self, queryset, pattern):
+        """
+        Return the entries of the queryset matching a pattern,
+        ordered by their BM25 score, and only fetched by slices.
+        """
+        return SearchResults(self.search_pks(queryset, pattern), queryset)
+
+    def search_pks(self, queryset, pattern):
+        """
+        Return the primary keys of the entries of the queryset
+        matching a pattern, ordered in Python by their BM25 score
+        and by their publication date.
+        """
+        self.index.refresh()
+        matches = parse_query(pattern).compile(self.create_matches)
+        scores = matches.scores
+        if scores is None or matches.negated:
+            pks = queryset.values_list('pk', flat=True)
+            if scores is None:
+                return list(pks)
+            return [pk for pk in pks if pk not in scores]
+        if not scores:
+            return []
+
+        if len(scores) > self.max_filtered_pks:
+            dates = queryset.values_list('pk', 'publication_date')
+        else:
+            dates = queryset.filter(pk__in=list(scores)).values_list(
+                'pk', 'publication_date')
+        found = sorted([(scores[pk], date, pk) for pk, date in dict(
+            dates.order_by()).items() if pk in scores], reverse=True)
+        return [pk for score, date, pk in found]
+
+    def create_matches(self, meta, search, wildcards=None, quoted=False):
+        """
+        Return the entries matching a term of a query.
+        """
+        if is_ignored(search):
+            return Matches()
+
+        if meta:
+            return self.meta_matches(meta, search, wildcards)
+        return self.term_matches(search, wildcards)
+
+    def meta_matches(self, meta, search, wildcards):
+        """
+        Return the entries of the categories,
+        of the authors or of the tags matching a term.
+        """
+        if meta not in ('category', 'author', 'tag'):
+            return Matches({})
+        prefix = '%s:' % meta
+        search = search.lower()
+        if wildcards is None:
+            terms = [prefix + search]
+        elif wildcards == 'END':
+            terms = self.index.prefixed(prefix + search)
+        elif wildcards == 'START':
+            terms = [term for term in self.index.prefixed(prefix)
+                     if term.endswith(search)]
+        else:
+            terms = [term for term in self.index.prefixed(prefix)
+                     if search in term[len(prefix):]]
+        scores = {}
+        for term in terms:
+            scores.update((pk, 0.0) for pk in self.index.get_postings(term))
+        return Matches(scores)
+
+    def term_matches(self, search, wildcards):
+        """
+        Return the entries containing a word,
+        or a phrase, with their BM25 score.
+        """
+        words = tokenize(search)
+        if len(words) > 1:
+            return Matches(self.score(self.phrase_postings(words)))
+        if not words:
+            return Matches({})
+
+        word = words[0]
+        if wildcards is None:
+            terms = [word]
+        elif wildcards == 'END':
+            terms = [term for term in self.index.prefixed(word)
+                     if ':' not in term]
+        else:
+            terms = [term for term in self.index.terms if ':' not in term and
+                     (term.endswith(word) if wildcards == 'START'
+                      else word in term)]
+        scores = Matches({})
+        for term in terms:
+            scores |= Matches(self.score(self.index.get_postings(term)))
+        return scores
+
+    def phrase_postings(self, words):
+        """
+        Return the entries containing the words consecutively,
+        with the positions of the phrase.
+        """
+        postings = [self.index.get_postings(word) for word in words]
+        phrases = {}
+        for pk, positions in postings[0].items():
+            if not all(pk in word_postings for word_postings in postings):
+                continue
+            following = [set(word_postings[pk])
+                         for word_postings in postings[1:]]
+            starts = [position for position in positions
+                      if all(position + i + 1 in word_positions
+                             for i, word_positions in enumerate(following))]
+            if starts:
+                phrases[pk] = starts
+        return phrases
+
+    def score(self, postings):
+        """
+        Compute the BM25 score of the entries found for a term.
+        """
+        count, average_length = self.index.statistics
+        frequency = len(postings)
+        idf = log(1.0 + (count - frequency + 0.5) / (frequency + 0.5))
+        scores = {}
+        for pk, positions in postings.items():
+            tf = len(positions)
+            norm = 1.0 - self.b + self.b * (
+                self.index.get_length(pk) / average_length)
+            scores[pk] = idf * tf * (self.k1 + 1.0) / (tf + self.k1 * norm)
+        return scores
+
+    def analyze(self, entry):
+        """
+        Return the length of the document of an entry and
+        the positions of its terms, including its categories,
+        its authors and its tags.
+        """
+        words = tokenize(self.get_document(entry))
+        terms = {}
+        for position, word in enumerate(words):
+            terms.setdefault(word, []).append(position)
+        for category in entry.categories.all():
+            terms['category:%s' % category.title.lower()] = []
+            terms['category:%s' % category.slug.lower()] = []
+        for author in entry.authors.all():
+            terms['author:%s' % author.get_username().lower()] = []
+        for tag in entry.tags_list:
+            terms['tag:%s' % tag.lower()] = []
+        return [len(words), terms]
+
+    def index_entry(self, entry):
+        """
+        Add or update an entry in the index.
+        """
+        self.index.append([(entry.pk, self.analyze(entry))])
+
+    def unindex_entry(self, entry_id):
+        """
+        Remove an entry from the index.
+        """
+        self.index.append([(entry_id, None)])
+
+    def clear_index(self):
+        """
+        Remove all the entries from the index.
+        """
+        self.index.clear()
+
+    def merge_index(self):
+        """
+        Merge the journal of the index in a new segment.
+        """
+        self.index.merge()
+
+    def index_entries(self, entries):
+        """
+        Add a list of entries missing from the index.
+        """
+        prefetch_related_objects(entries, 'categories', 'authors')
+        self.index.append([(entry.pk, self.analyze(entry))
+                           for entry in entries])
+
+
+backend = InvertedIndexSearchBackend(SEARCH_INDEX_PATH)
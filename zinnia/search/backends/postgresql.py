@@ -0,0 +1,106 @@
+"""PostgreSQL full-text search backend for Zinnia"""
+from django.db import connection
+from django.db.models import F
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from zinnia.models.entry import Entry
+from zinnia.search.backends.default import SearchBackend
+from zinnia.settings import SEARCH_CONFIG
+
+INDEX_TABLE = 'zinnia_entry_search'
+
+
+def tsquery(search, wildcards=None):
+    """
+    Return the SQL and the parameters of the tsquery matching a term.
+    """
+    if wildcards == 'END':
+        return "to_tsquery(%s, quote_literal(%s) || ':*')", [
+            SEARCH_CONFIG, search]
+    return 'phraseto_tsquery(%s, %s)', [SEARCH_CONFIG, search]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Search the terms in a table of tsvector documents indexed
+    with GIN and rank the entries with the ts_rank function.
+
+    The terms with a leading wildcard are not supported
+    by the index and are searched in the fields of the entries.
+    """
+
+    def term_query(self, search, wildcards=None, phrase=False):
+        """
+        Return the Q() object searching a term in the index.
+        """
+        if wildcards in ('START', 'BOTH'):
+            return super(PostgreSQLSearchBackend, self).term_query(
+                search, wildcards, phrase)
+        sql, params = tsquery(search, wildcards)
+        return Q(pk__in=RawSQL(
+            'SELECT entry_id FROM %s WHERE document @@ %s' % (
+                INDEX_TABLE, sql), params))
+
+    def rank(self, queryset, terms):
+        """
+        Order the entries found by their rank for the terms.
+        """
+        sqls = []
+        params = []
+        for search, wildcards in terms:
+            if wildcards not in ('START', 'BOTH'):
+                sql, sql_params = tsquery(search, wildcards)
+                sqls.append(sql)
+                params.extend(sql_params)
+        if not sqls:
+            return queryset
+        return queryset.annotate(search_rank=RawSQL(
+            'SELECT ts_rank(document, %s) FROM %s WHERE entry_id = %s.%s' % (
+                ' || '.join(sqls), INDEX_TABLE,
+                connection.ops.quote_name(Entry._meta.db_table),
+                connection.ops.quote_name(Entry._meta.pk.column)),
+            params)).order_by(
+            F('search_rank').desc(nulls_last=True), '-publication_date')
+
+    def index_entry(self, entry):
+        """
+        Add or update an entry in the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO %s (entry_id, document) '
+                'VALUES (%%s, to_tsvector(%%s, %%s)) '
+                'ON CONFLICT (entry_id) '
+                'DO UPDATE SET document = EXCLUDED.document' % INDEX_TABLE,
+                [entry.pk, SEARCH_CONFIG, self.get_document(entry)])
+
+    def unindex_entry(self, entry_id):
+        """
+        Remove an entry from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE entry_id = %%s' % INDEX_TABLE,
+                [entry_id])
+
+    def clear_index(self):
+        """
+        Remove all the entries from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % INDEX_TABLE)
+
+    def index_entries(self, entries):
+        """
+        Add a list of entries missing from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO %s (entry_id, document) '
+                'VALUES (%%s, to_tsvector(%%s, %%s))' % INDEX_TABLE,
+                [(entry.pk, SEARCH_CONFIG, self.get_document(entry))
+                 for entry in entries])
+
+
+backend = PostgreSQLSearchBackend()
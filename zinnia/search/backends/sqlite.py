@@ -0,0 +1,97 @@
+"""SQLite FTS5 search backend for Zinnia"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from zinnia.models.entry import Entry
+from zinnia.search.backends.default import SearchBackend
+
+INDEX_TABLE = 'zinnia_entry_fts'
+
+
+def match_expression(search, wildcards=None):
+    """
+    Return the FTS5 expression matching a term.
+    """
+    expression = '"%s"' % search.replace('"', '""')
+    if wildcards == 'END':
+        expression += ' *'
+    return expression
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Search the terms in a FTS5 virtual table
+    and rank the entries with the BM25 function.
+
+    The terms with a leading wildcard are not supported
+    by the index and are searched in the fields of the entries.
+    """
+
+    def term_query(self, search, wildcards=None, phrase=False):
+        """
+        Return the Q() object searching a term in the index.
+        """
+        if wildcards in ('START', 'BOTH'):
+            return super(SQLiteSearchBackend, self).term_query(
+                search, wildcards, phrase)
+        return Q(pk__in=RawSQL(
+            'SELECT rowid FROM %s WHERE %s MATCH %%s' % (
+                INDEX_TABLE, INDEX_TABLE),
+            [match_expression(search, wildcards)]))
+
+    def rank(self, queryset, terms):
+        """
+        Order the entries found by their BM25 score for the terms.
+        """
+        terms = [(search, wildcards) for search, wildcards in terms
+                 if wildcards not in ('START', 'BOTH')]
+        if not terms:
+            return queryset
+        return queryset.annotate(search_rank=RawSQL(
+            'SELECT -bm25(%s) FROM %s WHERE %s MATCH %%s '
+            'AND rowid = %s.%s' % (
+                INDEX_TABLE, INDEX_TABLE, INDEX_TABLE,
+                connection.ops.quote_name(Entry._meta.db_table),
+                connection.ops.quote_name(Entry._meta.pk.column)),
+            [' OR '.join([match_expression(search, wildcards)
+                          for search, wildcards in terms])])).order_by(
+            '-search_rank', '-publication_date')
+
+    def index_entry(self, entry):
+        """
+        Add or update an entry in the index.
+        """
+        self.unindex_entry(entry.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO %s (rowid, document) VALUES (%%s, %%s)' % (
+                    INDEX_TABLE), [entry.pk, self.get_document(entry)])
+
+    def unindex_entry(self, entry_id):
+        """
+        Remove an entry from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % INDEX_TABLE,
+                           [entry_id])
+
+    def clear_index(self):
+        """
+        Remove all the entries from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % INDEX_TABLE)
+
+    def index_entries(self, entries):
+        """
+        Add a list of entries missing from the index.
+        """
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO %s (rowid, document) VALUES (%%s, %%s)' % (
+                    INDEX_TABLE),
+                [(entry.pk, self.get_document(entry)) for entry in entries])
+
+
+backend = SQLiteSearchBackend()
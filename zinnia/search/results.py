@@ -0,0 +1,114 @@
+"""Cached results of the searches for Zinnia"""
+from hashlib import md5
+from uuid import uuid4
+
+from django.contrib.sites.models import Site
+from django.core.cache import InvalidCacheBackendError
+from django.core.cache import caches
+from django.utils.functional import cached_property
+
+from zinnia.models.entry import Entry
+from zinnia.scheduler import get_next_publication_boundary
+from zinnia.scheduler import get_publication_timeout
+from zinnia.settings import SEARCH_RESULTS_TIMEOUT
+
+CACHE_KEY = 'zinnia:search'
+GENERATION_KEY = '%s:generation' % CACHE_KEY
+
+
+def get_results_cache():
+    """
+    Return the cache used for the results of the searches.
+    """
+    try:
+        return caches['search']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def flush_results_cache():
+    """
+    Invalidate all the results cached, by renewing the generation token.
+    """
+    get_results_cache().set(GENERATION_KEY, uuid4().hex, None)
+
+
+def make_results_key(pattern):
+    """
+    Return the key of the results of a pattern, for the current
+    generation, the current site and the next publication boundary.
+    """
+    next_boundary = get_next_publication_boundary()
+    cache = get_results_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = uuid4().hex
+        cache.set(GENERATION_KEY, generation, None)
+    return '%s:%s:%s:%s:%s' % (
+        CACHE_KEY, generation, Site.objects.get_current().pk,
+        next_boundary,
+        md5(pattern.encode('utf-8')).hexdigest())
+
+
+class SearchResults(object):
+    """
+    Entries found by a search, sliced like a queryset from the
+    ordered list of their primary keys and fetched when iterated.
+    """
+
+    def __init__(self, pks, queryset):
+        self.pks = pks
+        self.queryset = queryset
+        self.model = queryset.model
+
+    @cached_property
+    def entries(self):
+        """
+        The entries fetched, in the order of the search.
+        """
+        entries = self.queryset.in_bulk(self.pks)
+        return [entries[pk] for pk in self.pks if pk in entries]
+
+    def __len__(self):
+        return len(self.pks)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SearchResults(self.pks[index], self.queryset)
+        return self.entries[index]
+
+    def count(self):
+        return len(self.pks)
+
+    def exists(self):
+        return bool(self.pks)
+
+    def prefetch_related(self, *lookups):
+        return SearchResults(self.pks,
+                             self.queryset.prefetch_related(*lookups))
+
+
+def search_results(pattern):
+    """
+    Search the published entries matching a pattern, the primary keys
+    of the entries found being cached until the next publication
+    boundary, or until an entry is changed.
+    """
+    pattern = pattern.strip()
+    if not SEARCH_RESULTS_TIMEOUT:
+        return Entry.published.search(pattern)
+
+    cache = get_results_cache()
+    key = make_results_key(pattern)
+    pks = cache.get(key)
+    if pks is None:
+        entries = Entry.published.search(pattern)
+        if isinstance(entries, SearchResults):
+            pks = entries.pks
+        else:
+            pks = list(entries.values_list('pk', flat=True))
+        cache.set(key, pks, get_publication_timeout(SEARCH_RESULTS_TIMEOUT))
+    return SearchResults(pks, Entry.published.all())
@@ -0,0 +1,261 @@
+"""Suggestions of the searches for Zinnia"""
+from bisect import bisect_left
+from collections import Counter
+from threading import Lock
+
+from django.contrib.sites.models import Site
+from django.urls import reverse
+
+from zinnia.models.category import Category
+from zinnia.models.entry import Entry
+from zinnia.search.results import get_results_cache
+
+CACHE_KEY = 'zinnia:suggestions'
+VERSION_KEY = '%s:version' % CACHE_KEY
+CHANGES_TIMEOUT = 24 * 3600
+
+
+def make_change_key(version):
+    """
+    Return the key of a change recorded for the suggestions.
+    """
+    return '%s:change:%s' % (CACHE_KEY, version)
+
+
+def record_change(kind, pk=None):
+    """
+    Record the change of an entry or of a category,
+    or of all the entries if no primary key is given,
+    to update the suggestions of all the processes.
+    Must be called once the change is committed, else
+    the processes can reload the previous values.
+    """
+    cache = get_results_cache()
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        version = 1
+        cache.set(VERSION_KEY, version, None)
+    cache.set(make_change_key(version), (kind, pk), CHANGES_TIMEOUT)
+
+
+class SuggestionIndex(object):
+    """
+    Sorted arrays of the titles of the entries, the tags,
+    the categories and the authors of the live entries
+    of a site, searched by prefix in memory.
+
+    The index is built once by process, then updated with the
+    entries and the categories changed by any process, recorded
+    in the cache. The threads of a process share the index,
+    updated by one thread at a time.
+    """
+    max_candidates = 1000
+    max_changes = 100
+
+    def __init__(self, site_id):
+        self.site_id = site_id
+        self.version = None
+        self.lock = Lock()
+        self.snapshot = ({}, {}, {}, self.build_arrays({}, {}, {}))
+
+    def refresh(self):
+        """
+        Apply the changes recorded since the last refresh,
+        on copies of the loaded values published at once,
+        so the threads searching the index meanwhile are
+        never given a half-applied version.
+        """
+        cache = get_results_cache()
+        if cache.get(VERSION_KEY, 0) == self.version:
+            return
+        with self.lock:
+            version = cache.get(VERSION_KEY, 0)
+            if version == self.version:
+                return
+            changes = {}
+            if (self.version is not None and
+                    self.version < version <=
+                    self.version + self.max_changes):
+                changes = cache.get_many([
+                    make_change_key(v) for v in range(self.version + 1,
+                                                      version + 1)])
+            entries, categories, authors, arrays = self.snapshot
+            if (len(changes) != version - (self.version or 0) or
+                    self.version is None or
+                    any(pk is None for kind, pk in changes.values())):
+                entries, categories, authors = self.rebuild()
+            else:
+                entries, authors = dict(entries), dict(authors)
+                kinds = set(kind for kind, pk in changes.values())
+                if 'category' in kinds:
+                    categories = self.load_categories()
+                self.load_entries(entries, authors,
+                                  [pk for kind, pk in changes.values()
+                                   if kind == 'entry'])
+            self.snapshot = (entries, categories, authors,
+                             self.build_arrays(entries, categories, authors))
+            self.version = version
+
+    def rebuild(self):
+        """
+        Load all the entries, the categories and the authors.
+        """
+        entries = {}
+        authors = {}
+        categories = self.load_categories()
+        self.load_entries(entries, authors)
+        return entries, categories, authors
+
+    def load_categories(self):
+        """
+        Load the titles and the URLs of the categories.
+        """
+        categories = dict(
+            (category.pk, category) for category in
+            Category.objects.only('title', 'slug', 'parent'))
+
+        def tree_path(category):
+            slugs = [category.slug]
+            while category.parent_id in categories:
+                category = categories[category.parent_id]
+                slugs.insert(0, category.slug)
+            return '/'.join(slugs)
+
+        return dict(
+            (pk, (category.title, category.slug,
+                  reverse('zinnia:category_detail',
+                          args=(tree_path(category),))))
+            for pk, category in categories.items())
+
+    def load_entries(self, entries, authors, pks=None):
+        """
+        Load in entries and authors the live entries
+        of the site, or only those whose primary key is given.
+        """
+        queryset = Entry.objects.filter(
+            is_live=True, sites=self.site_id).only(
+            'title', 'slug', 'tags', 'publication_date').prefetch_related(
+            'categories', 'authors')
+        if pks is not None:
+            if not pks:
+                return
+            queryset = queryset.filter(pk__in=pks)
+            for pk in pks:
+                entries.pop(pk, None)
+        for entry in queryset:
+            for author in entry.authors.all():
+                authors[author.pk] = (author.get_username(),
+                                      author.get_absolute_url())
+            entries[entry.pk] = (
+                entry.title, entry.get_absolute_url(),
+                entry.publication_date, entry.tags_list,
+                [category.pk for category in entry.categories.all()],
+                [author.pk for author in entry.authors.all()])
+
+    def build_arrays(self, entries, categories, authors):
+        """
+        Build the sorted arrays of keys, with the number of entries
+        of the tags, of the categories and of the authors.
+        """
+        titles = []
+        tags = Counter()
+        category_counts = Counter()
+        author_counts = Counter()
+        for pk, entry in entries.items():
+            words = entry[0].lower().split()
+            titles.extend((' '.join(words[i:]), pk)
+                          for i in range(len(words)))
+            tags.update(entry[3])
+            category_counts.update(entry[4])
+            author_counts.update(entry[5])
+        category_keys = []
+        for pk in category_counts:
+            if pk not in categories:
+                continue
+            title, slug, url = categories[pk]
+            category_keys.append((title.lower(), pk))
+            if slug != title.lower():
+                category_keys.append((slug, pk))
+        return {
+            'titles': sorted(titles),
+            'tags': (sorted((tag.lower(), tag) for tag in tags), tags),
+            'categories': (sorted(category_keys), category_counts),
+            'authors': (sorted((authors[pk][0].lower(), pk)
+                               for pk in author_counts), author_counts)}
+
+    def match(self, keys, prefix):
+        """
+        Return the values of the keys starting with a prefix.
+        """
+        index = bisect_left(keys, (prefix,))
+        end = min(len(keys), index + self.max_candidates)
+        values = []
+        seen = set()
+        while index < end and keys[index][0].startswith(prefix):
+            value = keys[index][1]
+            if value not in seen:
+                seen.add(value)
+                values.append(value)
+            index += 1
+        return values
+
+    def suggest(self, prefix, limit):
+        """
+        Return the most recent entries whose title contains a word
+        starting with the prefix, and the tags, the categories and
+        the authors starting with the prefix having the most entries.
+        """
+        prefix = prefix.strip().lower()
+        suggestions = {'entries': [], 'tags': [],
+                       'categories': [], 'authors': []}
+        if not prefix:
+            return suggestions
+        entries, categories, authors, arrays = self.snapshot
+
+        entries = sorted([entries[pk] for pk
+                          in self.match(arrays['titles'], prefix)],
+                         key=lambda entry: entry[2], reverse=True)
+        suggestions['entries'] = [
+            {'title': entry[0], 'url': entry[1]}
+            for entry in entries[:limit]]
+
+        keys, counts = arrays['tags']
+        tags = sorted(self.match(keys, prefix),
+                      key=lambda tag: (-counts[tag], tag))
+        suggestions['tags'] = [
+            {'name': tag, 'count': counts[tag],
+             'url': reverse('zinnia:tag_detail', args=[tag])}
+            for tag in tags[:limit]]
+
+        keys, counts = arrays['categories']
+        matches = sorted(self.match(keys, prefix),
+                         key=lambda pk: (-counts[pk], pk))
+        suggestions['categories'] = [
+            {'title': categories[pk][0], 'count': counts[pk],
+             'url': categories[pk][2]}
+            for pk in matches[:limit]]
+
+        keys, counts = arrays['authors']
+        matches = sorted(self.match(keys, prefix),
+                         key=lambda pk: (-counts[pk], pk))
+        suggestions['authors'] = [
+            {'username': authors[pk][0], 'count': counts[pk],
+             'url': authors[pk][1]}
+            for pk in matches[:limit]]
+        return suggestions
+
+
+INDEXES = {}
+
+
+def get_suggestions(prefix, limit=5):
+    """
+    Return the suggestions for a prefix on the current site.
+    """
+    site_id = Site.objects.get_current().pk
+    index = INDEXES.get(site_id)
+    if index is None:
+        index = INDEXES.setdefault(site_id, SuggestionIndex(site_id))
+    index.refresh()
+    return index.suggest(prefix, limit)
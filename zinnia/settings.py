@@ -17,6 +17,7 @@ COPYRIGHT = getattr(settings, 'ZINNIA_COPYRIGHT', 'Zinnia')
 PAGINATION = getattr(settings, 'ZINNIA_PAGINATION', 10)
 ALLOW_EMPTY = getattr(settings, 'ZINNIA_ALLOW_EMPTY', True)
 ALLOW_FUTURE = getattr(settings, 'ZINNIA_ALLOW_FUTURE', True)
+NAVIGATION_TIMEOUT = getattr(settings, 'ZINNIA_NAVIGATION_TIMEOUT', 3600)
 
 ENTRY_BASE_MODEL = getattr(settings, 'ZINNIA_ENTRY_BASE_MODEL',
                            'zinnia.models_bases.entry.AbstractEntry')
@@ -36,6 +37,10 @@ MARKDOWN_EXTENSIONS = getattr(settings, 'ZINNIA_MARKDOWN_EXTENSIONS', [])
 RESTRUCTUREDTEXT_SETTINGS = getattr(
     settings, 'ZINNIA_RESTRUCTUREDTEXT_SETTINGS', {})
 
+MARKUP_CACHE_SIZE = getattr(settings, 'ZINNIA_MARKUP_CACHE_SIZE', 256)
+
+MARKUP_CACHE_TIMEOUT = getattr(settings, 'ZINNIA_MARKUP_CACHE_TIMEOUT', 3600)
+
 PREVIEW_SPLITTERS = getattr(settings, 'ZINNIA_PREVIEW_SPLITTERS',
                             ['<!-- more -->', '<!--more-->'])
 
@@ -81,10 +86,38 @@ SEARCH_FIELDS = getattr(settings, 'ZINNIA_SEARCH_FIELDS',
                         ['title', 'lead', 'content',
                          'excerpt', 'image_caption', 'tags'])
 
+PUBLICATION_GRANULARITY = getattr(settings, 'ZINNIA_PUBLICATION_GRANULARITY',
+                                  0)
+
+READING_SPEED = getattr(settings, 'ZINNIA_READING_SPEED', 200)
+
+SEARCH_BACKEND = getattr(settings, 'ZINNIA_SEARCH_BACKEND',
+                         'zinnia.search.backends.default')
+
+SEARCH_CONFIG = getattr(settings, 'ZINNIA_SEARCH_CONFIG', 'simple')
+
+SEARCH_CACHE_SIZE = getattr(settings, 'ZINNIA_SEARCH_CACHE_SIZE', 256)
+
+SEARCH_RESULTS_TIMEOUT = getattr(settings,
+                                 'ZINNIA_SEARCH_RESULTS_TIMEOUT', 300)
+
+SEARCH_INDEX_PATH = getattr(settings, 'ZINNIA_SEARCH_INDEX_PATH', None)
+
 COMPARISON_FIELDS = getattr(settings, 'ZINNIA_COMPARISON_FIELDS',
                             ['title', 'lead', 'content',
                              'excerpt', 'image_caption', 'tags'])
 
+COMPARISON_METHOD = getattr(settings, 'ZINNIA_COMPARISON_METHOD',
+                            'pearson')
+
+COMPARISON_PRECOMPUTED = getattr(settings, 'ZINNIA_COMPARISON_PRECOMPUTED',
+                                 False)
+
+COMPARISON_PROCESSES = getattr(settings, 'ZINNIA_COMPARISON_PROCESSES', 1)
+
+COMPARISON_EARLY_REFRESH = getattr(settings, 'ZINNIA_COMPARISON_EARLY_REFRESH',
+                                   0)
+
 SPAM_CHECKER_BACKENDS = getattr(settings, 'ZINNIA_SPAM_CHECKER_BACKENDS',
                                 [])
 
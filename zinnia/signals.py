@@ -1,10 +1,15 @@
 """Signal handlers of Zinnia"""
 import inspect
+from functools import partial
 from functools import wraps
 
+from django.db import transaction
 from django.db.models import F
+from django.db.models.signals import m2m_changed
 from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_save
 from django.dispatch import Signal
 
 import django_comments as comments
@@ -13,15 +18,59 @@ from django_comments.signals import comment_was_posted
 
 from zinnia import settings
 from zinnia.comparison import EntryPublishedVectorBuilder
+from zinnia.counters import get_counted_objects
+from zinnia.counters import get_kind
+from zinnia.counters import update_counts
+from zinnia.counters import update_entries_counts
+from zinnia.models.category import Category
 from zinnia.models.entry import Entry
+from zinnia.navigation import NAVIGATION_UPDATE_FIELDS
+from zinnia.navigation import flush_navigation_cache
 from zinnia.ping import DirectoryPinger
 from zinnia.ping import ExternalUrlsPinger
+from zinnia.scheduler import live_entries_changed
+from zinnia.search import get_search_backend
+from zinnia.search.results import flush_results_cache
+from zinnia.search.suggestions import record_change
 
 comment_model = comments.get_model()
 ENTRY_PS_PING_DIRECTORIES = 'zinnia.entry.post_save.ping_directories'
 ENTRY_PS_PING_EXTERNAL_URLS = 'zinnia.entry.post_save.ping_external_urls'
-ENTRY_PS_FLUSH_SIMILAR_CACHE = 'zinnia.entry.post_save.flush_similar_cache'
-ENTRY_PD_FLUSH_SIMILAR_CACHE = 'zinnia.entry.post_delete.flush_similar_cache'
+ENTRY_PRS_UPDATE_SIMILAR_CACHE = 'zinnia.entry.pre_save.update_similar_cache'
+ENTRY_PS_UPDATE_SIMILAR_CACHE = 'zinnia.entry.post_save.update_similar_cache'
+ENTRY_PD_UPDATE_SIMILAR_CACHE = 'zinnia.entry.post_delete.update_similar_cache'
+ENTRY_SC_UPDATE_SIMILAR_CACHE = 'zinnia.entry.sites.update_similar_cache'
+ENTRY_LC_UPDATE_SIMILAR_CACHE = 'zinnia.entry.live.update_similar_cache'
+ENTRY_PS_INDEX_SEARCH = 'zinnia.entry.post_save.index_search'
+ENTRY_PD_UNINDEX_SEARCH = 'zinnia.entry.post_delete.unindex_search'
+ENTRY_CC_INDEX_SEARCH = 'zinnia.entry.categories.index_search'
+ENTRY_AC_INDEX_SEARCH = 'zinnia.entry.authors.index_search'
+ENTRY_PS_FLUSH_SEARCH = 'zinnia.entry.post_save.flush_search'
+ENTRY_PD_FLUSH_SEARCH = 'zinnia.entry.post_delete.flush_search'
+ENTRY_SC_FLUSH_SEARCH = 'zinnia.entry.sites.flush_search'
+ENTRY_CC_FLUSH_SEARCH = 'zinnia.entry.categories.flush_search'
+ENTRY_AC_FLUSH_SEARCH = 'zinnia.entry.authors.flush_search'
+ENTRY_LC_FLUSH_SEARCH = 'zinnia.entry.live.flush_search'
+ENTRY_PS_SUGGESTIONS = 'zinnia.entry.post_save.suggestions'
+ENTRY_PD_SUGGESTIONS = 'zinnia.entry.post_delete.suggestions'
+ENTRY_SC_SUGGESTIONS = 'zinnia.entry.sites.suggestions'
+ENTRY_CC_SUGGESTIONS = 'zinnia.entry.categories.suggestions'
+ENTRY_AC_SUGGESTIONS = 'zinnia.entry.authors.suggestions'
+ENTRY_LC_SUGGESTIONS = 'zinnia.entry.live.suggestions'
+CATEGORY_PS_SUGGESTIONS = 'zinnia.category.post_save.suggestions'
+CATEGORY_PD_SUGGESTIONS = 'zinnia.category.post_delete.suggestions'
+ENTRY_PRS_COUNT_PUBLISHED = 'zinnia.entry.pre_save.count_published'
+ENTRY_PS_COUNT_PUBLISHED = 'zinnia.entry.post_save.count_published'
+ENTRY_PRD_COUNT_PUBLISHED = 'zinnia.entry.pre_delete.count_published'
+ENTRY_PD_COUNT_PUBLISHED = 'zinnia.entry.post_delete.count_published'
+ENTRY_SC_COUNT_PUBLISHED = 'zinnia.entry.sites.count_published'
+ENTRY_CC_COUNT_PUBLISHED = 'zinnia.entry.categories.count_published'
+ENTRY_AC_COUNT_PUBLISHED = 'zinnia.entry.authors.count_published'
+ENTRY_LC_COUNT_PUBLISHED = 'zinnia.entry.live.count_published'
+ENTRY_PS_FLUSH_NAVIGATION = 'zinnia.entry.post_save.flush_navigation'
+ENTRY_PD_FLUSH_NAVIGATION = 'zinnia.entry.post_delete.flush_navigation'
+ENTRY_SC_FLUSH_NAVIGATION = 'zinnia.entry.sites.flush_navigation'
+ENTRY_LC_FLUSH_NAVIGATION = 'zinnia.entry.live.flush_navigation'
 COMMENT_PS_COUNT_DISCUSSIONS = 'zinnia.comment.post_save.count_discussions'
 COMMENT_PD_COUNT_DISCUSSIONS = 'zinnia.comment.post_delete.count_discussions'
 COMMENT_WF_COUNT_DISCUSSIONS = 'zinnia.comment.was_flagged.count_discussions'
@@ -72,16 +121,274 @@ def ping_external_urls_handler(sender, **kwargs):
         ExternalUrlsPinger(entry)
 
 
+def is_similar_update(update_fields):
+    """
+    Check if saving the fields of an entry can change
+    the datasets of the similar entries.
+    """
+    return update_fields is None or bool(set(update_fields) & set(
+        list(settings.COMPARISON_FIELDS) + [
+            'status', 'publication_date',
+            'start_publication', 'end_publication']))
+
+
+@disable_for_loaddata
+def keep_similar_live_handler(sender, **kwargs):
+    """
+    Keep if an entry not visible once saved was live before,
+    the datasets of the similar entries only containing live entries.
+    """
+    entry = kwargs['instance']
+    if not entry.is_visible and is_similar_update(
+            kwargs.get('update_fields')):
+        entry._similar_was_live = bool(entry.pk) and Entry.objects.filter(
+            pk=entry.pk, is_live=True).exists()
+
+
 @disable_for_loaddata
-def flush_similar_cache_handler(sender, **kwargs):
+def update_similar_cache_handler(sender, **kwargs):
     """
-    Flush the cache of similar entries when an entry is saved.
+    Update the cache of similar entries when an entry is saved,
+    deleted or when its sites are changed, unless a saved entry
+    is not visible and was not live before.
     """
     entry = kwargs['instance']
-    if entry.is_visible:
+    action = kwargs.get('action')
+    if action is None:
+        was_live = entry.__dict__.pop('_similar_was_live', True)
+        if is_similar_update(kwargs.get('update_fields')) and (
+                entry.is_visible or was_live):
+            EntryPublishedVectorBuilder().update_dataset([entry.pk])
+    elif action in ('post_add', 'post_remove'):
+        if kwargs['reverse']:
+            EntryPublishedVectorBuilder().update_dataset(kwargs['pk_set'])
+        else:
+            EntryPublishedVectorBuilder().update_dataset([entry.pk])
+    elif action == 'post_clear':
         EntryPublishedVectorBuilder().cache_flush()
 
 
+def update_live_similar_cache_handler(sender, **kwargs):
+    """
+    Update the cache of similar entries when
+    the publication of entries starts or ends.
+    """
+    EntryPublishedVectorBuilder().update_dataset(
+        kwargs['went_live'] + kwargs['expired'])
+
+
+def is_search_update(update_fields):
+    """
+    Check if saving the fields of an entry can change
+    its document in the index of the search backend.
+    """
+    return update_fields is None or bool(set(update_fields) & set(
+        list(settings.SEARCH_FIELDS) + ['tags']))
+
+
+def index_search_handler(sender, **kwargs):
+    """
+    Update the entry in the index of the search backend when saved
+    with searched fields, or when its categories or authors
+    are changed if indexed.
+    """
+    backend = get_search_backend()
+    action = kwargs.get('action')
+    if action is None:
+        if is_search_update(kwargs.get('update_fields')):
+            backend.index_entry(kwargs['instance'])
+    elif backend.index_relations and action in (
+            'post_add', 'post_remove', 'post_clear'):
+        if kwargs['reverse']:
+            if kwargs['pk_set']:
+                backend.index_entries(list(
+                    Entry.objects.filter(pk__in=kwargs['pk_set'])))
+        else:
+            backend.index_entry(kwargs['instance'])
+
+
+def unindex_search_handler(sender, **kwargs):
+    """
+    Remove the entry from the index of the search backend when deleted.
+    """
+    get_search_backend().unindex_entry(kwargs['instance'].pk)
+
+
+def is_search_results_update(update_fields):
+    """
+    Check if saving the fields of an entry can change
+    the results of the searches.
+    """
+    return is_search_update(update_fields) or bool(set(update_fields) & set(
+        ['status', 'publication_date', 'start_publication',
+         'end_publication', 'is_live']))
+
+
+def flush_search_results_handler(sender, **kwargs):
+    """
+    Flush the cached results of the searches when an entry is saved
+    with searched or publication fields, deleted, goes live, expires
+    or when its sites, categories or authors are changed,
+    once the transaction is committed.
+    """
+    action = kwargs.get('action')
+    if action is None:
+        if is_search_results_update(kwargs.get('update_fields')):
+            transaction.on_commit(flush_results_cache)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(flush_results_cache)
+
+
+def is_suggestion_update(update_fields):
+    """
+    Check if saving the fields of an entry can change
+    the suggestions of the searches.
+    """
+    return update_fields is None or bool(set(update_fields) & set(
+        ['title', 'slug', 'tags', 'publication_date', 'is_live']))
+
+
+def update_suggestions_handler(sender, **kwargs):
+    """
+    Record the changes of the entries and of the categories,
+    updating the suggestions of the searches, once the
+    transaction is committed so the other processes
+    never reload the values before they are saved.
+    """
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action is None:
+        if isinstance(instance, Category):
+            transaction.on_commit(
+                partial(record_change, 'category', instance.pk))
+        elif is_suggestion_update(kwargs.get('update_fields')):
+            transaction.on_commit(
+                partial(record_change, 'entry', instance.pk))
+    elif not kwargs['reverse']:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            transaction.on_commit(
+                partial(record_change, 'entry', instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        for pk in kwargs['pk_set']:
+            transaction.on_commit(partial(record_change, 'entry', pk))
+    elif action == 'pre_clear':
+        transaction.on_commit(partial(record_change, 'entry'))
+
+
+def update_live_suggestions_handler(sender, **kwargs):
+    """
+    Rebuild the suggestions of the searches when
+    the publication of entries starts or ends.
+    """
+    transaction.on_commit(partial(record_change, 'entry'))
+
+
+def is_counted_update(update_fields):
+    """
+    Check if saving the fields of an entry can change
+    the counts of the published entries.
+    """
+    return update_fields is None or bool(set(update_fields) & set(
+        ['status', 'start_publication', 'end_publication', 'tags']))
+
+
+def keep_counted_objects_handler(sender, **kwargs):
+    """
+    Keep the categories, the authors and the tags counted with
+    a live entry before it is saved or deleted, or with the live
+    entries whose relations are cleared, to count them again after.
+    """
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action is None:
+        if kwargs['signal'] is pre_delete:
+            live = instance.is_live
+        else:
+            live = instance.pk and is_counted_update(
+                kwargs.get('update_fields')) and Entry.objects.filter(
+                pk=instance.pk, is_live=True).exists()
+        if not live:
+            return
+        entry_pks = [instance.pk]
+    elif action == 'pre_clear':
+        if kwargs['reverse']:
+            entry_pks = list(instance.entries.filter(
+                is_live=True).values_list('pk', flat=True))
+        elif instance.is_live:
+            entry_pks = [instance.pk]
+        else:
+            return
+    else:
+        return
+    if entry_pks:
+        instance._counted_objects = get_counted_objects(entry_pks)
+
+
+def count_published_handler(sender, **kwargs):
+    """
+    Count again the entries published with the categories,
+    the authors and the tags of the live entries saved, deleted,
+    whose relations are changed or whose publication
+    starts or ends.
+    """
+    if 'went_live' in kwargs:
+        update_entries_counts(kwargs['went_live'] + kwargs['expired'])
+        return
+
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action == 'pre_clear':
+        keep_counted_objects_handler(sender, **kwargs)
+        return
+    counted_objects = instance.__dict__.pop('_counted_objects', None)
+    if action is None:
+        if kwargs['signal'] is post_delete:
+            if counted_objects is not None:
+                update_entries_counts([], counted_objects)
+        # A created entry is not on any site yet, so it is counted
+        # when its sites are added.
+        elif not kwargs.get('created') and is_counted_update(
+                kwargs.get('update_fields')) and (
+                counted_objects is not None or instance.is_live):
+            update_entries_counts([instance.pk], counted_objects or {})
+    elif action in ('post_add', 'post_remove'):
+        kind = get_kind(sender)
+        if kwargs['reverse']:
+            entry_pks = list(Entry.objects.filter(
+                pk__in=kwargs['pk_set'], is_live=True).values_list(
+                'pk', flat=True))
+            if not entry_pks:
+                return
+            if kind:
+                update_counts({kind: [instance.pk]})
+            else:
+                update_entries_counts(entry_pks)
+        elif instance.is_live:
+            if kind:
+                update_counts({kind: kwargs['pk_set']})
+            else:
+                update_entries_counts([instance.pk])
+    elif action == 'post_clear' and counted_objects is not None:
+        update_entries_counts([], counted_objects)
+
+
+def flush_navigation_handler(sender, **kwargs):
+    """
+    Flush the cached neighbours of the entries when an entry
+    is saved with fields used by the navigation, deleted,
+    goes live, expires or when its sites are changed,
+    once the transaction is committed.
+    """
+    action = kwargs.get('action')
+    update_fields = kwargs.get('update_fields')
+    if action is None:
+        if update_fields is None or set(update_fields) & \
+           NAVIGATION_UPDATE_FIELDS:
+            transaction.on_commit(flush_navigation_cache)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(flush_navigation_cache)
+
+
 def count_discussions_handler(sender, **kwargs):
     """
     Update the count of each type of discussion on an entry.
@@ -142,12 +449,21 @@ def connect_entry_signals():
     post_save.connect(
         ping_external_urls_handler, sender=Entry,
         dispatch_uid=ENTRY_PS_PING_EXTERNAL_URLS)
+    pre_save.connect(
+        keep_similar_live_handler, sender=Entry,
+        dispatch_uid=ENTRY_PRS_UPDATE_SIMILAR_CACHE)
     post_save.connect(
-        flush_similar_cache_handler, sender=Entry,
-        dispatch_uid=ENTRY_PS_FLUSH_SIMILAR_CACHE)
+        update_similar_cache_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_UPDATE_SIMILAR_CACHE)
     post_delete.connect(
-        flush_similar_cache_handler, sender=Entry,
-        dispatch_uid=ENTRY_PD_FLUSH_SIMILAR_CACHE)
+        update_similar_cache_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_UPDATE_SIMILAR_CACHE)
+    m2m_changed.connect(
+        update_similar_cache_handler, sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_UPDATE_SIMILAR_CACHE)
+    live_entries_changed.connect(
+        update_live_similar_cache_handler, sender=Entry,
+        dispatch_uid=ENTRY_LC_UPDATE_SIMILAR_CACHE)
 
 
 def disconnect_entry_signals():
@@ -160,12 +476,243 @@ def disconnect_entry_signals():
     post_save.disconnect(
         sender=Entry,
         dispatch_uid=ENTRY_PS_PING_EXTERNAL_URLS)
+    pre_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PRS_UPDATE_SIMILAR_CACHE)
+    post_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PS_UPDATE_SIMILAR_CACHE)
+    post_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PD_UPDATE_SIMILAR_CACHE)
+    m2m_changed.disconnect(
+        sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_UPDATE_SIMILAR_CACHE)
+    live_entries_changed.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_LC_UPDATE_SIMILAR_CACHE)
+
+
+def connect_search_signals():
+    """
+    Connect all the signals on Entry model keeping
+    the search index and the cached results up to date.
+    """
+    post_save.connect(
+        index_search_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_INDEX_SEARCH)
+    post_delete.connect(
+        unindex_search_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_UNINDEX_SEARCH)
+    m2m_changed.connect(
+        index_search_handler, sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_INDEX_SEARCH)
+    m2m_changed.connect(
+        index_search_handler, sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_INDEX_SEARCH)
+    post_save.connect(
+        flush_search_results_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_FLUSH_SEARCH)
+    post_delete.connect(
+        flush_search_results_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_FLUSH_SEARCH)
+    m2m_changed.connect(
+        flush_search_results_handler, sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_FLUSH_SEARCH)
+    m2m_changed.connect(
+        flush_search_results_handler, sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_FLUSH_SEARCH)
+    m2m_changed.connect(
+        flush_search_results_handler, sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_FLUSH_SEARCH)
+    live_entries_changed.connect(
+        flush_search_results_handler, sender=Entry,
+        dispatch_uid=ENTRY_LC_FLUSH_SEARCH)
+    post_save.connect(
+        update_suggestions_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_SUGGESTIONS)
+    post_delete.connect(
+        update_suggestions_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_SUGGESTIONS)
+    m2m_changed.connect(
+        update_suggestions_handler, sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_SUGGESTIONS)
+    m2m_changed.connect(
+        update_suggestions_handler, sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_SUGGESTIONS)
+    m2m_changed.connect(
+        update_suggestions_handler, sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_SUGGESTIONS)
+    live_entries_changed.connect(
+        update_live_suggestions_handler, sender=Entry,
+        dispatch_uid=ENTRY_LC_SUGGESTIONS)
+    post_save.connect(
+        update_suggestions_handler, sender=Category,
+        dispatch_uid=CATEGORY_PS_SUGGESTIONS)
+    post_delete.connect(
+        update_suggestions_handler, sender=Category,
+        dispatch_uid=CATEGORY_PD_SUGGESTIONS)
+
+
+def disconnect_search_signals():
+    """
+    Disconnect all the signals keeping
+    the search index and the cached results up to date.
+    """
+    post_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PS_INDEX_SEARCH)
+    post_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PD_UNINDEX_SEARCH)
+    m2m_changed.disconnect(
+        sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_INDEX_SEARCH)
+    m2m_changed.disconnect(
+        sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_INDEX_SEARCH)
+    post_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PS_FLUSH_SEARCH)
+    post_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PD_FLUSH_SEARCH)
+    m2m_changed.disconnect(
+        sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_FLUSH_SEARCH)
+    m2m_changed.disconnect(
+        sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_FLUSH_SEARCH)
+    m2m_changed.disconnect(
+        sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_FLUSH_SEARCH)
+    live_entries_changed.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_LC_FLUSH_SEARCH)
+    post_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PS_SUGGESTIONS)
+    post_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PD_SUGGESTIONS)
+    m2m_changed.disconnect(
+        sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_SUGGESTIONS)
+    m2m_changed.disconnect(
+        sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_SUGGESTIONS)
+    m2m_changed.disconnect(
+        sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_SUGGESTIONS)
+    live_entries_changed.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_LC_SUGGESTIONS)
+    post_save.disconnect(
+        sender=Category,
+        dispatch_uid=CATEGORY_PS_SUGGESTIONS)
+    post_delete.disconnect(
+        sender=Category,
+        dispatch_uid=CATEGORY_PD_SUGGESTIONS)
+
+
+def connect_count_signals():
+    """
+    Connect all the signals on Entry model keeping
+    the counts of the published entries up to date.
+    """
+    pre_save.connect(
+        keep_counted_objects_handler, sender=Entry,
+        dispatch_uid=ENTRY_PRS_COUNT_PUBLISHED)
+    post_save.connect(
+        count_published_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_COUNT_PUBLISHED)
+    pre_delete.connect(
+        keep_counted_objects_handler, sender=Entry,
+        dispatch_uid=ENTRY_PRD_COUNT_PUBLISHED)
+    post_delete.connect(
+        count_published_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_COUNT_PUBLISHED)
+    m2m_changed.connect(
+        count_published_handler, sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_COUNT_PUBLISHED)
+    m2m_changed.connect(
+        count_published_handler, sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_COUNT_PUBLISHED)
+    m2m_changed.connect(
+        count_published_handler, sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_COUNT_PUBLISHED)
+    live_entries_changed.connect(
+        count_published_handler, sender=Entry,
+        dispatch_uid=ENTRY_LC_COUNT_PUBLISHED)
+
+
+def disconnect_count_signals():
+    """
+    Disconnect all the signals on Entry model
+    keeping the counts of the published entries.
+    """
+    pre_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PRS_COUNT_PUBLISHED)
     post_save.disconnect(
         sender=Entry,
-        dispatch_uid=ENTRY_PS_FLUSH_SIMILAR_CACHE)
+        dispatch_uid=ENTRY_PS_COUNT_PUBLISHED)
+    pre_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PRD_COUNT_PUBLISHED)
     post_delete.disconnect(
         sender=Entry,
-        dispatch_uid=ENTRY_PD_FLUSH_SIMILAR_CACHE)
+        dispatch_uid=ENTRY_PD_COUNT_PUBLISHED)
+    m2m_changed.disconnect(
+        sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_COUNT_PUBLISHED)
+    m2m_changed.disconnect(
+        sender=Entry.categories.through,
+        dispatch_uid=ENTRY_CC_COUNT_PUBLISHED)
+    m2m_changed.disconnect(
+        sender=Entry.authors.through,
+        dispatch_uid=ENTRY_AC_COUNT_PUBLISHED)
+    live_entries_changed.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_LC_COUNT_PUBLISHED)
+
+
+def connect_navigation_signals():
+    """
+    Connect all the signals on Entry model keeping
+    the cached neighbours of the entries up to date.
+    """
+    post_save.connect(
+        flush_navigation_handler, sender=Entry,
+        dispatch_uid=ENTRY_PS_FLUSH_NAVIGATION)
+    post_delete.connect(
+        flush_navigation_handler, sender=Entry,
+        dispatch_uid=ENTRY_PD_FLUSH_NAVIGATION)
+    m2m_changed.connect(
+        flush_navigation_handler, sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_FLUSH_NAVIGATION)
+    live_entries_changed.connect(
+        flush_navigation_handler, sender=Entry,
+        dispatch_uid=ENTRY_LC_FLUSH_NAVIGATION)
+
+
+def disconnect_navigation_signals():
+    """
+    Disconnect all the signals on Entry model
+    keeping the cached neighbours of the entries.
+    """
+    post_save.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PS_FLUSH_NAVIGATION)
+    post_delete.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_PD_FLUSH_NAVIGATION)
+    m2m_changed.disconnect(
+        sender=Entry.sites.through,
+        dispatch_uid=ENTRY_SC_FLUSH_NAVIGATION)
+    live_entries_changed.disconnect(
+        sender=Entry,
+        dispatch_uid=ENTRY_LC_FLUSH_NAVIGATION)
 
 
 def connect_discussion_signals():
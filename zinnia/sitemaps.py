@@ -1,12 +1,11 @@
 """Sitemaps for Zinnia"""
 from django.contrib.sitemaps import Sitemap
-from django.db.models import Count
-from django.db.models import Max
+from django.db.models import Subquery
 from django.urls import reverse
 
-from tagging.models import Tag
 from tagging.models import TaggedItem
 
+from zinnia.managers import tags_count_entries_published
 from zinnia.models.author import Author
 from zinnia.models.category import Category
 from zinnia.models.entry import Entry
@@ -63,9 +62,10 @@ class EntryRelatedSitemap(ZinniaSitemap):
         Build a queryset of items with published entries and annotated
         with the number of entries and the latest modification date.
         """
-        return self.model.published.annotate(
-            count_entries_published=Count('entries')).annotate(
-            last_update=Max('entries__last_update')).order_by(
+        return self.model.published.annotate_count_entries_published(
+            ).annotate(last_update=Subquery(
+                self.model.published.entries_published().order_by(
+                    '-last_update').values('last_update')[:1])).order_by(
             '-count_entries_published', '-last_update', '-pk')
 
     def cache_infos(self, queryset):
@@ -125,8 +125,7 @@ class TagSitemap(EntryRelatedSitemap):
         Return the published Tags with option counts.
         """
         self.entries_qs = Entry.published.all()
-        return Tag.objects.usage_for_queryset(
-            self.entries_qs, counts=True)
+        return tags_count_entries_published()
 
     def cache_infos(self, queryset):
         """
@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Count
 from django.db.models import Q
+from django.db.models import Sum
 from django.template import Library
 from django.template.defaultfilters import stringfilter
 from django.template.loader import select_template
@@ -31,6 +32,7 @@ from ..context import get_context_first_object
 from ..context import get_context_loop_positions
 from ..flags import PINGBACK, TRACKBACK
 from ..managers import DRAFT
+from ..managers import tags_count_entries_published
 from ..managers import tags_published
 from ..models.author import Author
 from ..models.category import Category
@@ -56,8 +58,8 @@ def get_categories(context, template='zinnia/tags/categories.html'):
     Return the published categories.
     """
     return {'template': template,
-            'categories': Category.published.all().order_by('title').annotate(
-                count_entries_published=Count('entries')),
+            'categories': Category.published.annotate_count_entries_published(
+                ).order_by('title'),
             'context_category': context.get('category')}
 
 
@@ -78,8 +80,7 @@ def get_authors(context, template='zinnia/tags/authors.html'):
     Return the published authors.
     """
     return {'template': template,
-            'authors': Author.published.all().annotate(
-                count_entries_published=Count('entries')),
+            'authors': Author.published.annotate_count_entries_published(),
             'context_author': context.get('author')}
 
 
@@ -149,6 +150,19 @@ def get_similar_entries(context, number=5,
             'entries': entries}
 
 
+@register.simple_tag
+def get_similar_entries_list(entries, number=5):
+    """
+    Return a list of entries with their similar entries,
+    computed at once for all the entries.
+    """
+    entries = list(entries)
+    vectors = EntryPublishedVectorBuilder()
+    related = vectors.get_related_many(entries, number)
+
+    return [(entry, related.get(entry.pk, [])) for entry in entries]
+
+
 @register.inclusion_tag('zinnia/tags/dummy.html')
 def get_archives_entries(template='zinnia/tags/entries_archives.html'):
     """
@@ -380,9 +394,7 @@ def get_tag_cloud(context, steps=6, min_count=None,
     """
     Return a cloud of published tags.
     """
-    tags = Tag.objects.usage_for_queryset(
-        Entry.published.all(), counts=True,
-        min_count=min_count)
+    tags = tags_count_entries_published(min_count)
     return {'template': template,
             'tags': calculate_cloud(tags, steps),
             'context_tag': context.get('tag')}
@@ -479,9 +491,8 @@ def zinnia_statistics(template='zinnia/tags/statistics.html'):
         linkbacks_per_entry = float(pingbacks_count + trackbacks_count) / \
             entries_count
 
-        total_words_entry = 0
-        for e in entries.all():
-            total_words_entry += e.word_count
+        total_words_entry = entries.aggregate(
+            words=Sum('word_count'))['words'] or 0
         words_per_entry = float(total_words_entry) / entries_count
 
         words_per_comment = 0.0
@@ -5,6 +5,7 @@ from __future__ import unicode_literals
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.test import RequestFactory
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -13,6 +14,7 @@ from django.utils import timezone
 from django.utils.translation import activate
 from django.utils.translation import deactivate
 
+from zinnia import navigation
 from zinnia import settings
 from zinnia.admin import entry as entry_admin
 from zinnia.admin.category import CategoryAdmin
@@ -21,8 +23,11 @@ from zinnia.managers import PUBLISHED
 from zinnia.models.author import Author
 from zinnia.models.category import Category
 from zinnia.models.entry import Entry
+from zinnia.search import results
+from zinnia.search import suggestions
 from zinnia.signals import disconnect_entry_signals
 from zinnia.tests.utils import datetime
+from zinnia.tests.utils import run_on_commit_callbacks
 from zinnia.tests.utils import skip_if_custom_user
 from zinnia.url_shortener.backends.default import base36
 
@@ -386,6 +391,31 @@ class EntryAdminTestCase(BaseAdminTestCase):
         self.assertEqual(len(self.request._messages.messages), 1)
         settings.PING_DIRECTORIES = original_ping_directories
 
+    def test_put_on_top_flush_caches(self):
+        original_ping_directories = settings.PING_DIRECTORIES
+        settings.PING_DIRECTORIES = []
+        self.request._messages = TestMessageBackend()
+        navigation.make_navigation_key(self.entry.pk)
+        results.make_results_key('entry')
+        suggestions.record_change('entry', self.entry.pk)
+        generations = (
+            cache.get(navigation.GENERATION_KEY),
+            results.get_results_cache().get(results.GENERATION_KEY))
+        version = results.get_results_cache().get(suggestions.VERSION_KEY)
+        with run_on_commit_callbacks():
+            self.admin.put_on_top(self.request, Entry.objects.all())
+        self.assertNotEqual(cache.get(navigation.GENERATION_KEY),
+                            generations[0])
+        self.assertNotEqual(
+            results.get_results_cache().get(results.GENERATION_KEY),
+            generations[1])
+        self.assertEqual(
+            results.get_results_cache().get(suggestions.VERSION_KEY),
+            version + 1)
+        self.assertEqual(results.get_results_cache().get(
+            suggestions.make_change_key(version + 1)), ('entry', None))
+        settings.PING_DIRECTORIES = original_ping_directories
+
     def test_mark_unmark_featured(self):
         self.request._messages = TestMessageBackend()
         self.assertEqual(Entry.objects.filter(
@@ -1,14 +1,30 @@
 """Test cases for Zinnia's comparison"""
+import time
+from random import Random
+
+from django.contrib.sites.models import Site
+from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils.functional import cached_property
 
 from mots_vides import stop_words
 
 from zinnia import comparison
 from zinnia.comparison import CachedModelVectorBuilder
+from zinnia.comparison import EntryPublishedVectorBuilder
+from zinnia.comparison import MinHashModelVectorBuilder
 from zinnia.comparison import ModelVectorBuilder
+from zinnia.comparison import TFIDFModelVectorBuilder
+from zinnia.comparison import VectorizedModelVectorBuilder
+from zinnia.comparison import cosine_score
+from zinnia.comparison import minhash_score
 from zinnia.comparison import pearson_score
+from zinnia.managers import PUBLISHED
 from zinnia.models.entry import Entry
+from zinnia.models.similar import SimilarEntry
 from zinnia.signals import disconnect_entry_signals
+from zinnia.tests.utils import skip_if_lib_not_available
 
 
 class ComparisonTestCase(TestCase):
@@ -44,6 +60,129 @@ class ComparisonTestCase(TestCase):
                                fields=['title'], limit=1)
         self.assertEqual(list(v.raw_dataset.values()), [['entry']])
 
+    def test_raw_dataset_chunks(self):
+        for i in range(1, 6):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content about zinnia %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            Entry.objects.create(**params)
+        fields = ['title', 'content']
+        v = ModelVectorBuilder(queryset=Entry.objects.all(), fields=fields)
+        w = ModelVectorBuilder(queryset=Entry.objects.all(), fields=fields)
+        w.chunk_size = 2
+        self.assertEqual(list(w.raw_dataset.items()),
+                         list(v.raw_dataset.items()))
+        w = ModelVectorBuilder(queryset=Entry.objects.all(), fields=fields)
+        w.processes = 2
+        self.assertEqual(list(w.raw_dataset.items()),
+                         list(v.raw_dataset.items()))
+
+    def test_raw_dataset_cached_words(self):
+        class CountingVectorBuilder(CachedModelVectorBuilder):
+            cleaned = []
+            update_field = 'last_update'
+
+            def raw_clean(self, datas):
+                self.cleaned.append(datas)
+                return super(CountingVectorBuilder, self).raw_clean(datas)
+
+        entries = []
+        for i in range(1, 4):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content about zinnia %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            entries.append(Entry.objects.create(**params))
+        fields = ['title', 'content']
+        v = CountingVectorBuilder(queryset=Entry.objects.all(),
+                                  fields=fields)
+        v.cache_flush()
+        self.assertEqual(len(v.raw_dataset), 3)
+        self.assertEqual(len(v.cleaned), 3)
+
+        entries[0].content = 'Zinnia rocks'
+        entries[0].save()
+        v.cache_flush()
+        w = CountingVectorBuilder(queryset=Entry.objects.all(),
+                                  fields=fields)
+        self.assertEqual(w.raw_dataset[entries[0].pk],
+                         ['entry', 'zinnia', 'rocks'])
+        self.assertEqual(w.raw_dataset[entries[1].pk],
+                         v.raw_dataset[entries[1].pk])
+        self.assertEqual(len(w.cleaned), 4)
+        self.assertEqual(list(w.raw_dataset.keys()),
+                         list(Entry.objects.values_list('pk', flat=True)))
+        v.cache_flush()
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10}}})
+    def test_raw_dataset_cached_words_max_entries(self):
+        for i in range(1, 31):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content about zinnia %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            Entry.objects.create(**params)
+        v = CachedModelVectorBuilder(queryset=Entry.objects.all(),
+                                     fields=['title', 'content'])
+        v.update_field = 'last_update'
+        v.cache_flush()
+        generation = v.generation
+        self.assertEqual(len(v.dataset), 30)
+        self.assertEqual(len(v.cache_backend.get(v.words_key(
+            v.words_chunk(Entry.objects.first().pk)))), 30)
+        w = CachedModelVectorBuilder(queryset=Entry.objects.all(),
+                                     fields=['title', 'content'])
+        self.assertEqual(w.generation, generation)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(w.dataset), 30)
+
+        Entry.objects.filter(slug='my-entry-1').delete()
+        w.cache_flush()
+        w = CachedModelVectorBuilder(queryset=Entry.objects.all(),
+                                     fields=['title', 'content'])
+        w.update_field = 'last_update'
+        self.assertEqual(len(w.dataset), 29)
+        self.assertEqual(len(w.cache_backend.get(w.words_key(
+            w.words_chunk(Entry.objects.first().pk)))), 29)
+
+    def test_cached_vector_builder_update_dataset_words(self):
+        entries = []
+        for i in range(4):
+            entries.append(Entry.objects.create(
+                title='My entry number %s' % i,
+                content='My content number %s' % i,
+                slug='my-entry-%s' % i))
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v.update_field = 'last_update'
+        v.words_chunk_size = 2
+        v.cache_flush()
+        self.assertEqual(len(v.dataset), 4)
+        cache = v.cache_backend
+        chunks = sorted(set(v.words_chunk(entry.pk) for entry in entries))
+        keys = [v.words_key(chunk) for chunk in chunks]
+        self.assertEqual(sum(len(words) for words in cache.get_many(
+            keys).values()), 4)
+
+        entry = entries[0]
+        entry.content = 'Zinnia rocks'
+        entry.save()
+        other_key = v.words_key(v.words_chunk(entries[3].pk))
+        cache.set(other_key, {})
+        v.update_dataset([entry.pk])
+        words = cache.get(v.words_key(v.words_chunk(entry.pk)))
+        self.assertEqual(words[entry.pk][1],
+                         ['entry', 'number', 'zinnia', 'rocks'])
+        self.assertEqual(cache.get(other_key), {})
+
+        entry_pk = entry.pk
+        entry.delete()
+        v.update_dataset([entry_pk])
+        self.assertNotIn(entry_pk, cache.get(
+            v.words_key(v.words_chunk(entry_pk))))
+        cache.delete_many(keys)
+        v.cache_flush()
+
     def test_column_dataset(self):
         vectors = ModelVectorBuilder(queryset=Entry.objects.all(),
                                      fields=['title', 'excerpt', 'content'])
@@ -64,6 +203,72 @@ class ComparisonTestCase(TestCase):
         self.assertEqual(vectors.dataset[e1.pk], [2, 0, 1, 1])
         self.assertEqual(vectors.dataset[e2.pk], [0, 2, 1, 2])
 
+    def test_build_columns_ties(self):
+        vectors = ModelVectorBuilder(queryset=Entry.objects.none(),
+                                     fields=['title'])
+        words = ['word%03d' % i for i in range(260)]
+        words_total = dict((word, 1) for word in reversed(words))
+        words_total['word259'] = 2
+        self.assertEqual(vectors.build_columns(words_total),
+                         words[:249] + ['word259'])
+
+    def test_update_dataset(self):
+        params = {'title': 'My entry 1 (01)', 'content':
+                  'This is my first content 1 (01)',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry 2 (02)', 'content':
+                  'My second content entry 2 (02)',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        fields = ['title', 'excerpt', 'content']
+        vectors = ModelVectorBuilder(queryset=Entry.objects.all(),
+                                     fields=fields)
+        self.assertEqual(vectors.columns, ['01', '02', 'content', 'entry'])
+
+        e1.content = 'This is my first content entry 1 (01)'
+        e1.save()
+        with self.assertNumQueries(1):
+            vectors.update_dataset([e1.pk])
+        self.assertEqual(vectors.columns, ['01', '02', 'content', 'entry'])
+        self.assertEqual(vectors.dataset[e1.pk], [2, 0, 1, 2])
+        self.assertEqual(vectors.dataset[e2.pk], [0, 2, 1, 2])
+
+        params = {'title': 'My entry 3 (03)', 'content':
+                  'My third content',
+                  'slug': 'my-entry-3'}
+        e3 = Entry.objects.create(**params)
+        vectors.update_dataset([e3.pk])
+        e2_pk = e2.pk
+        e2.delete()
+        vectors.update_dataset([e2_pk])
+        full_vectors = ModelVectorBuilder(queryset=Entry.objects.all(),
+                                          fields=fields)
+        self.assertEqual(vectors.columns_dataset,
+                         full_vectors.columns_dataset)
+        self.assertEqual(vectors.words_dataset,
+                         full_vectors.words_dataset)
+        self.assertEqual(vectors.columns, ['01', '03', 'content', 'entry'])
+        with self.assertNumQueries(1):
+            vectors.update_dataset([e2_pk])
+
+        vectors = ModelVectorBuilder(queryset=Entry.objects.order_by('-pk'),
+                                     fields=fields, limit=1)
+        self.assertEqual(list(vectors.dataset.keys()), [e3.pk])
+        params = {'title': 'My entry 4 (04)', 'content':
+                  'My fourth content',
+                  'slug': 'my-entry-4'}
+        e4 = Entry.objects.create(**params)
+        with self.assertNumQueries(2):
+            vectors.update_dataset([e4.pk])
+        self.assertEqual(list(vectors.dataset.keys()), [e4.pk])
+        self.assertEqual(vectors.columns, ['04', 'content', 'entry', 'fourth'])
+        e4_pk = e4.pk
+        e4.delete()
+        vectors.update_dataset([e4_pk])
+        self.assertEqual(list(vectors.dataset.keys()), [e3.pk])
+        self.assertEqual(vectors.columns, ['03', 'content', 'entry'])
+
     def test_pearson_score(self):
         self.assertRaises(ZeroDivisionError, pearson_score,
                           [42], [42])
@@ -113,6 +318,95 @@ class ComparisonTestCase(TestCase):
                           (3, 0.15554275420956382),
                           (5, -0.5)])
 
+    def test_compute_related_number(self):
+        class VirtualVectorBuilder(ModelVectorBuilder):
+            dataset = {1: [1, 2, 3],
+                       2: [1, 5, 7],
+                       3: [2, 8, 3],
+                       4: [1, 8, 3],
+                       5: [7, 3, 5]}
+
+        v = VirtualVectorBuilder()
+        self.assertEqual(v.compute_related(1, number=2),
+                         [(2, 0.9819805060619659),
+                          (4, 0.2773500981126146)])
+        self.assertEqual(v.compute_related(1, number=0), [])
+        self.assertEqual(len(v.compute_related(1, number=10)), 4)
+
+    @skip_if_lib_not_available('numpy')
+    def test_vectorized_compute_related(self):
+        dataset = {1: [1, 2, 3],
+                   2: [1, 5, 7],
+                   3: [2, 8, 3],
+                   4: [1, 8, 3],
+                   5: [7, 3, 5],
+                   6: [1, 8, 3],
+                   7: [4, 4, 4]}
+
+        class VirtualVectorBuilder(ModelVectorBuilder):
+            pass
+
+        class VirtualVectorizedBuilder(VectorizedModelVectorBuilder):
+            pass
+
+        VirtualVectorBuilder.dataset = dataset
+        VirtualVectorizedBuilder.dataset = dataset
+        v = VirtualVectorBuilder()
+        vv = VirtualVectorizedBuilder()
+        self.assertEqual(vv.compute_related('error'), [])
+        self.assertEqual(vv.compute_related(7), [])
+        for object_id in dataset:
+            for number in (None, 0, 1, 2, 3, 10):
+                related = v.compute_related(object_id, number=number)
+                vectorized = vv.compute_related(object_id, number=number)
+                self.assertEqual([pk for pk, score in vectorized],
+                                 [pk for pk, score in related])
+                for (pk, score), (v_pk, v_score) in zip(related, vectorized):
+                    self.assertAlmostEqual(score, v_score)
+        self.assertEqual([pk for pk, score in vv.compute_related(3, number=1)],
+                         [6])
+        self.assertEqual(vv.compute_related(1, score=lambda x, y: 1),
+                         [(7, 1), (6, 1), (5, 1), (4, 1), (3, 1), (2, 1)])
+
+    @skip_if_lib_not_available('numpy')
+    def test_vectorized_compute_related_ties(self):
+        random = Random(42)
+        vectors = [[random.randint(0, 3) for i in range(8)]
+                   for j in range(30)]
+        dataset = dict((i + 1, list(vectors[i % 30])) for i in range(90))
+
+        class VirtualVectorBuilder(ModelVectorBuilder):
+            pass
+
+        class VirtualVectorizedBuilder(VectorizedModelVectorBuilder):
+            pass
+
+        VirtualVectorBuilder.dataset = dataset
+        VirtualVectorizedBuilder.dataset = dataset
+        v = VirtualVectorBuilder()
+        vv = VirtualVectorizedBuilder()
+        for object_id in dataset:
+            self.assertEqual(
+                [pk for pk, score in vv.compute_related(object_id, number=5)],
+                [pk for pk, score in v.compute_related(object_id, number=5)])
+
+    @skip_if_lib_not_available('numpy')
+    def test_vectorized_get_related(self):
+        params = {'title': 'My entry 01', 'content':
+                  'This is my first content 01',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry 02', 'content':
+                  'My second content entry 02',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        vectors = VectorizedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        with self.assertNumQueries(2):
+            self.assertEqual(vectors.get_related(e1, 10), [e2])
+        with self.assertNumQueries(1):
+            self.assertEqual(vectors.get_related(e2, 10), [e1])
+
     def test_get_related(self):
         params = {'title': 'My entry 01', 'content':
                   'This is my first content 01',
@@ -178,6 +472,712 @@ class ComparisonTestCase(TestCase):
         with self.assertNumQueries(0):
             self.assertEqual(len(v.get_related(e1, 5)), 2)
 
+    def test_cached_vector_builder_generation(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry number 2',
+                  'content': 'My content number 2',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        v1 = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v2 = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v1.cache_flush()
+        generation = v1.generation
+        self.assertEqual(v2.generation, generation)
+        self.assertEqual(v1.cache, {})
+
+        self.assertEqual(v1.get_related(e1, 5), [e2])
+        self.assertEqual(v2.get_related(e2, 5), [e1])
+        cache = v1.cache_backend
+        self.assertEqual(
+            cache.get(v1.make_key(generation, 'related:%s' % e1.pk)),
+            {5: [e2]})
+        self.assertEqual(
+            cache.get(v1.make_key(generation, 'related:%s' % e2.pk)),
+            {5: [e1]})
+        self.assertEqual(sorted(v2.cache.keys()),
+                         ['columns_dataset', 'words_dataset'])
+
+        v2.set_datasets(v2.words_dataset, v2.columns_dataset)
+        self.assertNotEqual(v1.generation, generation)
+        self.assertEqual(sorted(v1.cache.keys()),
+                         ['columns_dataset', 'words_dataset'])
+        self.assertIsNone(cache.get(v1.make_key(
+            v1.generation, 'related:%s' % e1.pk)))
+
+        v2.cache_flush()
+        self.assertEqual(v1.cache, {})
+        cache.delete(v1.generation_key)
+        self.assertEqual(v1.cache, {})
+        self.assertEqual(v1.generation, v2.generation)
+        v1.cache_flush()
+
+    def test_cached_vector_builder_rebuild_lock(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry number 2',
+                  'content': 'My content number 2',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        cache = v.cache_backend
+        v.cache_flush()
+        cache.delete(v.previous_generation_key)
+        lock_key = v.make_key(v.generation, 'lock:columns_dataset')
+        cache.add(lock_key, True)
+        self.assertTrue(v.is_rebuilding())
+        with self.assertNumQueries(0):
+            self.assertEqual(v.get_related(e1, 5), [])
+        cache.delete(lock_key)
+        self.assertFalse(v.is_rebuilding())
+        self.assertEqual(v.get_related(e1, 5), [e2])
+        columns = v.columns
+
+        v.cache_flush()
+        lock_key = v.make_key(v.generation, 'lock:columns_dataset')
+        cache.add(lock_key, True)
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        with self.assertNumQueries(0):
+            self.assertEqual(v.get_related(e1, 5), [e2])
+            self.assertEqual(v.columns, columns)
+        cache.delete(lock_key)
+        self.assertNotIn(
+            'columns_dataset',
+            CachedModelVectorBuilder(queryset=Entry.objects.all(),
+                                     fields=['title', 'content']).cache)
+        v.cache_flush()
+
+    def test_cached_vector_builder_rebuild_lock_cold(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        Entry.objects.create(**params)
+
+        class CountingVectorBuilder(CachedModelVectorBuilder):
+            built = 0
+
+            def build_raw_dataset(self, queryset):
+                CountingVectorBuilder.built += 1
+                return super(CountingVectorBuilder,
+                             self).build_raw_dataset(queryset)
+
+        v = CountingVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        cache = v.cache_backend
+        cache.delete(v.previous_generation_key)
+        v.cache_flush()
+        lock_keys = [v.make_key(v.generation, 'lock:%s' % name)
+                     for name in v.datasets]
+        for lock_key in lock_keys:
+            cache.add(lock_key, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(v.dataset, {})
+            self.assertEqual(v.columns, [])
+            self.assertEqual(v.words_dataset, ({}, {}))
+        self.assertEqual(CountingVectorBuilder.built, 0)
+        self.assertEqual(v.cache, {})
+
+        cache.delete(lock_keys[1])
+        w = CountingVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        self.assertEqual(w.dataset, {})
+        self.assertEqual(CountingVectorBuilder.built, 0)
+        self.assertEqual(w.cache, {})
+        self.assertIsNone(cache.get(lock_keys[1]))
+
+        w = CountingVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        w.compute_when_locked = True
+        self.assertEqual(len(w.dataset), 1)
+        self.assertEqual(CountingVectorBuilder.built, 1)
+        cache.delete(lock_keys[0])
+        v.cache_flush()
+
+    def test_cached_vector_builder_rebuild_lock_race(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry number 2',
+                  'content': 'My content number 2',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v.is_rebuilding = lambda: False
+        cache = v.cache_backend
+        v.cache_flush()
+        cache.delete(v.previous_generation_key)
+        lock_keys = [v.make_key(v.generation, 'lock:%s' % name)
+                     for name in v.datasets]
+        for lock_key in lock_keys:
+            cache.add(lock_key, True)
+        self.assertEqual(v.get_related(e1, 5), [])
+        self.assertEqual(v.get_related_many([e1, e2], 5),
+                         {e1.pk: [], e2.pk: []})
+        self.assertEqual(cache.get_many([
+            v.make_key(v.generation, 'related:%s' % entry.pk)
+            for entry in (e1, e2)]), {})
+
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        with self.assertNumQueries(0):
+            self.assertEqual(v.get_related_many([e1, e2], 5),
+                             {e1.pk: [], e2.pk: []})
+        self.assertIsNone(cache.get(v.make_key(None, 'related:%s' % e1.pk)))
+        cache.delete_many(lock_keys)
+        self.assertEqual(v.get_related(e1, 5), [e2])
+        v.cache_flush()
+
+    def test_cached_vector_builder_early_refresh(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        self.assertFalse(v.is_expiring(10, 0))
+        v.early_refresh = 1
+        self.assertFalse(v.is_expiring(10, None))
+        self.assertTrue(v.is_expiring(10, 0))
+        self.assertFalse(v.is_expiring(0, time.time() + 60))
+
+        v.cache_flush()
+        v.early_refresh = 0
+        self.assertEqual(sorted(v.dataset.keys()), [e1.pk])
+        w = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        w.early_refresh = 10 ** 9
+        self.assertEqual(w.cache, {})
+        self.assertEqual(sorted(w.__dict__['stale_datasets'].keys()),
+                         ['columns_dataset', 'words_dataset'])
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted(w.dataset.keys()), [e1.pk])
+
+        w.early_refresh = 0
+        key = w.make_key(w.generation, 'words_dataset')
+        dataset, delta, expiry = w.cache_backend.get(key)
+        w.cache_backend.set(key, (dataset, 60, expiry))
+        params = {'title': 'My entry number 2',
+                  'content': 'My content number 2',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        w.update_dataset([e2.pk])
+        deltas = dict(
+            (name, w.cache_backend.get(w.make_key(w.generation, name))[1])
+            for name in w.datasets)
+        self.assertEqual(deltas['words_dataset'], 60)
+        self.assertGreater(deltas['columns_dataset'], 0)
+        self.assertLess(deltas['columns_dataset'], 60)
+        v.cache_flush()
+
+    def test_cached_vector_builder_update_dataset(self):
+        params = {'title': 'My entry number 1',
+                  'content': 'My content number 1',
+                  'slug': 'my-entry-1'}
+        e1 = Entry.objects.create(**params)
+        params = {'title': 'My entry number 2',
+                  'content': 'My content number 2',
+                  'slug': 'my-entry-2'}
+        e2 = Entry.objects.create(**params)
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v.cache_flush()
+        with self.assertNumQueries(0):
+            v.update_dataset([e1.pk])
+        with self.assertNumQueries(2):
+            self.assertEqual(v.get_related(e1, 5), [e2])
+
+        params = {'title': 'My entry number 3',
+                  'content': 'My content number 3',
+                  'slug': 'my-entry-3'}
+        e3 = Entry.objects.create(**params)
+        with self.assertNumQueries(1):
+            v.update_dataset([e3.pk])
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        with self.assertNumQueries(0):
+            self.assertEqual(sorted(v.dataset.keys()),
+                             [e1.pk, e2.pk, e3.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(len(v.get_related(e1, 5)), 2)
+
+        e3_pk = e3.pk
+        e3.delete()
+        v.update_dataset([e3_pk])
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        with self.assertNumQueries(1):
+            self.assertEqual(v.get_related(e1, 5), [e2])
+        v.cache_flush()
+
+    def test_cached_vector_builder_update_dataset_related(self):
+        entries = []
+        for i, content in enumerate(['paris france city', 'paris city',
+                                     'berlin germany', 'berlin city']):
+            entries.append(Entry.objects.create(
+                title='Entry %s' % i, content=content,
+                slug='my-entry-%s' % i))
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['content'])
+        v.related_refresh = 1
+        v.cache_flush()
+        related = v.get_related_many(entries, 1)
+        generation = v.generation
+        keys = [v.make_key(generation, 'related:%s' % entry.pk)
+                for entry in entries]
+        self.assertEqual(len(v.cache_backend.get_many(keys)), 4)
+
+        v.update_dataset([entries[0].pk])
+        self.assertEqual(v.generation, generation)
+        cached = v.cache_backend.get_many(keys)
+        self.assertNotIn(keys[0], cached)
+        self.assertNotIn(v.make_key(generation, 'related:%s' % (
+            related[entries[0].pk][0].pk)), cached)
+        self.assertEqual(len(cached), 2)
+
+        v.get_related_many(entries, 3)
+        removed = entries[3]
+        removed_pk = removed.pk
+        removed.delete()
+        v.update_dataset([removed_pk])
+        self.assertNotEqual(v.generation, generation)
+        related = v.get_related_many(entries[:3], 3)
+        for related_entries in related.values():
+            self.assertNotIn(removed_pk,
+                             [entry.pk for entry in related_entries])
+        v.cache_flush()
+
+    def test_cached_vector_builder_update_dataset_concurrent(self):
+        entries = []
+        for i in range(4):
+            entries.append(Entry.objects.create(
+                title='My entry number %s' % i,
+                content='My content number %s' % i,
+                slug='my-entry-%s' % i))
+        v1 = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v2 = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v1.cache_flush()
+        self.assertEqual(len(v1.dataset), 4)
+        self.assertEqual(len(v2.dataset), 4)
+
+        pks = [entry.pk for entry in entries]
+        entries[0].delete()
+        v2.update_dataset([pks[0]])
+        entries[1].delete()
+        v1.update_dataset([pks[1]])
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        self.assertEqual(sorted(v.dataset.keys()), pks[2:])
+
+        generation = v.generation
+        v.cache_backend.add(v.update_lock_key, True)
+        entries[2].delete()
+        with self.assertNumQueries(0):
+            v1.update_dataset([pks[2]])
+        self.assertNotEqual(v.generation, generation)
+        v.cache_backend.delete(v.update_lock_key)
+        self.assertEqual(sorted(v1.dataset.keys()), pks[3:])
+        v.cache_flush()
+
+    def test_cosine_score(self):
+        self.assertEqual(cosine_score(([], []), ([0, 1], [0.6, 0.8])), 0)
+        self.assertEqual(cosine_score(([0, 1], [0.6, 0.8]),
+                                      ([0, 1], [0.6, 0.8])), 1.0)
+        self.assertAlmostEqual(cosine_score(([0, 2], [0.6, 0.8]),
+                                            ([1, 2], [0.6, 0.8])), 0.64)
+
+    def test_tfidf_columns_dataset(self):
+        class VirtualVectorBuilder(TFIDFModelVectorBuilder):
+            words_dataset = ({1: {'zinnia': 2, 'blog': 1},
+                              2: {'zinnia': 1, 'django': 1},
+                              3: {'django': 1, 'python': 1}},
+                             {'zinnia': 3, 'blog': 1,
+                              'django': 2, 'python': 1})
+
+        v = VirtualVectorBuilder()
+        self.assertEqual(v.columns, ['blog', 'django', 'python', 'zinnia'])
+        self.assertEqual(list(v.dataset[1][0]), [0, 3])
+        self.assertEqual(list(v.dataset[2][0]), [1, 3])
+        self.assertEqual(list(v.dataset[3][0]), [1, 2])
+        for indices, weights in v.dataset.values():
+            self.assertAlmostEqual(sum([w * w for w in weights]), 1.0)
+        self.assertGreater(v.dataset[3][1][1], v.dataset[3][1][0])
+
+        v = VirtualVectorBuilder()
+        v.min_df = 2
+        self.assertEqual(v.columns, ['django', 'zinnia'])
+        self.assertEqual(list(v.dataset[1][0]), [1])
+        v = VirtualVectorBuilder()
+        v.max_df = 0.5
+        self.assertEqual(v.columns, ['blog', 'python'])
+        self.assertEqual(list(v.dataset[2][0]), [])
+        v = VirtualVectorBuilder()
+        v.max_columns = 1
+        self.assertEqual(v.columns, ['django'])
+
+        class CommonVectorBuilder(VirtualVectorBuilder):
+            words_dataset = (dict(
+                (i, dict(words, entry=1)) for i, words
+                in VirtualVectorBuilder.words_dataset[0].items()),
+                dict(VirtualVectorBuilder.words_dataset[1], entry=3))
+
+        v = CommonVectorBuilder()
+        self.assertEqual(v.columns, ['blog', 'django', 'python', 'zinnia'])
+        v = CommonVectorBuilder()
+        v.max_df = 1.0
+        self.assertEqual(v.columns, ['blog', 'django', 'entry',
+                                     'python', 'zinnia'])
+
+    def test_tfidf_compute_related(self):
+        class VirtualVectorBuilder(TFIDFModelVectorBuilder):
+            words_dataset = ({1: {'zinnia': 2, 'blog': 1},
+                              2: {'zinnia': 1, 'django': 1},
+                              3: {'django': 1, 'python': 1},
+                              4: {'django': 1, 'python': 1},
+                              5: {'ruby': 1}},
+                             {'zinnia': 3, 'blog': 1, 'ruby': 1,
+                              'django': 3, 'python': 2})
+
+        v = VirtualVectorBuilder()
+        self.assertEqual(v.compute_related('error'), [])
+        self.assertEqual(v.compute_related(5), [])
+        self.assertEqual([pk for pk, score in v.compute_related(1)], [2])
+        self.assertEqual([pk for pk, score in v.compute_related(2)],
+                         [1, 4, 3])
+        self.assertEqual([pk for pk, score in v.compute_related(3)],
+                         [4, 2])
+        self.assertAlmostEqual(v.compute_related(3)[0][1], 1.0)
+        self.assertEqual([pk for pk, score in v.compute_related(2, number=2)],
+                         [1, 4])
+        for object_id in range(1, 6):
+            for number in (None, 1, 2, 10):
+                related = v.compute_related(object_id, number=number)
+                pure_related = v.compute_related(
+                    object_id, score=lambda x, y: cosine_score(x, y),
+                    number=number)
+                self.assertEqual([pk for pk, score in related],
+                                 [pk for pk, score in pure_related])
+                for (pk, score), (p_pk, p_score) in zip(related,
+                                                        pure_related):
+                    self.assertAlmostEqual(score, p_score)
+
+    def test_minhash_score(self):
+        self.assertEqual(minhash_score([1, 2, 3, 4], [1, 2, 3, 4]), 1.0)
+        self.assertEqual(minhash_score([1, 2, 3, 4], [1, 5, 3, 6]), 0.5)
+        self.assertEqual(minhash_score([1, 2, 3, 4], [5, 6, 7, 8]), 0.0)
+
+    def test_minhash_columns_dataset(self):
+        class VirtualVectorBuilder(MinHashModelVectorBuilder):
+            words_dataset = ({1: {'zinnia': 2, 'blog': 1},
+                              2: {'blog': 3, 'zinnia': 1},
+                              3: {'django': 1, 'python': 1},
+                              4: {}},
+                             {'zinnia': 3, 'blog': 4,
+                              'django': 1, 'python': 1})
+
+        v = VirtualVectorBuilder()
+        self.assertEqual(len(v.columns), 60)
+        self.assertEqual(v.columns, VirtualVectorBuilder().columns)
+        self.assertEqual(len(v.dataset[1]), 60)
+        self.assertEqual(v.dataset[1], v.dataset[2])
+        self.assertNotEqual(v.dataset[1], v.dataset[3])
+        self.assertEqual(len(v.dataset[4]), 0)
+
+        original_numpy = comparison.numpy
+        comparison.numpy = None
+        w = VirtualVectorBuilder()
+        self.assertEqual(w.dataset, v.dataset)
+        comparison.numpy = original_numpy
+
+    def test_minhash_compute_related(self):
+        class VirtualVectorBuilder(MinHashModelVectorBuilder):
+            bands = 64
+            rows = 1
+            words_dataset = ({1: {'zinnia': 1, 'blog': 1, 'django': 1},
+                              2: {'zinnia': 1, 'blog': 1, 'python': 1},
+                              3: {'zinnia': 1, 'ruby': 1, 'rails': 1},
+                              4: {'ruby': 1, 'rails': 1},
+                              5: {'cobol': 1},
+                              6: {}},
+                             {})
+
+        v = VirtualVectorBuilder()
+        self.assertEqual(v.compute_related('error'), [])
+        self.assertEqual(v.compute_related(5), [])
+        self.assertEqual(v.compute_related(6), [])
+        self.assertEqual([pk for pk, score in v.compute_related(1)], [2, 3])
+        self.assertEqual([pk for pk, score in v.compute_related(4)], [3])
+        self.assertEqual([pk for pk, score in v.compute_related(
+            1, number=1)], [2])
+        for pk, score in v.compute_related(3):
+            self.assertEqual(score, minhash_score(v.dataset[3],
+                                                  v.dataset[pk]))
+
+        v = VirtualVectorBuilder()
+        v.rows = 60
+        v.bands = 1
+        self.assertEqual(v.compute_related(1), [])
+
+    def test_compute_related_many(self):
+        words_dataset = ({1: {'zinnia': 2, 'blog': 1},
+                          2: {'zinnia': 1, 'django': 1},
+                          3: {'django': 1, 'python': 1},
+                          4: {'django': 1, 'python': 1, 'blog': 1},
+                          5: {'ruby': 1}},
+                         {'zinnia': 3, 'blog': 2, 'ruby': 1,
+                          'django': 3, 'python': 2})
+        for builder_class in (ModelVectorBuilder,
+                              VectorizedModelVectorBuilder,
+                              TFIDFModelVectorBuilder,
+                              MinHashModelVectorBuilder):
+            v = builder_class()
+            v.words_dataset = words_dataset
+            for number in (None, 1, 2):
+                related = v.compute_related_many(
+                    [1, 2, 3, 4, 5, 'error'], number=number)
+                self.assertEqual(sorted(related, key=str),
+                                 [1, 2, 3, 4, 5, 'error'])
+                for object_id, object_related in related.items():
+                    expected = v.compute_related(object_id, number=number)
+                    self.assertEqual(
+                        [round(score, 9) for pk, score in object_related],
+                        [round(score, 9) for pk, score in expected])
+                    if number is None:
+                        self.assertEqual(
+                            sorted(pk for pk, score in object_related),
+                            sorted(pk for pk, score in expected))
+            self.assertEqual(v.compute_related_many([]), {})
+
+        random = Random(42)
+        words = ['zinnia', 'blog', 'django', 'python', 'ruby', 'paris']
+        counts = [dict((word, random.randint(1, 3))
+                       for word in random.sample(words, 3))
+                  for i in range(30)]
+        data = dict((i + 1, counts[i % 30]) for i in range(90))
+        words_total = {}
+        for words_item_total in data.values():
+            for word, count in words_item_total.items():
+                words_total[word] = words_total.get(word, 0) + count
+        for builder_class in (VectorizedModelVectorBuilder,
+                              TFIDFModelVectorBuilder):
+            v = builder_class()
+            v.words_dataset = (data, words_total)
+            related = v.compute_related_many(list(data), number=5)
+            for object_id in data:
+                self.assertEqual(
+                    [pk for pk, score in related[object_id]],
+                    [pk for pk, score in v.compute_related(
+                        object_id, number=5)])
+
+    def test_get_related_many(self):
+        entries = []
+        for i in range(1, 4):
+            params = {'title': 'My entry number %s' % i,
+                      'content': 'My content number %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            entries.append(Entry.objects.create(**params))
+        v = CachedModelVectorBuilder(
+            queryset=Entry.objects.all(), fields=['title', 'content'])
+        v.cache_flush()
+        with self.assertNumQueries(2):
+            related = v.get_related_many(entries, 5)
+        for entry in entries:
+            self.assertEqual(related[entry.pk], v.get_related(entry, 5))
+        with self.assertNumQueries(0):
+            self.assertEqual(v.get_related_many(entries, 5), related)
+        v.cache_flush()
+
+    def test_cached_vector_builder_matrix(self):
+        builds = []
+
+        class CountedVectorBuilder(TFIDFModelVectorBuilder):
+            max_df = 1.0
+
+            @cached_property
+            def matrix(self):
+                builds.append(True)
+                return super(CountedVectorBuilder, self).matrix
+
+        class CachedCountedVectorBuilder(CachedModelVectorBuilder,
+                                         CountedVectorBuilder):
+            pass
+
+        entries = []
+        for i, content in enumerate(['zinnia blog', 'zinnia django',
+                                     'django python']):
+            params = {'title': 'Entry %s' % i, 'content': content,
+                      'slug': 'my-entry-%s' % i}
+            entries.append(Entry.objects.create(**params))
+        v = CachedCountedVectorBuilder(
+            queryset=Entry.objects.all(), fields=['content'])
+        v.cache_flush()
+        related = v.compute_related(entries[1].pk)
+        self.assertEqual(len(related), 2)
+        self.assertEqual(len(builds), 1)
+        v = CachedCountedVectorBuilder(
+            queryset=Entry.objects.all(), fields=['content'])
+        self.assertEqual(v.compute_related(entries[1].pk), related)
+        self.assertEqual(v.compute_related_many([entries[1].pk]),
+                         {entries[1].pk: related})
+        self.assertEqual(len(builds), 1)
+
+        params = {'title': 'Entry 3', 'content': 'python blog',
+                  'slug': 'my-entry-3'}
+        entries.append(Entry.objects.create(**params))
+        v.update_dataset([entries[3].pk])
+        v = CachedCountedVectorBuilder(
+            queryset=Entry.objects.all(), fields=['content'])
+        self.assertIn(entries[3].pk, [
+            pk for pk, score in v.compute_related(entries[2].pk)])
+        self.assertEqual(len(builds), 2)
+        v.cache_flush()
+
+    def test_minhash_update_dataset(self):
+        fields = ['title', 'content']
+        entries = []
+        for i in range(1, 4):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content about zinnia %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            entries.append(Entry.objects.create(**params))
+        v = MinHashModelVectorBuilder(queryset=Entry.objects.all(),
+                                      fields=fields)
+        signature = v.dataset[entries[0].pk]
+        entries[1].content = 'Something else'
+        entries[1].save()
+        v.update_dataset([entries[1].pk])
+        self.assertEqual(v.dataset[entries[0].pk], signature)
+        w = MinHashModelVectorBuilder(queryset=Entry.objects.all(),
+                                      fields=fields)
+        self.assertEqual(v.dataset, w.dataset)
+        self.assertEqual(v.compute_related(entries[0].pk),
+                         w.compute_related(entries[0].pk))
+
+    def test_tfidf_update_dataset(self):
+        fields = ['title', 'content']
+        entries = []
+        for i in range(1, 4):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content about zinnia %s' % i,
+                      'slug': 'my-entry-%s' % i}
+            entries.append(Entry.objects.create(**params))
+        v = TFIDFModelVectorBuilder(queryset=Entry.objects.all(),
+                                    fields=fields)
+        self.assertEqual(v.columns, [])
+        v = TFIDFModelVectorBuilder(queryset=Entry.objects.all(),
+                                    fields=fields)
+        v.max_df = 1.0
+        self.assertEqual(v.columns, ['content', 'entry', 'zinnia'])
+        vector = v.dataset[entries[1].pk]
+        entries[0].content = 'Django content'
+        entries[0].save()
+        with self.assertNumQueries(1):
+            v.update_dataset([entries[0].pk])
+        self.assertEqual(v.columns, ['content', 'entry', 'zinnia'])
+        self.assertEqual(v.columns.changes, 1)
+        self.assertTrue(v.dataset[entries[1].pk] is vector)
+        self.assertEqual(list(v.dataset[entries[0].pk][0]), [0, 1])
+
+        v.idf_batch_size = 2
+        entries[2].content = 'Django content'
+        entries[2].save()
+        v.update_dataset([entries[2].pk])
+        self.assertEqual(v.columns.changes, 0)
+        full_v = TFIDFModelVectorBuilder(queryset=Entry.objects.all(),
+                                         fields=fields)
+        full_v.max_df = 1.0
+        self.assertEqual(v.columns_dataset, full_v.columns_dataset)
+        self.assertEqual(v.compute_related(entries[1].pk),
+                         full_v.compute_related(entries[1].pk))
+        self.assertEqual(v.columns, ['content', 'django',
+                                     'entry', 'zinnia'])
+
+    def test_entry_published_vector_builder(self):
+        for i in range(1, 106):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content %s' % i,
+                      'status': PUBLISHED,
+                      'slug': 'my-entry-%s' % i}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(Site.objects.get_current())
+        v = EntryPublishedVectorBuilder()
+        v.cache_flush()
+        self.assertEqual(len(v.dataset), v.limit or 105)
+        self.assertEqual(len(v.get_related(entry, 5)), 5)
+        v.cache_flush()
+
+    def test_compute_similar_entries(self):
+        site = Site.objects.get_current()
+        entries = []
+        for i, (title, content) in enumerate([
+                ('Alpha', 'zinnia blog django'),
+                ('Beta', 'zinnia blog python'),
+                ('Gamma', 'zinnia django python'),
+                ('Delta', 'unrelated words here')]):
+            entry = Entry.objects.create(
+                title=title, content=content,
+                status=PUBLISHED, slug='entry-%s' % i)
+            entry.sites.add(site)
+            entries.append(entry)
+        v = EntryPublishedVectorBuilder()
+        v.cache_flush()
+        call_command('compute_similar_entries', number=2,
+                     batch_size=3, verbosity=0)
+        count = sum([len(v.compute_related(entry.pk, number=2))
+                     for entry in entries])
+        self.assertEqual(SimilarEntry.objects.count(), count)
+        self.assertEqual(
+            list(SimilarEntry.objects.filter(entry=entries[0]).values_list(
+                'similar', 'score')),
+            v.compute_related(entries[0].pk, number=2))
+        self.assertEqual(
+            v.get_precomputed_related(entries[0], 5),
+            [Entry.objects.get(pk=pk) for pk, score in
+             v.compute_related(entries[0].pk, number=2)])
+        self.assertEqual(
+            v.get_precomputed_related(entries[3], 5),
+            [Entry.objects.get(pk=pk) for pk, score in
+             v.compute_related(entries[3].pk, number=2)])
+        with self.assertNumQueries(1):
+            related = v.get_precomputed_related_many(entries, 1)
+        for entry in entries:
+            self.assertEqual(related[entry.pk],
+                             v.get_precomputed_related(entry, 1))
+
+        original_precomputed = comparison.COMPARISON_PRECOMPUTED
+        comparison.COMPARISON_PRECOMPUTED = True
+        with self.assertNumQueries(2):
+            self.assertEqual(v.get_related(entries[1], 1),
+                             v.get_precomputed_related(entries[1], 1))
+        comparison.COMPARISON_PRECOMPUTED = original_precomputed
+
+        SimilarEntry.objects.filter(entry=entries[1]).delete()
+        call_command('compute_similar_entries', number=2,
+                     resume=True, verbosity=0)
+        self.assertEqual(SimilarEntry.objects.count(), count)
+        entries[2].status = 0
+        entries[2].save()
+        call_command('compute_similar_entries', number=2,
+                     resume=True, verbosity=0)
+        self.assertFalse(SimilarEntry.objects.filter(
+            entry=entries[2]).exists())
+        Entry.objects.update(status=0, is_live=False)
+        call_command('compute_similar_entries', number=2,
+                     resume=True, verbosity=0)
+        self.assertFalse(SimilarEntry.objects.exists())
+        v.cache_flush()
+
     def test_raw_clean(self):
         v = ModelVectorBuilder(queryset=Entry.objects.none(), fields=['title'])
         self.assertEqual(v.raw_clean('<p>HTML Content</p>'),
@@ -0,0 +1,155 @@
+"""Test cases for Zinnia's counts of published entries"""
+from datetime import timedelta
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tagging.models import Tag
+
+from zinnia import scheduler
+from zinnia.counters import rebuild_counts
+from zinnia.counters import update_published_counts
+from zinnia.managers import DRAFT
+from zinnia.managers import PUBLISHED
+from zinnia.managers import tags_count_entries_published
+from zinnia.models.author import Author
+from zinnia.models.category import Category
+from zinnia.models.counter import PublishedCount
+from zinnia.models.entry import Entry
+from zinnia.signals import disconnect_entry_signals
+from zinnia.tests.utils import skip_if_custom_user
+
+
+@skip_if_custom_user
+class PublishedCountTestCase(TestCase):
+    """Test cases for the counts of published entries"""
+
+    def setUp(self):
+        disconnect_entry_signals()
+        cache.delete(scheduler.CACHE_KEY)
+        self.site = Site.objects.get_current()
+        self.category = Category.objects.create(
+            title='Category', slug='category')
+        self.author = Author.objects.create_user(
+            username='webmaster', email='webmaster@example.com')
+        self.entry = Entry.objects.create(
+            title='My entry', slug='my-entry', tags='zinnia, test',
+            status=PUBLISHED)
+        self.entry.sites.add(self.site)
+        self.entry.categories.add(self.category)
+        self.entry.authors.add(self.author)
+
+    def tearDown(self):
+        cache.delete(scheduler.CACHE_KEY)
+
+    def get_counts(self):
+        return dict(((count.kind, count.object_id), count.count)
+                    for count in PublishedCount.objects.filter(
+                        site=self.site))
+
+    def assert_counts(self, entries):
+        tags = Tag.objects.filter(name__in=['zinnia', 'test'])
+        expected = {('category', self.category.pk): entries,
+                    ('author', self.author.pk): entries}
+        for tag in tags:
+            expected[('tag', tag.pk)] = entries
+        if not entries:
+            expected = {}
+        self.assertEqual(self.get_counts(), expected)
+
+    def test_relations(self):
+        self.assert_counts(1)
+        self.entry.categories.remove(self.category)
+        self.assertEqual(
+            self.get_counts().get(('category', self.category.pk)), None)
+        self.category.entries.add(self.entry)
+        self.assertEqual(
+            self.get_counts()[('category', self.category.pk)], 1)
+        self.author.entries.clear()
+        self.assertEqual(
+            self.get_counts().get(('author', self.author.pk)), None)
+
+    def test_sites(self):
+        self.entry.sites.remove(self.site)
+        self.assert_counts(0)
+        self.entry.sites.add(self.site)
+        self.assert_counts(1)
+
+    def test_status(self):
+        self.entry.status = DRAFT
+        self.entry.save(update_fields=['status'])
+        self.assert_counts(0)
+        self.entry.status = PUBLISHED
+        self.entry.save()
+        self.assert_counts(1)
+
+    def test_tags(self):
+        self.entry.tags = 'zinnia'
+        self.entry.save()
+        tag = Tag.objects.get(name='zinnia')
+        self.assertEqual(self.get_counts(), {
+            ('category', self.category.pk): 1,
+            ('author', self.author.pk): 1,
+            ('tag', tag.pk): 1})
+
+    def test_delete(self):
+        self.entry.delete()
+        self.assert_counts(0)
+
+    def test_draft_entries(self):
+        entry = Entry.objects.create(
+            title='My draft', slug='my-draft', tags='zinnia')
+        entry.sites.add(self.site)
+        entry.categories.add(self.category)
+        self.assert_counts(1)
+        entry.status = PUBLISHED
+        entry.save()
+        self.assertEqual(
+            self.get_counts()[('category', self.category.pk)], 2)
+
+    def test_scheduler(self):
+        self.entry.end_publication = timezone.now() + timedelta(hours=1)
+        self.entry.save()
+        self.assert_counts(1)
+        scheduler.update_live_entries(timezone.now() + timedelta(hours=2))
+        self.assert_counts(0)
+
+    def test_rebuild_counts(self):
+        PublishedCount.objects.all().delete()
+        rebuild_counts()
+        self.assert_counts(1)
+
+    def test_update_published_counts(self):
+        counted = PublishedCount.objects.get(
+            kind='category', object_id=self.category.pk)
+        PublishedCount.objects.filter(pk=counted.pk).update(count=5)
+        rebuild_counts()
+        self.assert_counts(1)
+        self.assertEqual(PublishedCount.objects.get(
+            kind='category', object_id=self.category.pk).pk, counted.pk)
+
+        update_published_counts(self.site.pk, 'category', [0], {0: 2})
+        PublishedCount.objects.filter(
+            kind='category', object_id=0).update(count=3)
+        with self.assertNumQueries(2):
+            update_published_counts(self.site.pk, 'category', [],
+                                    {0: 2})
+        self.assertEqual(PublishedCount.objects.get(
+            kind='category', object_id=0).count, 2)
+
+    def test_count_entries_published_command(self):
+        PublishedCount.objects.all().delete()
+        call_command('count_entries_published', verbosity=0)
+        self.assert_counts(1)
+
+    def test_annotate_count_entries_published(self):
+        category = Category.published.annotate_count_entries_published(
+            ).get(pk=self.category.pk)
+        self.assertEqual(category.count_entries_published, 1)
+        self.assertEqual(
+            [(tag.name, tag.count) for tag in tags_count_entries_published()],
+            [('test', 1), ('zinnia', 1)])
+        self.assertEqual(len(tags_count_entries_published(2)), 0)
@@ -2,6 +2,7 @@
 from datetime import timedelta
 
 from django.contrib.sites.models import Site
+from django.core.management import call_command
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -13,6 +14,8 @@ import django_comments as comments
 from django_comments.models import CommentFlag
 
 from zinnia import markups
+from zinnia import navigation
+from zinnia import preview as preview_settings
 from zinnia import url_shortener as shortener_settings
 from zinnia.flags import PINGBACK
 from zinnia.flags import TRACKBACK
@@ -20,9 +23,11 @@ from zinnia.managers import PUBLISHED
 from zinnia.models.author import Author
 from zinnia.models.entry import Entry
 from zinnia.models_bases import entry
+from zinnia.scheduler import update_live_entries
 from zinnia.signals import disconnect_discussion_signals
 from zinnia.signals import disconnect_entry_signals
 from zinnia.tests.utils import datetime
+from zinnia.tests.utils import run_on_commit_callbacks
 from zinnia.tests.utils import skip_if_custom_user
 from zinnia.tests.utils import skip_if_lib_not_available
 from zinnia.url_shortener.backends.default import base36
@@ -111,6 +116,28 @@ class EntryTestCase(TestCase):
     def test_word_count(self):
         self.assertEqual(self.entry.word_count, 2)
 
+    def test_reading_time(self):
+        self.assertEqual(self.entry.reading_time, 1)
+        self.entry.content = ' '.join(['word'] * 401)
+        self.entry.save(update_fields=['content'])
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.word_count, 401)
+        self.assertEqual(saved_entry.reading_time, 3)
+        self.entry.content = ''
+        self.entry.save()
+        self.assertEqual(self.entry.word_count, 0)
+        self.assertEqual(self.entry.reading_time, 0)
+
+    def test_count_words(self):
+        Entry.objects.create(title='My second entry', slug='my-second-entry',
+                             content='My second content')
+        Entry.objects.update(word_count=0, reading_time=0)
+        call_command('count_words', batch_size=1, verbosity=0)
+        self.assertEqual(
+            list(Entry.objects.order_by('pk').values_list(
+                'word_count', 'reading_time')),
+            [(2, 1), (3, 1)])
+
     def test_comments_are_open(self):
         original_auto_close = entry.AUTO_CLOSE_COMMENTS_AFTER
         entry.AUTO_CLOSE_COMMENTS_AFTER = None
@@ -188,11 +215,13 @@ class EntryTestCase(TestCase):
             # entry.previous_entry does not works until entry
             # is published, so no query should be performed
             self.assertFalse(self.entry.previous_entry)
-        self.entry.status = PUBLISHED
-        self.entry.save()
-        self.entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.entry.status = PUBLISHED
+            self.entry.save()
+            self.entry.sites.add(site)
+            update_live_entries()
         del self.entry.previous_next  # Invalidate the cached property
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(2):
             self.assertFalse(self.entry.previous_entry)
             # Reload to check the cache
             self.assertFalse(self.entry.previous_entry)
@@ -201,10 +230,11 @@ class EntryTestCase(TestCase):
                   'slug': 'my-second-entry',
                   'publication_date': datetime(2000, 1, 1),
                   'status': PUBLISHED}
-        self.second_entry = Entry.objects.create(**params)
-        self.second_entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.second_entry = Entry.objects.create(**params)
+            self.second_entry.sites.add(site)
         del self.entry.previous_next  # Invalidate the cached property
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(2):
             self.assertEqual(self.entry.previous_entry, self.second_entry)
             # Reload to check the cache
             self.assertEqual(self.entry.previous_entry, self.second_entry)
@@ -213,8 +243,9 @@ class EntryTestCase(TestCase):
                   'slug': 'my-third-entry',
                   'publication_date': datetime(2001, 1, 1),
                   'status': PUBLISHED}
-        self.third_entry = Entry.objects.create(**params)
-        self.third_entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.third_entry = Entry.objects.create(**params)
+            self.third_entry.sites.add(site)
         del self.entry.previous_next  # Invalidate the cached property
         self.assertEqual(self.entry.previous_entry, self.third_entry)
         self.assertEqual(self.third_entry.previous_entry, self.second_entry)
@@ -226,11 +257,13 @@ class EntryTestCase(TestCase):
             # entry.next_entry does not works until entry
             # is published, so no query should be performed
             self.assertFalse(self.entry.previous_entry)
-        self.entry.status = PUBLISHED
-        self.entry.save()
-        self.entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.entry.status = PUBLISHED
+            self.entry.save()
+            self.entry.sites.add(site)
+            update_live_entries()
         del self.entry.previous_next  # Invalidate the cached property
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(2):
             self.assertFalse(self.entry.next_entry)
             # Reload to check the cache
             self.assertFalse(self.entry.next_entry)
@@ -239,10 +272,11 @@ class EntryTestCase(TestCase):
                   'slug': 'my-second-entry',
                   'publication_date': datetime(2100, 1, 1),
                   'status': PUBLISHED}
-        self.second_entry = Entry.objects.create(**params)
-        self.second_entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.second_entry = Entry.objects.create(**params)
+            self.second_entry.sites.add(site)
         del self.entry.previous_next  # Invalidate the cached property
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(2):
             self.assertEqual(self.entry.next_entry, self.second_entry)
             # Reload to check the cache
             self.assertEqual(self.entry.next_entry, self.second_entry)
@@ -251,19 +285,22 @@ class EntryTestCase(TestCase):
                   'slug': 'my-third-entry',
                   'publication_date': datetime(2050, 1, 1),
                   'status': PUBLISHED}
-        self.third_entry = Entry.objects.create(**params)
-        self.third_entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.third_entry = Entry.objects.create(**params)
+            self.third_entry.sites.add(site)
         del self.entry.previous_next  # Invalidate the cached property
         self.assertEqual(self.entry.next_entry, self.third_entry)
         self.assertEqual(self.third_entry.next_entry, self.second_entry)
         self.assertFalse(self.second_entry.next_entry)
 
-    def test_previous_next_entry_in_one_query(self):
+    def test_previous_next_entry_in_two_queries(self):
         site = Site.objects.get_current()
-        self.entry.status = PUBLISHED
-        self.entry.save()
-        self.entry.sites.add(site)
-        with self.assertNumQueries(1):
+        with run_on_commit_callbacks():
+            self.entry.status = PUBLISHED
+            self.entry.save()
+            self.entry.sites.add(site)
+            update_live_entries()
+        with self.assertNumQueries(2):
             self.assertFalse(self.entry.previous_entry)
             self.assertFalse(self.entry.next_entry)
             # Reload to check the cache
@@ -274,23 +311,99 @@ class EntryTestCase(TestCase):
                   'slug': 'my-second-entry',
                   'publication_date': datetime(2001, 1, 1),
                   'status': PUBLISHED}
-        self.second_entry = Entry.objects.create(**params)
-        self.second_entry.sites.add(site)
-        params = {'title': 'My third entry',
-                  'content': 'My third content',
-                  'slug': 'my-third-entry',
-                  'publication_date': datetime(2050, 1, 1),
-                  'status': PUBLISHED}
-        self.third_entry = Entry.objects.create(**params)
-        self.third_entry.sites.add(site)
+        with run_on_commit_callbacks():
+            self.second_entry = Entry.objects.create(**params)
+            self.second_entry.sites.add(site)
+            params = {'title': 'My third entry',
+                      'content': 'My third content',
+                      'slug': 'my-third-entry',
+                      'publication_date': datetime(2050, 1, 1),
+                      'status': PUBLISHED}
+            self.third_entry = Entry.objects.create(**params)
+            self.third_entry.sites.add(site)
         del self.entry.previous_next  # Invalidate the cached property
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(2):
             self.assertEqual(self.entry.previous_entry, self.second_entry)
             self.assertEqual(self.entry.next_entry, self.third_entry)
             # Reload to check the cache
             self.assertEqual(self.entry.previous_entry, self.second_entry)
             self.assertEqual(self.entry.next_entry, self.third_entry)
 
+    def test_previous_next_entry_cache(self):
+        site = Site.objects.get_current()
+        with run_on_commit_callbacks():
+            self.entry.status = PUBLISHED
+            self.entry.save()
+            self.entry.sites.add(site)
+            params = {'title': 'My second entry',
+                      'content': 'My second content',
+                      'slug': 'my-second-entry',
+                      'publication_date': datetime(2001, 1, 1),
+                      'status': PUBLISHED}
+            self.second_entry = Entry.objects.create(**params)
+            self.second_entry.sites.add(site)
+        self.assertEqual(self.entry.previous_entry, self.second_entry)
+        entry = Entry.objects.get(pk=self.entry.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(entry.previous_entry, self.second_entry)
+            self.assertEqual(entry.previous_entry.title, 'My second entry')
+        self.second_entry.title = 'My renamed entry'
+        self.second_entry.save()
+        entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(entry.previous_entry.title, 'My second entry')
+        with run_on_commit_callbacks():
+            self.second_entry.save()
+        entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(entry.previous_entry.title, 'My renamed entry')
+        original_timeout = navigation.NAVIGATION_TIMEOUT
+        navigation.NAVIGATION_TIMEOUT = 0
+        entry = Entry.objects.get(pk=self.entry.pk)
+        with self.assertNumQueries(2):
+            self.assertEqual(entry.previous_entry, self.second_entry)
+        navigation.NAVIGATION_TIMEOUT = original_timeout
+
+    def test_prefetch_previous_next(self):
+        site = Site.objects.get_current()
+        self.entry.status = PUBLISHED
+        self.entry.save()
+        self.entry.sites.add(site)
+        entries = [self.entry]
+        for i, year in enumerate([2001, 2050, 2051]):
+            entry = Entry.objects.create(
+                title='My entry %s' % i, slug='my-entry-%s' % i,
+                publication_date=datetime(year, 1, 1),
+                status=PUBLISHED)
+            entry.sites.add(site)
+            entries.append(entry)
+        draft = Entry.objects.create(title='My draft', slug='my-draft')
+        update_live_entries()
+        original_timeout = navigation.NAVIGATION_TIMEOUT
+        navigation.NAVIGATION_TIMEOUT = 0
+        with self.assertNumQueries(2):
+            navigation.prefetch_previous_next(entries + [draft])
+        navigation.NAVIGATION_TIMEOUT = original_timeout
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [(entry.previous_entry, entry.next_entry)
+                 for entry in entries + [draft]],
+                [(entries[1], entries[2]),
+                 (None, entries[0]),
+                 (entries[0], entries[3]),
+                 (entries[2], None),
+                 (None, None)])
+
+        navigation.flush_navigation_cache()
+        for entry in entries:
+            del entry.previous_next
+        with self.assertNumQueries(2):
+            navigation.prefetch_previous_next(entries)
+        with self.assertNumQueries(0):
+            navigation.prefetch_previous_next(entries)
+        entry = Entry.objects.get(pk=entries[2].pk)
+        with self.assertNumQueries(0):
+            self.assertEqual((entry.previous_entry, entry.next_entry),
+                             (entries[0], entries[3]))
+
     def test_related_published(self):
         site = Site.objects.get_current()
         self.assertFalse(self.entry.related_published)
@@ -461,6 +574,95 @@ class EntryHtmlContentTestCase(TestCase):
         self.assertEqual(str(preview), '<p>Lead paragraph</p>')
         self.assertEqual(preview.has_more, True)
 
+    def test_html_content_stored(self):
+        markups.MARKUP_LANGUAGE = None
+        self.entry.lead = 'My lead'
+        self.entry.save()
+        original_html_format = entry.html_format
+
+        def html_format(value):
+            raise AssertionError('Markup rendered on read')
+
+        entry.html_format = html_format
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.html_content, '<p>My content</p>')
+        self.assertEqual(saved_entry.html_lead, '<p>My lead</p>')
+        entry.html_format = original_html_format
+
+        saved_entry.content = 'My new content'
+        saved_entry.save(update_fields=['content'])
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.content_html, '<p>My new content</p>')
+        fingerprint = saved_entry.content_fingerprint
+        markups.MARKUP_LANGUAGE = 'html'
+        self.assertEqual(saved_entry.html_content, '<p>My new content</p>')
+        self.assertNotEqual(saved_entry.content_fingerprint, fingerprint)
+
+    def test_html_preview_stored(self):
+        markups.MARKUP_LANGUAGE = None
+        self.entry.content = 'My content with some words'
+        self.entry.save()
+        original_html_preview = entry.HTMLPreview
+
+        def html_preview(*args, **kwargs):
+            raise AssertionError('Preview built on read')
+
+        entry.HTMLPreview = html_preview
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        try:
+            preview = saved_entry.html_preview
+        finally:
+            entry.HTMLPreview = original_html_preview
+        self.assertEqual(str(preview), '<p>My content with some words</p>')
+        self.assertEqual(preview.has_more, False)
+        self.assertEqual(preview.total_words, 5)
+
+        saved_entry.lead = 'My lead'
+        saved_entry.save(update_fields=['lead'])
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.html_lead, '<p>My lead</p>')
+        self.assertEqual(saved_entry.preview_html, '<p>My lead</p>')
+        self.assertEqual(saved_entry.preview_has_more, True)
+        self.assertEqual(saved_entry.preview_total_words, 7)
+        self.assertEqual(saved_entry.preview_displayed_words, 2)
+
+    def test_render_entries(self):
+        markups.MARKUP_LANGUAGE = None
+        self.entry.save()
+        Entry.objects.create(title='My other entry', slug='my-other-entry',
+                             content='My other content')
+        markups.MARKUP_LANGUAGE = 'html'
+        with self.assertNumQueries(3):
+            call_command('render_entries', verbosity=0)
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.content_html, '<p>My content</p>')
+        self.assertEqual(saved_entry.content_fingerprint,
+                         markups.markup_fingerprint('My content'))
+        self.assertEqual(saved_entry.lead_fingerprint,
+                         markups.markup_fingerprint(''))
+
+        fingerprint = saved_entry.preview_fingerprint
+        original_max_words = preview_settings.PREVIEW_MAX_WORDS
+        preview_settings.PREVIEW_MAX_WORDS = 1
+        call_command('render_entries', verbosity=0)
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertNotEqual(saved_entry.preview_fingerprint, fingerprint)
+        self.assertEqual(saved_entry.preview_fingerprint,
+                         preview_settings.preview_fingerprint(
+                             saved_entry.content_fingerprint,
+                             saved_entry.lead_fingerprint))
+        preview_settings.PREVIEW_MAX_WORDS = original_max_words
+
+        Entry.objects.update(content_fingerprint='', word_count=0,
+                             reading_time=0)
+        with self.assertNumQueries(3):
+            call_command('render_entries', verbosity=0)
+        saved_entry = Entry.objects.get(pk=self.entry.pk)
+        self.assertEqual(saved_entry.word_count, 2)
+        self.assertEqual(saved_entry.reading_time, 1)
+        with self.assertNumQueries(1):
+            call_command('render_entries', verbosity=0)
+
 
 class EntryHtmlLeadTestCase(TestCase):
 
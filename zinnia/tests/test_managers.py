@@ -10,6 +10,7 @@ from zinnia.managers import tags_published
 from zinnia.models.author import Author
 from zinnia.models.category import Category
 from zinnia.models.entry import Entry
+from zinnia.scheduler import update_live_entries
 from zinnia.signals import disconnect_entry_signals
 from zinnia.tests.utils import datetime
 from zinnia.tests.utils import skip_if_custom_user
@@ -73,6 +74,27 @@ class ManagersTestCase(TestCase):
         self.entry_2.save()
         self.assertEqual(Category.published.count(), 3)
 
+    def test_entry_related_published_manager_count_entries_published(self):
+        update_live_entries()
+        with self.assertNumQueries(1):
+            categories = list(
+                Category.published.annotate_count_entries_published())
+        self.assertEqual(
+            [(category, category.count_entries_published)
+             for category in categories],
+            [(self.categories[0], 1), (self.categories[1], 1)])
+        self.entry_2.status = PUBLISHED
+        self.entry_2.save()
+        self.assertEqual(
+            [(author, author.count_entries_published) for author
+             in Author.published.annotate_count_entries_published()],
+            [(self.authors[0], 2), (self.authors[1], 1)])
+        self.entry_1.sites.remove(self.sites[0])
+        self.assertEqual(
+            [(category, category.count_entries_published) for category
+             in Category.published.annotate_count_entries_published()],
+            [(self.categories[0], 1)])
+
     def test_entries_published(self):
         self.assertEqual(entries_published(Entry.objects.all()).count(), 1)
         self.entry_2.status = PUBLISHED
@@ -234,6 +256,16 @@ class ManagersTestCase(TestCase):
             'tag:"zinnia*"').count(), 0)
         self.assertEqual(Entry.published.advanced_search(
             'tag:*inni*').count(), 2)
+        self.assertEqual(Entry.published.advanced_search(
+            'tag:zinn').count(), 0)
+        self.assertEqual(Entry.published.advanced_search(
+            'tag:zinn*').count(), 2)
+        self.assertEqual(Entry.published.advanced_search(
+            'tag:*nia').count(), 2)
+        self.assertEqual(Entry.published.advanced_search(
+            'tag:*inn').count(), 0)
+        self.assertEqual(Entry.published.advanced_search(
+            'tag:ZINNIA -tag:test').count(), 0)
 
     def test_entry_published_manager_advanced_search_with_punctuation(self):
         self.entry_2.content = 'How are you today ? Fine thank you ! OK.'
@@ -2,9 +2,11 @@
 import builtins
 import warnings
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from zinnia import markups
+from zinnia.markups import MarkupCache
 from zinnia.markups import html_format
 from zinnia.markups import markdown
 from zinnia.markups import restructuredtext
@@ -29,6 +31,61 @@ class MarkupsTestCase(TestCase):
             '<p>Hello <em>World</em> !</p>'
         )
 
+    @skip_if_lib_not_available('markdown')
+    def test_markdown_renderer_reused(self):
+        text = 'Note[^1]\n\n[^1]: Footnote'
+        extensions = ['markdown.extensions.footnotes']
+        html = markdown(text, extensions)
+        renderer = markups.renderers.markdown[tuple(extensions)]
+        self.assertEqual(markdown(text, extensions), html)
+        self.assertEqual(markdown(self.text, extensions).strip(),
+                         '<p>Hello <em>World</em> !</p>')
+        self.assertIs(markups.renderers.markdown[tuple(extensions)],
+                      renderer)
+
+    @skip_if_lib_not_available('docutils')
+    def test_restructuredtext_renderer_reused(self):
+        text = 'Bad `reference`_'
+        settings = {'report_level': 5}
+        html = restructuredtext(text, settings)
+        renderer = markups.renderers.restructuredtext[
+            repr(sorted(settings.items()))]
+        self.assertEqual(restructuredtext(text, settings), html)
+        self.assertIs(markups.renderers.restructuredtext[
+            repr(sorted(settings.items()))], renderer)
+
+    @skip_if_lib_not_available('markdown')
+    def test_markdown_renderer_extension_instances(self):
+        from markdown.extensions.toc import TocExtension
+        text = '[TOC]\n\n# Header 1'
+        markdown(text, [TocExtension(permalink='PL')])
+        renderer = markups.renderers.markdown[(
+            markups.get_extension_key(TocExtension(permalink='PL')),)]
+        html = markdown(text, [TocExtension(permalink='PL')])
+        self.assertIn('PL', html)
+        self.assertIs(markups.renderers.markdown[(
+            markups.get_extension_key(TocExtension(permalink='PL')),)],
+            renderer)
+        self.assertNotIn('PL', markdown(text, [TocExtension()]))
+        self.assertNotEqual(
+            markups.get_extension_key(TocExtension()),
+            markups.get_extension_key(TocExtension(permalink='PL')))
+
+    @skip_if_lib_not_available('markdown')
+    def test_markup_fingerprint_extension_configs(self):
+        from markdown.extensions.toc import TocExtension
+        original_extensions = markups.MARKDOWN_EXTENSIONS
+        markups.MARKDOWN_EXTENSIONS = [TocExtension()]
+        fingerprint = markups.markup_fingerprint(self.text)
+        self.assertNotIn('0x', repr(markups.get_extension_key(
+            TocExtension())))
+        markups.MARKDOWN_EXTENSIONS = [TocExtension()]
+        self.assertEqual(markups.markup_fingerprint(self.text), fingerprint)
+        markups.MARKDOWN_EXTENSIONS = [TocExtension(permalink='PL')]
+        self.assertNotEqual(markups.markup_fingerprint(self.text),
+                            fingerprint)
+        markups.MARKDOWN_EXTENSIONS = original_extensions
+
     @skip_if_lib_not_available('markdown')
     def test_markdown_extensions(self):
         text = '[TOC]\n\n# Header 1\n\n## Header 2'
@@ -187,3 +244,64 @@ class HtmlFormatTestCase(TestCase):
             '\n<ul class="simple">\n<li>Item 1</li>\n'
             '<li>Item 2</li>\n</ul>\n'
         )
+
+
+class MarkupCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.original_rendering = markups.MARKUP_LANGUAGE
+        markups.MARKUP_LANGUAGE = None
+        cache.clear()
+
+    def tearDown(self):
+        markups.MARKUP_LANGUAGE = self.original_rendering
+        cache.clear()
+
+    def test_render(self):
+        markup_cache = MarkupCache(2, 60)
+        self.assertEqual(markup_cache.render('Content'), '<p>Content</p>')
+        self.assertEqual(markup_cache.render('Content'), '<p>Content</p>')
+        self.assertEqual(tuple(markup_cache.cache_info()), (1, 0, 1, 2, 1))
+        markup_cache.render('Lead')
+        markup_cache.render('Excerpt')
+        self.assertEqual(tuple(markup_cache.cache_info()), (1, 0, 3, 2, 2))
+        markup_cache.render('Content')
+        self.assertEqual(tuple(markup_cache.cache_info()), (1, 1, 3, 2, 2))
+        markups.MARKUP_LANGUAGE = 'html'
+        markup_cache.render('Content')
+        self.assertEqual(tuple(markup_cache.cache_info()), (1, 1, 4, 2, 2))
+        markup_cache.cache_clear()
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 0, 0, 2, 0))
+
+    def test_render_shared(self):
+        MarkupCache(2, 60).render('Content')
+        markup_cache = MarkupCache(2, 60)
+        self.assertEqual(markup_cache.render('Content'), '<p>Content</p>')
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 1, 0, 2, 1))
+        markup_cache = MarkupCache(0, 60)
+        markup_cache.render('Content')
+        markup_cache.render('Content')
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 2, 0, 0, 0))
+
+    @skip_if_lib_not_available('markdown')
+    def test_render_shared_extension_configs(self):
+        from markdown.extensions.toc import TocExtension
+        original_extensions = markups.MARKDOWN_EXTENSIONS
+        markups.MARKUP_LANGUAGE = 'markdown'
+        markups.MARKDOWN_EXTENSIONS = [TocExtension()]
+        MarkupCache(0, 60).render('Content')
+        markup_cache = MarkupCache(0, 60)
+        markup_cache.render('Content')
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 1, 0, 0, 0))
+        markups.MARKDOWN_EXTENSIONS = [TocExtension(permalink='PL')]
+        markup_cache.render('Content')
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 1, 1, 0, 0))
+        markups.MARKDOWN_EXTENSIONS = original_extensions
+
+    def test_render_disabled(self):
+        markup_cache = MarkupCache(0, 0)
+        self.assertEqual(markup_cache.render('Content'), '<p>Content</p>')
+        self.assertEqual(markup_cache.render('Content'), '<p>Content</p>')
+        self.assertEqual(tuple(markup_cache.cache_info()), (0, 0, 0, 0, 0))
+        self.assertFalse(cache.get('%s:%s' % (
+            markups.CACHE_KEY, markups.markup_fingerprint('Content'))))
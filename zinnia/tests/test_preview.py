@@ -3,6 +3,7 @@
 from django.test import TestCase
 
 from zinnia.preview import HTMLPreview
+from zinnia.preview import StoredHTMLPreview
 
 
 class HTMLPreviewTestCase(TestCase):
@@ -83,3 +84,11 @@ class HTMLPreviewTestCase(TestCase):
         preview = HTMLPreview('', '')
         self.assertEqual(str(preview), '')
         self.assertEqual(preview.has_more, False)
+
+    def test_stored_preview(self):
+        preview = StoredHTMLPreview('<p>Hello World</p>', True, 8, 2)
+        self.assertEqual(str(preview), '<p>Hello World</p>')
+        self.assertEqual(preview.has_more, True)
+        self.assertEqual(preview.remaining_words, 6)
+        self.assertEqual(preview.displayed_percent, 25.0)
+        self.assertEqual(preview.remaining_percent, 75.0)
@@ -0,0 +1,175 @@
+"""Test cases for Zinnia's publication scheduler"""
+from datetime import timedelta
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from zinnia import checks
+from zinnia import scheduler
+from zinnia.managers import DRAFT
+from zinnia.managers import PUBLISHED
+from zinnia.models.entry import Entry
+from zinnia.signals import disconnect_entry_signals
+from zinnia.tests.utils import datetime
+
+
+class SchedulerTestCase(TestCase):
+    """Test cases for the publication scheduler"""
+
+    def setUp(self):
+        disconnect_entry_signals()
+        cache.delete(scheduler.CACHE_KEY)
+        self.now = timezone.now()
+        self.entries = []
+        for i, (start, end) in enumerate([
+                (None, None),
+                (self.now + timedelta(hours=2), None),
+                (None, self.now + timedelta(hours=1))]):
+            entry = Entry.objects.create(
+                title='My entry %s' % i, slug='my-entry-%s' % i,
+                content='My content', status=PUBLISHED,
+                start_publication=start, end_publication=end)
+            entry.sites.add(Site.objects.get_current())
+            self.entries.append(entry)
+        self.changes = []
+        scheduler.live_entries_changed.connect(self.record_changes)
+
+    def tearDown(self):
+        scheduler.PUBLICATION_GRANULARITY = 0
+        scheduler.live_entries_changed.disconnect(self.record_changes)
+        cache.delete(scheduler.CACHE_KEY)
+
+    def record_changes(self, sender, **kwargs):
+        self.changes.append((kwargs['went_live'], kwargs['expired']))
+
+    def test_is_live(self):
+        self.assertEqual([entry.is_live for entry in self.entries],
+                         [True, False, True])
+        entry = self.entries[0]
+        entry.status = DRAFT
+        entry.save(update_fields=['status'])
+        self.assertFalse(Entry.objects.get(pk=entry.pk).is_live)
+
+    def test_get_next_boundary(self):
+        self.assertEqual(scheduler.get_next_boundary(self.now),
+                         self.entries[2].end_publication)
+        self.assertEqual(
+            scheduler.get_next_boundary(self.now + timedelta(hours=1)),
+            self.entries[1].start_publication)
+        self.assertEqual(
+            scheduler.get_next_boundary(self.now + timedelta(hours=2)),
+            None)
+
+    def test_update_live_entries(self):
+        self.assertEqual(scheduler.update_live_entries(self.now),
+                         ([], []))
+        self.assertEqual(self.changes, [])
+        self.assertEqual(
+            scheduler.update_live_entries(self.now + timedelta(hours=3)),
+            ([self.entries[1].pk], [self.entries[2].pk]))
+        self.assertEqual(self.changes,
+                         [([self.entries[1].pk], [self.entries[2].pk])])
+        self.assertEqual(
+            list(Entry.objects.filter(is_live=True)),
+            [self.entries[1], self.entries[0]])
+        self.assertEqual(cache.get(scheduler.CACHE_KEY),
+                         scheduler.NO_BOUNDARY)
+
+    def test_get_next_publication_boundary(self):
+        with self.assertNumQueries(1):
+            scheduler.get_next_publication_boundary()
+        self.assertEqual(cache.get(scheduler.CACHE_KEY),
+                         self.entries[2].end_publication.timestamp())
+        with self.assertNumQueries(0):
+            scheduler.get_next_publication_boundary()
+        cache.set(scheduler.CACHE_KEY, self.now.timestamp(), None)
+        Entry.objects.filter(pk=self.entries[1].pk).update(
+            start_publication=self.now - timedelta(hours=1))
+        with self.assertNumQueries(1):
+            self.assertEqual(scheduler.get_next_publication_boundary(),
+                             self.entries[2].end_publication.timestamp())
+        self.assertEqual(self.changes, [])
+        with self.assertNumQueries(1):
+            self.assertEqual(Entry.published.count(), 2)
+        scheduler.update_live_entries()
+        self.assertEqual(self.changes, [([self.entries[1].pk], [])])
+        self.assertEqual(Entry.published.count(), 3)
+
+    def test_schedule_entry(self):
+        scheduler.update_live_entries()
+        entry = self.entries[0]
+        boundary = self.now + timedelta(minutes=30)
+        entry.end_publication = boundary
+        entry.save()
+        self.assertEqual(cache.get(scheduler.CACHE_KEY),
+                         boundary.timestamp())
+        entry.end_publication = self.now + timedelta(hours=3)
+        entry.save()
+        self.assertEqual(cache.get(scheduler.CACHE_KEY),
+                         boundary.timestamp())
+
+    def test_update_live_entries_command(self):
+        Entry.objects.filter(pk=self.entries[1].pk).update(
+            start_publication=self.now - timedelta(hours=1))
+        call_command('update_live_entries', verbosity=0)
+        self.assertEqual(self.changes, [([self.entries[1].pk], [])])
+
+    def test_check_live_entries(self):
+        self.assertEqual(checks.check_live_entries(), [])
+        Entry.objects.filter(pk=self.entries[1].pk).update(
+            start_publication=self.now - timedelta(minutes=30))
+        self.assertEqual(checks.check_live_entries(), [])
+        Entry.objects.filter(pk=self.entries[1].pk).update(
+            start_publication=self.now - timedelta(hours=2))
+        self.assertEqual([error.id for error in checks.check_live_entries()],
+                         ['zinnia.W001'])
+        scheduler.update_live_entries()
+        self.assertEqual(checks.check_live_entries(), [])
+        Entry.objects.filter(pk=self.entries[2].pk).update(
+            end_publication=self.now - timedelta(hours=2))
+        self.assertEqual([error.id for error in checks.check_live_entries()],
+                         ['zinnia.W001'])
+
+    def test_get_publication_time(self):
+        now = datetime(2020, 3, 15, 10, 30, 25)
+        self.assertEqual(scheduler.get_publication_time(now), now)
+        scheduler.PUBLICATION_GRANULARITY = 60
+        self.assertEqual(scheduler.get_publication_time(now),
+                         datetime(2020, 3, 15, 10, 30))
+        scheduler.PUBLICATION_GRANULARITY = 3600
+        self.assertEqual(scheduler.get_publication_time(now),
+                         datetime(2020, 3, 15, 10))
+
+    def test_get_publication_boundary(self):
+        scheduler.PUBLICATION_GRANULARITY = 60
+        self.assertEqual(scheduler.get_publication_boundary(
+            datetime(2020, 3, 15, 10, 30, 25)),
+            datetime(2020, 3, 15, 10, 31))
+        self.assertEqual(scheduler.get_publication_boundary(
+            datetime(2020, 3, 15, 10, 30)),
+            datetime(2020, 3, 15, 10, 30))
+
+    def test_get_next_boundary_granularity(self):
+        scheduler.PUBLICATION_GRANULARITY = 60
+        self.assertEqual(
+            scheduler.get_next_boundary(self.now),
+            scheduler.get_publication_boundary(
+                self.entries[2].end_publication))
+        self.assertEqual(
+            scheduler.get_next_boundary(self.now).second, 0)
+
+    def test_get_publication_timeout(self):
+        self.assertEqual(scheduler.get_next_publication_boundary(),
+                         self.entries[2].end_publication.timestamp())
+        self.assertEqual(scheduler.get_publication_timeout(300), 300)
+        self.assertAlmostEqual(scheduler.get_publication_timeout(),
+                               3600, delta=60)
+        Entry.objects.filter(pk__in=[self.entries[1].pk,
+                                     self.entries[2].pk]).delete()
+        cache.delete(scheduler.CACHE_KEY)
+        self.assertEqual(scheduler.get_next_publication_boundary(), None)
+        self.assertEqual(scheduler.get_publication_timeout(300), 300)
+        self.assertEqual(scheduler.get_publication_timeout(), None)
@@ -0,0 +1,623 @@
+"""Test cases for Zinnia's search"""
+import os
+import shutil
+import tempfile
+import warnings
+from datetime import timedelta
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from zinnia import checks
+from zinnia import scheduler
+from zinnia import search
+from zinnia.managers import PUBLISHED
+from zinnia.models.author import Author
+from zinnia.models.category import Category
+from zinnia.models.entry import Entry
+from zinnia.search import compile_q
+from zinnia.search import compile_stripped_q
+from zinnia.search import create_q
+from zinnia.search import get_search_backend
+from zinnia.search import get_search_terms
+from zinnia.search import parse_query
+from zinnia.search import parse_stripped_query
+from zinnia.search import results
+from zinnia.search import suggestions
+from zinnia.search.backends import default
+from zinnia.search.backends import inverted
+from zinnia.search.backends import sqlite
+from zinnia.search.results import SearchResults
+from zinnia.search.results import search_results
+from zinnia.search.suggestions import get_suggestions
+from zinnia.signals import connect_search_signals
+from zinnia.signals import disconnect_entry_signals
+from zinnia.signals import disconnect_search_signals
+from zinnia.signals import index_search_handler
+from zinnia.signals import unindex_search_handler
+from zinnia.tests.utils import datetime
+from zinnia.tests.utils import run_on_commit_callbacks
+
+
+class SearchTestCase(TestCase):
+    """Test cases for zinnia.search"""
+
+    def setUp(self):
+        self.original_backend = search.SEARCH_BACKEND
+
+    def tearDown(self):
+        search.SEARCH_BACKEND = self.original_backend
+
+    def test_get_search_backend(self):
+        search.SEARCH_BACKEND = 'mymodule.myclass'
+        with warnings.catch_warnings(record=True) as w:
+            self.assertEqual(get_search_backend(), default.backend)
+            self.assertTrue(issubclass(w[-1].category, RuntimeWarning))
+            self.assertEqual(
+                str(w[-1].message),
+                'mymodule.myclass backend cannot be imported')
+
+        search.SEARCH_BACKEND = 'zinnia.search.backends.sqlite'
+        self.assertEqual(get_search_backend(), sqlite.backend)
+
+    def test_get_search_terms(self):
+        self.assertEqual(get_search_terms(''), [])
+        self.assertEqual(get_search_terms('on the'), [])
+        self.assertEqual(
+            get_search_terms('(paris or berlin) "I love you" girl -money'),
+            [('paris', None), ('berlin', None),
+             ('I love you', None), ('girl', None)])
+        self.assertEqual(
+            get_search_terms('tag:love category:meet* meet* *ing *ital*'),
+            [('meet', 'END'), ('ing', 'START'), ('ital', 'BOTH')])
+        self.assertEqual(
+            get_search_terms('paris -(berlin or london) or rome'),
+            [('paris', None), ('rome', None)])
+
+    def test_parse_query(self):
+        parse_stripped_query.cache_clear()
+        query = parse_query('(paris or berlin) -love')
+        self.assertEqual(query.operator, 'and')
+        self.assertEqual(query.get_terms(), [
+            ('', 'paris', None, False), ('', 'berlin', None, False)])
+        self.assertTrue(parse_query(' (paris or berlin) -love ') is query)
+        self.assertTrue(parse_query('(paris  or berlin)\t-love') is query)
+        cache_info = parse_stripped_query.cache_info()
+        self.assertEqual(cache_info.hits, 2)
+        self.assertEqual(cache_info.misses, 1)
+
+    def test_parse_query_quoted_spaces(self):
+        parse_stripped_query.cache_clear()
+        query = parse_query('"new  york" paris')
+        self.assertEqual(query.get_terms(), [
+            ('', 'new  york', None, True), ('', 'paris', None, False)])
+        self.assertTrue(parse_query(' "new  york" paris\t') is query)
+        self.assertEqual(parse_query('"new york" paris').get_terms()[0],
+                         ('', 'new york', None, True))
+        self.assertEqual(parse_query("it's  'new  york'").get_terms()[1],
+                         ('', 'new  york', None, True))
+
+    def test_compile_q(self):
+        compile_stripped_q.cache_clear()
+        query = compile_q('paris -author:john')
+        self.assertEqual(
+            str(query), str(create_q(None, 'paris') &
+                            ~create_q('author', 'john')))
+        self.assertTrue(compile_q('paris -author:john ') is query)
+        self.assertTrue(compile_q('paris  -author:john') is query)
+        self.assertEqual(compile_stripped_q.cache_info().hits, 2)
+        self.assertNotEqual(str(compile_q('"new  york"')),
+                            str(compile_q('"new york"')))
+
+
+class SQLiteSearchBackendTestCase(TestCase):
+    """Test cases for the SQLite FTS5 search backend"""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite is not the database')
+        disconnect_entry_signals()
+        disconnect_search_signals()
+        self.original_backend = search.SEARCH_BACKEND
+        search.SEARCH_BACKEND = 'zinnia.search.backends.sqlite'
+        self.author = Author.objects.create_user(
+            username='webmaster', email='webmaster@example.com')
+        self.entries = []
+        for i, content in enumerate([
+                'Paris is the capital of France',
+                'Berlin is the capital of Germany, not Paris',
+                'A <strong>paris</strong> paris, Paris !']):
+            params = {'title': 'My entry %s' % i,
+                      'content': content,
+                      'tags': 'zinnia, test',
+                      'slug': 'my-entry-%s' % i,
+                      'status': PUBLISHED}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(Site.objects.get_current())
+            self.entries.append(entry)
+        self.entries[0].authors.add(self.author)
+        sqlite.backend.clear_index()
+        sqlite.backend.index_entries(self.entries)
+
+    def tearDown(self):
+        connect_search_signals()
+        search.SEARCH_BACKEND = self.original_backend
+
+    def test_advanced_search(self):
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris')),
+            [self.entries[2], self.entries[0], self.entries[1]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris -berlin')),
+            [self.entries[2], self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('france or germany')),
+            [self.entries[0], self.entries[1]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('"capital of France"')),
+            [self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('"France capital"')), [])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris author:webmaster')),
+            [self.entries[0]])
+        self.assertEqual(
+            Entry.published.advanced_search('capit* tag:zinnia').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('*pital').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('strong').count(), 0)
+
+    def test_index_entry(self):
+        entry = self.entries[0]
+        entry.content = entry.excerpt = 'Madrid is the capital of Spain'
+        entry.save()
+        self.assertEqual(Entry.published.advanced_search('spain').count(), 0)
+        index_search_handler(sender=Entry, instance=entry)
+        self.assertEqual(
+            list(Entry.published.advanced_search('spain')), [entry])
+        self.assertEqual(
+            list(Entry.published.advanced_search('france')), [])
+        unindex_search_handler(sender=Entry, instance=entry)
+        self.assertEqual(Entry.published.advanced_search('spain').count(), 0)
+        index_search_handler(sender=Entry, instance=entry,
+                             update_fields=['comment_count'])
+        self.assertEqual(Entry.published.advanced_search('spain').count(), 0)
+        index_search_handler(sender=Entry, instance=entry,
+                             update_fields=['content'])
+        self.assertEqual(
+            list(Entry.published.advanced_search('spain')), [entry])
+
+    def test_check_search_index(self):
+        self.assertEqual(checks.check_search_index(), [])
+        original_backend = checks.SEARCH_BACKEND
+        original_table = checks.INDEX_TABLE
+        checks.SEARCH_BACKEND = 'zinnia.search.backends.sqlite'
+        self.assertEqual(checks.check_search_index(), [])
+        checks.INDEX_TABLE = 'zinnia_entry_missing'
+        self.assertEqual([error.id for error in checks.check_search_index()],
+                         ['zinnia.E001'])
+        checks.SEARCH_BACKEND = original_backend
+        checks.INDEX_TABLE = original_table
+
+    def test_update_search_index(self):
+        sqlite.backend.clear_index()
+        self.assertEqual(Entry.published.advanced_search('paris').count(), 0)
+        call_command('update_search_index', batch_size=2, verbosity=0)
+        self.assertEqual(Entry.published.advanced_search('paris').count(), 3)
+
+
+class InvertedIndexSearchBackendTestCase(TestCase):
+    """Test cases for the inverted index search backend"""
+
+    def setUp(self):
+        disconnect_entry_signals()
+        disconnect_search_signals()
+        self.original_backend = search.SEARCH_BACKEND
+        self.original_inverted_backend = inverted.backend
+        self.path = tempfile.mkdtemp()
+        self.backend = inverted.InvertedIndexSearchBackend(self.path)
+        inverted.backend = self.backend
+        search.SEARCH_BACKEND = 'zinnia.search.backends.inverted'
+        self.author = Author.objects.create_user(
+            username='webmaster', email='webmaster@example.com')
+        self.category = Category.objects.create(
+            title='Capitals', slug='capital-cities')
+        self.entries = []
+        for i, content in enumerate([
+                'Paris is the capital of France',
+                'Berlin is the capital of Germany, not Paris',
+                'A <strong>paris</strong> paris, Paris !']):
+            params = {'title': 'My entry %s' % i,
+                      'content': content,
+                      'tags': 'zinnia, test',
+                      'slug': 'my-entry-%s' % i,
+                      'status': PUBLISHED}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(Site.objects.get_current())
+            self.entries.append(entry)
+        self.entries[0].authors.add(self.author)
+        self.entries[1].categories.add(self.category)
+        self.backend.index_entries(self.entries)
+
+    def tearDown(self):
+        connect_search_signals()
+        search.SEARCH_BACKEND = self.original_backend
+        inverted.backend = self.original_inverted_backend
+        shutil.rmtree(self.path)
+
+    def test_advanced_search(self):
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris')),
+            [self.entries[2], self.entries[0], self.entries[1]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris -berlin')),
+            [self.entries[2], self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('france or germany')),
+            [self.entries[0], self.entries[1]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('"capital of France"')),
+            [self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('"France capital"')), [])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris author:webmaster')),
+            [self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('category:capital*')),
+            [self.entries[1]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('category:capitals')),
+            [self.entries[1]])
+        self.assertEqual(
+            Entry.published.advanced_search('category:capital').count(), 0)
+        self.assertEqual(
+            Entry.published.advanced_search('capit* tag:zinn*').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('capit* tag:zinn').count(), 0)
+        self.assertEqual(
+            Entry.published.advanced_search('tag:*nia -tag:test').count(), 0)
+        self.assertEqual(
+            Entry.published.advanced_search('*pital').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('*api*').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('strong').count(), 0)
+        self.assertEqual(
+            Entry.published.advanced_search('-germany').count(), 2)
+        self.assertEqual(
+            Entry.published.advanced_search('-germany or berlin').count(), 3)
+        self.assertEqual(
+            Entry.published.advanced_search('-(author:webmaster or '
+                                            'category:capitals)').count(), 1)
+        self.assertEqual(
+            Entry.published.advanced_search('the').count(), 3)
+
+    def test_search_queries(self):
+        with self.assertNumQueries(2):
+            list(Entry.published.advanced_search(
+                '(paris or berlin) author:webmaster -germany'))
+        with self.assertNumQueries(1):
+            entries = Entry.published.advanced_search('paris')
+        self.assertEqual(entries.pks, [self.entries[2].pk,
+                                       self.entries[0].pk,
+                                       self.entries[1].pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(list(entries[1:2]), [self.entries[0]])
+        self.backend.max_filtered_pks = 1
+        self.assertEqual(
+            self.backend.search_pks(Entry.published.all(), 'paris'),
+            entries.pks)
+
+    def test_index_entry(self):
+        entry = self.entries[0]
+        entry.content = entry.excerpt = 'Madrid is the capital of Spain'
+        entry.save()
+        self.assertEqual(Entry.published.advanced_search('spain').count(), 0)
+        index_search_handler(sender=Entry, instance=entry)
+        self.assertEqual(
+            list(Entry.published.advanced_search('spain')), [entry])
+        self.assertEqual(
+            list(Entry.published.advanced_search('france')), [])
+
+        other_process = inverted.InvertedIndexSearchBackend(self.path)
+        self.assertEqual(
+            list(other_process.search(Entry.published.all(), 'spain')),
+            [entry])
+        other_process.unindex_entry(entry.pk)
+        self.assertEqual(Entry.published.advanced_search('spain').count(), 0)
+        self.assertEqual(Entry.published.advanced_search('paris').count(), 2)
+
+    def test_index_relations(self):
+        entry = self.entries[2]
+        entry.categories.add(self.category)
+        self.assertEqual(Entry.published.advanced_search(
+            'category:capitals').count(), 1)
+        index_search_handler(
+            sender=Entry.categories.through, instance=entry,
+            action='post_add', reverse=False, pk_set={self.category.pk})
+        self.assertEqual(Entry.published.advanced_search(
+            'category:capitals').count(), 2)
+        self.category.entries.clear()
+        index_search_handler(
+            sender=Entry.categories.through, instance=self.category,
+            action='post_add', reverse=True,
+            pk_set={self.entries[1].pk, entry.pk})
+        self.assertEqual(Entry.published.advanced_search(
+            'category:capitals').count(), 0)
+
+    def test_merge(self):
+        index = self.backend.index
+        self.assertEqual(index.generation, 0)
+        self.assertEqual(len(index.journal), 3)
+        self.backend.index_entry(self.entries[0])
+        self.backend.unindex_entry(self.entries[1].pk)
+        self.assertEqual(index.generation, 0)
+        self.assertEqual(len(index.journal), 3)
+        call_command('update_search_index', merge=True, verbosity=0)
+        self.assertEqual(index.generation, 1)
+        self.assertEqual(index.journal, {})
+        self.assertEqual(sorted(os.listdir(self.path)), [
+            'CURRENT', 'lock', 'segment-1.bin', 'segment-1.json'])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris')),
+            [self.entries[2], self.entries[0]])
+        self.assertEqual(
+            list(Entry.published.advanced_search('"capital of France"')),
+            [self.entries[0]])
+
+        self.backend.index_entry(self.entries[1])
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris')),
+            [self.entries[2], self.entries[0], self.entries[1]])
+        index.merge()
+        self.assertEqual(index.generation, 2)
+        self.assertEqual(
+            list(Entry.published.advanced_search('paris')),
+            [self.entries[2], self.entries[0], self.entries[1]])
+
+        self.backend.clear_index()
+        self.assertEqual(index.generation, 3)
+        self.assertEqual(Entry.published.advanced_search('paris').count(), 0)
+
+        call_command('update_search_index', verbosity=0)
+        self.assertEqual(index.generation, 5)
+        self.assertEqual(index.journal, {})
+        self.assertEqual(Entry.published.advanced_search('paris').count(), 3)
+
+    def test_index_path(self):
+        self.assertEqual(checks.check_search_index_path(), [])
+        original_path = checks.SEARCH_INDEX_PATH
+        checks.SEARCH_INDEX_PATH = None
+        self.assertEqual(checks.check_search_index_path(), [])
+        original_backend = checks.SEARCH_BACKEND
+        checks.SEARCH_BACKEND = 'zinnia.search.backends.inverted'
+        self.assertEqual(
+            [error.id for error in checks.check_search_index_path()],
+            ['zinnia.E002'])
+        checks.SEARCH_BACKEND = original_backend
+        checks.SEARCH_INDEX_PATH = original_path
+        with self.assertRaises(ImproperlyConfigured):
+            inverted.InvertedIndexSearchBackend(None).index
+
+
+class SearchResultsTestCase(TestCase):
+    """Test cases for the cached results of the searches"""
+
+    def setUp(self):
+        disconnect_entry_signals()
+        self.original_timeout = results.SEARCH_RESULTS_TIMEOUT
+        self.entries = []
+        for i in range(3):
+            params = {'title': 'My entry %s' % i,
+                      'content': 'My content %s' % i,
+                      'slug': 'my-entry-%s' % i,
+                      'status': PUBLISHED}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(Site.objects.get_current())
+            self.entries.append(entry)
+        self.entries.reverse()
+        scheduler.update_live_entries()
+        results.flush_results_cache()
+
+    def tearDown(self):
+        results.SEARCH_RESULTS_TIMEOUT = self.original_timeout
+
+    def test_search_results(self):
+        with self.assertNumQueries(1):
+            entries = search_results('content')
+            self.assertEqual(entries.count(), 3)
+        self.assertTrue(isinstance(entries, SearchResults))
+        self.assertEqual(entries.pks, [entry.pk for entry in self.entries])
+
+        with self.assertNumQueries(0):
+            entries = search_results(' content ')
+            self.assertEqual(len(entries), 3)
+            self.assertTrue(entries.exists())
+            page = entries[1:3]
+            self.assertEqual(len(page), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(page), self.entries[1:])
+            self.assertEqual(page[0], self.entries[1])
+        with self.assertNumQueries(3):
+            self.assertEqual(
+                list(entries.prefetch_related('categories', 'authors')),
+                self.entries)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(search_results('content 1').count(), 1)
+            self.assertEqual(search_results('content 1').count(), 1)
+
+    def test_search_results_invalidation(self):
+        search_results('content')
+        entry = self.entries[0]
+        entry.status = 0
+        entry.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(search_results('content').count(), 3)
+        with run_on_commit_callbacks():
+            entry.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(search_results('content').count(), 2)
+        entry.sites.clear()
+        entry.status = PUBLISHED
+        with run_on_commit_callbacks():
+            entry.save(update_fields=['status'])
+        self.assertEqual(search_results('content').count(), 2)
+        with run_on_commit_callbacks():
+            entry.sites.add(Site.objects.get_current())
+        self.assertEqual(search_results('content').count(), 3)
+        with run_on_commit_callbacks():
+            entry.save(update_fields=['comment_count'])
+        with self.assertNumQueries(0):
+            self.assertEqual(search_results('content').count(), 3)
+        with run_on_commit_callbacks():
+            entry.save(update_fields=['content'])
+        with self.assertNumQueries(1):
+            self.assertEqual(search_results('content').count(), 3)
+
+    def test_search_results_publication_boundary(self):
+        search_results('content')
+        with self.assertNumQueries(0):
+            search_results('content')
+        end_publication = timezone.now() - timedelta(minutes=1)
+        Entry.objects.filter(pk=self.entries[0].pk).update(
+            end_publication=end_publication)
+        cache.set(scheduler.CACHE_KEY, end_publication.timestamp(), None)
+        self.assertEqual(search_results('content').count(), 3)
+        with run_on_commit_callbacks():
+            scheduler.update_live_entries()
+        self.assertEqual(search_results('content').count(), 2)
+
+    def test_search_results_disabled(self):
+        results.SEARCH_RESULTS_TIMEOUT = 0
+        self.assertEqual(list(search_results('content')), self.entries)
+        with self.assertNumQueries(1):
+            self.assertEqual(search_results('content').count(), 3)
+
+
+class SuggestionsTestCase(TestCase):
+    """Test cases for the suggestions of the searches"""
+
+    def setUp(self):
+        disconnect_entry_signals()
+        suggestions.INDEXES.clear()
+        self.author = Author.objects.create_user(
+            username='paul', email='paul@example.com')
+        self.category = Category.objects.create(
+            title='Paris', slug='paris-city')
+        self.entries = []
+        for i, (title, tags) in enumerate([
+                ('Paris is the capital of France', 'paris, france'),
+                ('Berlin is not Paris', 'berlin, paris'),
+                ('Party in Berlin', 'party')]):
+            params = {'title': title,
+                      'content': title,
+                      'tags': tags,
+                      'slug': 'my-entry-%s' % i,
+                      'publication_date': datetime(2010, 1, i + 1),
+                      'status': PUBLISHED}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(Site.objects.get_current())
+            self.entries.append(entry)
+        self.entries[0].authors.add(self.author)
+        self.entries[0].categories.add(self.category)
+
+    def test_get_suggestions(self):
+        with self.assertNumQueries(4):
+            results = get_suggestions('par')
+        self.assertEqual(
+            [entry['title'] for entry in results['entries']],
+            ['Party in Berlin', 'Berlin is not Paris',
+             'Paris is the capital of France'])
+        self.assertEqual(results['entries'][0]['url'],
+                         self.entries[2].get_absolute_url())
+        self.assertEqual(results['tags'], [
+            {'name': 'paris', 'count': 2, 'url': '/tags/paris/'},
+            {'name': 'party', 'count': 1, 'url': '/tags/party/'}])
+        self.assertEqual(results['categories'], [
+            {'title': 'Paris', 'count': 1, 'url': '/categories/paris-city/'}])
+        self.assertEqual(results['authors'], [])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_suggestions('pau')['authors'], [
+                {'username': 'paul', 'count': 1, 'url': '/authors/paul/'}])
+            results = get_suggestions('  Capital', 2)
+            self.assertEqual(
+                [entry['title'] for entry in results['entries']],
+                ['Paris is the capital of France'])
+            results = get_suggestions('paris-c')
+            self.assertEqual(len(results['categories']), 1)
+            self.assertEqual(get_suggestions('par', 1)['tags'], [
+                {'name': 'paris', 'count': 2, 'url': '/tags/paris/'}])
+            self.assertEqual(get_suggestions('zzz'), {
+                'entries': [], 'tags': [], 'categories': [], 'authors': []})
+            self.assertEqual(get_suggestions(' '), {
+                'entries': [], 'tags': [], 'categories': [], 'authors': []})
+
+    def test_get_suggestions_changes(self):
+        get_suggestions('par')
+        snapshot = suggestions.INDEXES[Site.objects.get_current().pk].snapshot
+        entry = self.entries[2]
+        entry.title = 'Holidays in Berlin'
+        entry.save()
+        with self.assertNumQueries(0):
+            get_suggestions('hol')
+        with run_on_commit_callbacks():
+            entry.save()
+        with self.assertNumQueries(3):
+            results = get_suggestions('par')
+        self.assertEqual(snapshot[0][entry.pk][0], 'Party in Berlin')
+        self.assertIn(('party in berlin', entry.pk), snapshot[3]['titles'])
+        with run_on_commit_callbacks():
+            entry.save(update_fields=['comment_count'])
+        with self.assertNumQueries(0):
+            get_suggestions('par')
+        self.assertEqual(len(results['entries']), 2)
+        self.assertEqual(len(results['tags']), 2)
+        with run_on_commit_callbacks():
+            entry.sites.clear()
+        self.assertEqual(len(get_suggestions('hol')['entries']), 0)
+
+        self.category.title = 'Capital'
+        with run_on_commit_callbacks():
+            self.category.save()
+        self.assertEqual(get_suggestions('paris')['categories'][0]['title'],
+                         'Capital')
+        self.assertEqual(len(get_suggestions('cap')['categories']), 1)
+        with run_on_commit_callbacks():
+            self.category.entries.clear()
+        self.assertEqual(get_suggestions('cap')['categories'], [])
+
+        entry = self.entries[1]
+        entry.start_publication = timezone.now() + timedelta(days=1)
+        with run_on_commit_callbacks():
+            entry.save()
+        results = get_suggestions('par')
+        self.assertEqual(
+            [entry['title'] for entry in results['entries']],
+            ['Paris is the capital of France'])
+        self.assertEqual(results['tags'], [
+            {'name': 'paris', 'count': 1, 'url': '/tags/paris/'}])
+        self.assertEqual(get_suggestions('ber')['tags'], [])
+
+        with run_on_commit_callbacks():
+            scheduler.update_live_entries(entry.start_publication)
+        self.assertEqual(len(get_suggestions('par')['entries']), 2)
+        self.assertEqual(get_suggestions('par')['tags'][0]['count'], 2)
+
+    def test_get_suggestions_lost_changes(self):
+        get_suggestions('par')
+        entry = self.entries[2]
+        with run_on_commit_callbacks():
+            entry.delete()
+        results.get_results_cache().delete(suggestions.make_change_key(
+            results.get_results_cache().get(suggestions.VERSION_KEY)))
+        with self.assertNumQueries(4):
+            self.assertEqual(len(get_suggestions('par')['entries']), 2)
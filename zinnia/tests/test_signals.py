@@ -1,16 +1,24 @@
 """Test cases for Zinnia's signals"""
+from django.contrib.sites.models import Site
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
 from django.test import TestCase
 
 import zinnia.signals
 from zinnia import settings
+from zinnia.comparison import EntryPublishedVectorBuilder
 from zinnia.managers import DRAFT
 from zinnia.managers import PUBLISHED
 from zinnia.models.entry import Entry
 from zinnia.signals import disable_for_loaddata
 from zinnia.signals import disconnect_discussion_signals
 from zinnia.signals import disconnect_entry_signals
+from zinnia.signals import keep_similar_live_handler
 from zinnia.signals import ping_directories_handler
 from zinnia.signals import ping_external_urls_handler
+from zinnia.signals import update_similar_cache_handler
 
 
 class SignalsTestCase(TestCase):
@@ -92,3 +100,98 @@ class SignalsTestCase(TestCase):
 
         # Remove stub
         zinnia.signals.ExternalUrlsPinger = self.original_pinger
+
+    def test_update_similar_cache_handler(self):
+        post_save.connect(
+            update_similar_cache_handler, sender=Entry,
+            dispatch_uid='update_cache')
+        post_delete.connect(
+            update_similar_cache_handler, sender=Entry,
+            dispatch_uid='update_cache')
+        m2m_changed.connect(
+            update_similar_cache_handler, sender=Entry.sites.through,
+            dispatch_uid='update_cache')
+        site = Site.objects.get_current()
+        vectors = EntryPublishedVectorBuilder()
+        vectors.cache_flush()
+        params = {'title': 'My first entry',
+                  'content': 'My first content',
+                  'status': PUBLISHED,
+                  'slug': 'my-first-entry'}
+        entry_1 = Entry.objects.create(**params)
+        entry_1.sites.add(site)
+        self.assertEqual(list(vectors.dataset.keys()), [entry_1.pk])
+
+        params = {'title': 'My second entry',
+                  'content': 'My second content',
+                  'status': PUBLISHED,
+                  'slug': 'my-second-entry'}
+        entry_2 = Entry.objects.create(**params)
+        self.assertEqual(list(vectors.dataset.keys()), [entry_1.pk])
+        entry_2.sites.add(site)
+        self.assertEqual(sorted(vectors.dataset.keys()),
+                         [entry_1.pk, entry_2.pk])
+        self.assertEqual(vectors.get_related(entry_1, 5), [entry_2])
+
+        entry_2.status = DRAFT
+        entry_2.save()
+        self.assertEqual(list(vectors.dataset.keys()), [entry_1.pk])
+        self.assertEqual(
+            EntryPublishedVectorBuilder().get_related(entry_1, 5), [])
+        entry_2.status = PUBLISHED
+        entry_2.save()
+        site.entries.remove(entry_1)
+        self.assertEqual(list(vectors.dataset.keys()), [entry_2.pk])
+        site.entries.add(entry_1)
+        generation = vectors.generation
+        entry_1.comment_count = 1
+        entry_1.save(update_fields=['comment_count'])
+        self.assertEqual(vectors.generation, generation)
+        entry_2.delete()
+        self.assertEqual(list(vectors.dataset.keys()), [entry_1.pk])
+        entry_1.sites.clear()
+        self.assertEqual(vectors.cache, {})
+
+        post_save.disconnect(
+            sender=Entry, dispatch_uid='update_cache')
+        post_delete.disconnect(
+            sender=Entry, dispatch_uid='update_cache')
+        m2m_changed.disconnect(
+            sender=Entry.sites.through, dispatch_uid='update_cache')
+
+    def test_update_similar_cache_handler_hidden_entry(self):
+        updates = []
+
+        class FakeVectorBuilder(object):
+            def update_dataset(self, object_ids):
+                updates.append(list(object_ids))
+
+        self.original_builder = zinnia.signals.EntryPublishedVectorBuilder
+        zinnia.signals.EntryPublishedVectorBuilder = FakeVectorBuilder
+        pre_save.connect(
+            keep_similar_live_handler, sender=Entry,
+            dispatch_uid='update_cache')
+        post_save.connect(
+            update_similar_cache_handler, sender=Entry,
+            dispatch_uid='update_cache')
+        params = {'title': 'My entry',
+                  'content': 'My content',
+                  'slug': 'my-entry'}
+        entry = Entry.objects.create(**params)
+        entry.title = 'My draft'
+        entry.save()
+        self.assertEqual(updates, [])
+        entry.status = PUBLISHED
+        entry.save()
+        self.assertEqual(updates, [[entry.pk]])
+        entry.status = DRAFT
+        entry.save()
+        self.assertEqual(updates, [[entry.pk], [entry.pk]])
+        entry.save()
+        self.assertEqual(len(updates), 2)
+
+        pre_save.disconnect(
+            sender=Entry, dispatch_uid='update_cache')
+        post_save.disconnect(
+            sender=Entry, dispatch_uid='update_cache')
+        zinnia.signals.EntryPublishedVectorBuilder = self.original_builder
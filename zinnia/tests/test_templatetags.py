@@ -3,6 +3,7 @@ from datetime import date
 
 from django.contrib.sites.models import Site
 from django.core.paginator import Paginator
+from django.db.models.signals import m2m_changed
 from django.db.models.signals import post_save
 from django.template import Context
 from django.template import Template
@@ -18,6 +19,7 @@ from django_comments.models import CommentFlag
 
 from tagging.models import Tag
 
+from zinnia.comparison import EntryPublishedVectorBuilder
 from zinnia.flags import PINGBACK, TRACKBACK
 from zinnia.managers import DRAFT
 from zinnia.managers import PUBLISHED
@@ -26,7 +28,7 @@ from zinnia.models.category import Category
 from zinnia.models.entry import Entry
 from zinnia.signals import disconnect_discussion_signals
 from zinnia.signals import disconnect_entry_signals
-from zinnia.signals import flush_similar_cache_handler
+from zinnia.signals import update_similar_cache_handler
 from zinnia.templatetags import zinnia as ztemplatetags
 from zinnia.templatetags.zinnia import comment_admin_urlname
 from zinnia.templatetags.zinnia import get_archives_entries
@@ -44,6 +46,7 @@ from zinnia.templatetags.zinnia import get_recent_comments
 from zinnia.templatetags.zinnia import get_recent_entries
 from zinnia.templatetags.zinnia import get_recent_linkbacks
 from zinnia.templatetags.zinnia import get_similar_entries
+from zinnia.templatetags.zinnia import get_similar_entries_list
 from zinnia.templatetags.zinnia import get_tag_cloud
 from zinnia.templatetags.zinnia import user_admin_urlname
 from zinnia.templatetags.zinnia import week_number
@@ -257,8 +260,11 @@ class TemplateTagsTestCase(TestCase):
 
     def test_get_similar_entries(self):
         post_save.connect(
-            flush_similar_cache_handler, sender=Entry,
-            dispatch_uid='flush_cache')
+            update_similar_cache_handler, sender=Entry,
+            dispatch_uid='update_cache')
+        m2m_changed.connect(
+            update_similar_cache_handler, sender=Entry.sites.through,
+            dispatch_uid='update_cache')
         self.publish_entry()
         source_context = Context({'object': self.entry})
         with self.assertNumQueries(0):
@@ -290,7 +296,7 @@ class TemplateTagsTestCase(TestCase):
         third_entry = Entry.objects.create(**params)
         third_entry.sites.add(self.site)
 
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             context = get_similar_entries(source_context, 3,
                                           'custom_template.html')
         self.assertEqual(len(context['entries']), 2)
@@ -312,7 +318,40 @@ class TemplateTagsTestCase(TestCase):
         self.assertEqual(len(context['entries']), 2)
 
         post_save.disconnect(
-            sender=Entry, dispatch_uid='flush_cache')
+            sender=Entry, dispatch_uid='update_cache')
+        m2m_changed.disconnect(
+            sender=Entry.sites.through, dispatch_uid='update_cache')
+
+    def test_get_similar_entries_list(self):
+        EntryPublishedVectorBuilder().cache_flush()
+        self.publish_entry()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_similar_entries_list([]), [])
+
+        entries = [self.entry]
+        for i, content in enumerate(['second content of my testing',
+                                     'third content for testing']):
+            params = {'title': 'My entry %s' % i,
+                      'content': content,
+                      'status': PUBLISHED,
+                      'slug': 'my-entry-%s' % i}
+            entry = Entry.objects.create(**params)
+            entry.sites.add(self.site)
+            entries.append(entry)
+
+        with self.assertNumQueries(2):
+            entries_similar = get_similar_entries_list(entries, 1)
+        self.assertEqual([entry for entry, similar in entries_similar],
+                         entries)
+        for entry, similar in entries_similar:
+            self.assertEqual(len(similar), 1)
+            self.assertEqual(similar,
+                             EntryPublishedVectorBuilder().get_related(
+                                 entry, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_similar_entries_list(entries, 1),
+                             entries_similar)
+        EntryPublishedVectorBuilder().cache_flush()
 
     def test_get_archives_entries(self):
         with self.assertNumQueries(0):
@@ -1189,7 +1228,7 @@ class TemplateTagsTestCase(TestCase):
         self.entry.authors.add(author)
         self.publish_entry()
 
-        with self.assertNumQueries(13):
+        with self.assertNumQueries(12):
             context = zinnia_statistics('custom_template.html')
         self.assertEqual(context['template'], 'custom_template.html')
         self.assertEqual(context['entries'], 1)
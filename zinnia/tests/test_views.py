@@ -18,11 +18,15 @@ from zinnia.managers import PUBLISHED
 from zinnia.models.author import Author
 from zinnia.models.category import Category
 from zinnia.models.entry import Entry
+from zinnia.scheduler import update_live_entries
+from zinnia.search import results
+from zinnia.search import suggestions
 from zinnia.settings import PAGINATION
 from zinnia.signals import connect_discussion_signals
 from zinnia.signals import disconnect_discussion_signals
 from zinnia.signals import disconnect_entry_signals
 from zinnia.tests.utils import datetime
+from zinnia.tests.utils import run_on_commit_callbacks
 from zinnia.tests.utils import skip_if_custom_user
 from zinnia.tests.utils import url_equal
 from zinnia.url_shortener.backends.default import base36
@@ -90,10 +94,11 @@ class ViewsBaseCase(TestCase):
                   'tags': 'tests',
                   'publication_date': datetime(2010, 1, 1, 23, 0),
                   'status': PUBLISHED}
-        entry = Entry.objects.create(**params)
-        entry.sites.add(self.site)
-        entry.categories.add(self.category)
-        entry.authors.add(self.author)
+        with run_on_commit_callbacks():
+            entry = Entry.objects.create(**params)
+            entry.sites.add(self.site)
+            entry.categories.add(self.category)
+            entry.authors.add(self.author)
         return entry
 
     def check_publishing_context(self, url, first_expected,
@@ -550,7 +555,7 @@ class ViewsTestCase(ViewsBaseCase):
         self.check_publishing_context(
             '/tags/', 1,
             friendly_context='tag_list',
-            queries=1)
+            queries=0)
         self.first_entry.tags = 'tests, tag'
         self.first_entry.save()
         self.check_publishing_context('/tags/', 2)
@@ -583,6 +588,8 @@ class ViewsTestCase(ViewsBaseCase):
         self.assertEqual(response.context['tag'].name, 'tests')
 
     def test_zinnia_entry_search(self):
+        update_live_entries()
+        results.flush_results_cache()
         self.check_publishing_context(
             '/search/?pattern=test', 2, 3, 'entry_list', 1)
         response = self.client.get('/search/?pattern=ab')
@@ -594,6 +601,25 @@ class ViewsTestCase(ViewsBaseCase):
         self.assertEqual(response.context['error'],
                          _('No pattern to search found'))
 
+    def test_zinnia_entry_search_suggestions(self):
+        suggestions.INDEXES.clear()
+        response = self.client.get('/search/suggestions/?pattern=tes')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            [entry['title'] for entry in response.json()['entries']],
+            ['Test 2', 'Test 1'])
+        self.assertEqual(response.json()['tags'], [
+            {'name': 'tests', 'count': 2, 'url': '/tags/tests/'}])
+        self.assertEqual(response.json()['categories'], [
+            {'title': 'Tests', 'count': 2, 'url': '/categories/tests/'}])
+        with self.assertNumQueries(0):
+            response = self.client.get('/search/suggestions/?pattern=adm')
+        self.assertEqual(response.json()['authors'], [
+            {'username': 'admin', 'count': 2, 'url': '/authors/admin/'}])
+        response = self.client.get('/search/suggestions/')
+        self.assertEqual(response.json(), {
+            'entries': [], 'tags': [], 'categories': [], 'authors': []})
+
     def test_zinnia_entry_random(self):
         response = self.client.get('/random/', follow=True)
         self.assertTrue(response.redirect_chain[0][0].startswith('/2010/'))
@@ -1,5 +1,6 @@
 """Utils for Zinnia's tests"""
 import functools
+from contextlib import contextmanager
 from datetime import datetime as original_datetime
 from io import BytesIO
 from unittest import SkipTest
@@ -9,6 +10,8 @@ from urllib.parse import urlparse
 from xmlrpc.client import Transport
 
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
 from django.template import Origin
 from django.template.loaders.base import Loader
 from django.test.client import Client
@@ -81,6 +84,21 @@ def skip_if_custom_user(test_func):
                   'Custom user model in use')(test_func)
 
 
+@contextmanager
+def run_on_commit_callbacks(using=DEFAULT_DB_ALIAS):
+    """
+    Run the callbacks registered by transaction.on_commit()
+    in a block, as the transaction of a TestCase is never committed.
+    """
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for savepoint_ids, callback in callbacks:
+        callback()
+
+
 def url_equal(url_1, url_2):
     """
     Compare two URLs with query string where
@@ -2,9 +2,12 @@
 from django.conf.urls import url
 
 from zinnia.views.search import EntrySearch
+from zinnia.views.search import EntrySuggestions
 
 
 urlpatterns = [
     url(r'^$', EntrySearch.as_view(),
         name='entry_search'),
+    url(r'^suggestions/$', EntrySuggestions.as_view(),
+        name='entry_search_suggestions'),
 ]
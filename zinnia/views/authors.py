@@ -1,5 +1,4 @@
 """Views for Zinnia authors"""
-from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.views.generic.list import BaseListView
 from django.views.generic.list import ListView
@@ -20,8 +19,7 @@ class AuthorList(ListView):
         Return a queryset of published authors,
         with a count of their entries published.
         """
-        return Author.published.all().annotate(
-            count_entries_published=Count('entries'))
+        return Author.published.annotate_count_entries_published()
 
 
 class BaseAuthorDetail(object):
@@ -1,5 +1,4 @@
 """Views for Zinnia categories"""
-from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.views.generic.list import BaseListView
 from django.views.generic.list import ListView
@@ -28,8 +27,8 @@ class CategoryList(ListView):
         Return a queryset of published categories,
         with a count of their entries published.
         """
-        return Category.published.all().order_by('title').annotate(
-            count_entries_published=Count('entries'))
+        return Category.published.annotate_count_entries_published(
+            ).order_by('title')
 
 
 class BaseCategoryDetail(object):
@@ -1,8 +1,12 @@
 """Views for Zinnia entries search"""
+from django.http import JsonResponse
 from django.utils.translation import gettext as _
+from django.views.generic.base import View
 from django.views.generic.list import ListView
 
 from zinnia.models.entry import Entry
+from zinnia.search.results import search_results
+from zinnia.search.suggestions import get_suggestions
 from zinnia.settings import PAGINATION
 from zinnia.views.mixins.prefetch_related import PrefetchCategoriesAuthorsMixin
 
@@ -29,7 +33,7 @@ class BaseEntrySearch(object):
             if len(self.pattern) < 3:
                 self.error = _('The pattern is too short')
             else:
-                entries = Entry.published.search(self.pattern)
+                entries = search_results(self.pattern)
         else:
             self.error = _('No pattern to search found')
         return entries
@@ -56,3 +60,18 @@ class EntrySearch(PrefetchCategoriesAuthorsMixin,
     """
     paginate_by = PAGINATION
     template_name_suffix = '_search'
+
+
+class EntrySuggestions(View):
+    """
+    View returning in JSON the entries, the tags, the categories
+    and the authors suggested for the beginning of a search pattern.
+    """
+    limit = 5
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the suggestions for the pattern.
+        """
+        return JsonResponse(get_suggestions(
+            request.GET.get('pattern', ''), self.limit))
@@ -5,10 +5,10 @@ from django.utils.translation import gettext as _
 from django.views.generic.list import BaseListView
 from django.views.generic.list import ListView
 
-from tagging.models import Tag
 from tagging.models import TaggedItem
 from tagging.utils import get_tag
 
+from zinnia.managers import tags_count_entries_published
 from zinnia.models.entry import Entry
 from zinnia.settings import PAGINATION
 from zinnia.views.mixins.prefetch_related import PrefetchCategoriesAuthorsMixin
@@ -27,8 +27,7 @@ class TagList(ListView):
         Return a queryset of published tags,
         with a count of their entries published.
         """
-        return Tag.objects.usage_for_queryset(
-            Entry.published.all(), counts=True)
+        return tags_count_entries_published()
 
 
 class BaseTagDetail(object):